@@ -0,0 +1,107 @@
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pygame
+
+from sprites import load_processed_sprite
+
+
+class SpriteHandle:
+    """Lazy reference to a sprite that may still be loading in the background."""
+
+    def __init__(self, name: str, path: str, tolerance: int, size: tuple[int, int]) -> None:
+        self.name = name
+        self.path = path
+        self.tolerance = tolerance
+        self.size = size
+        self.future: Future | None = None
+        self.surface: pygame.Surface | None = None
+        self.failed = False
+
+    @property
+    def ready(self) -> bool:
+        return self.surface is not None
+
+
+class AssetManager:
+    """Scans `assets/sprites/<category>/*.png` and loads sprites on a thread pool.
+
+    Decoding, background removal and scaling run on worker threads. The final
+    `convert_alpha` needs the display, so `poll` finishes it on the main thread.
+    Until a handle is ready, callers draw their procedural fallback.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        specs: dict[str, tuple[int, tuple[int, int]]],
+        cache_dir: str | None = None,
+        workers: int = 2,
+    ) -> None:
+        self.root = root
+        self.specs = specs
+        self.cache_dir = cache_dir
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="assets")
+        self.handles: dict[str, SpriteHandle] = {}
+        self.by_category: dict[str, list[SpriteHandle]] = {}
+        self.loading: list[SpriteHandle] = []
+        self.scan()
+
+    def scan(self) -> None:
+        for category, (tolerance, size) in self.specs.items():
+            folder = os.path.join(self.root, category)
+            try:
+                files = sorted(f for f in os.listdir(folder) if f.lower().endswith(".png"))
+            except OSError:
+                files = []
+            handles = []
+            for filename in files:
+                name = f"{category}/{os.path.splitext(filename)[0]}"
+                handle = self.handles.get(name)
+                if handle is None:
+                    handle = SpriteHandle(name, os.path.join(folder, filename), tolerance, size)
+                    self.handles[name] = handle
+                handles.append(handle)
+            self.by_category[category] = handles
+
+    def request(self, handle: SpriteHandle) -> SpriteHandle:
+        if handle.future is None and handle.surface is None and not handle.failed:
+            handle.future = self.executor.submit(
+                load_processed_sprite, handle.path, handle.tolerance, handle.size, self.cache_dir
+            )
+            self.loading.append(handle)
+        return handle
+
+    def preload(self) -> None:
+        for handle in self.handles.values():
+            self.request(handle)
+
+    def category_sprite(self, category: str, index: int = 0) -> pygame.Surface | None:
+        handles = self.by_category.get(category)
+        if not handles:
+            return None
+        handle = self.request(handles[index % len(handles)])
+        return handle.surface
+
+    def poll(self) -> int:
+        # Main-thread half of loading: display-convert whatever the workers finished.
+        finished = 0
+        still_loading = []
+        for handle in self.loading:
+            if handle.future is None or not handle.future.done():
+                still_loading.append(handle)
+                continue
+            try:
+                handle.surface = handle.future.result().convert_alpha()
+                finished += 1
+            except (pygame.error, OSError, ValueError):
+                handle.failed = True
+            handle.future = None
+        self.loading = still_loading
+        return finished
+
+    def pending(self) -> int:
+        return len(self.loading)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
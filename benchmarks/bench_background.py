@@ -0,0 +1,52 @@
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pygame  # noqa: E402
+
+from sprites import remove_edge_background, remove_edge_background_reference  # noqa: E402
+
+PLAYER_SPRITE = os.path.join(os.path.dirname(__file__), "..", "assets", "sprites", "player", "player.png")
+
+
+def timed(func, source: pygame.Surface, tolerance: int, repeat: int) -> tuple[float, pygame.Surface]:
+    best = float("inf")
+    result = source
+    for _ in range(repeat):
+        sprite = source.copy()
+        started = time.perf_counter()
+        result = func(sprite, tolerance=tolerance)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare edge background removal implementations.")
+    parser.add_argument("--sprite", default=PLAYER_SPRITE)
+    parser.add_argument("--tolerance", type=int, default=36)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    source = pygame.image.load(args.sprite).convert_alpha()
+
+    ref_time, ref = timed(remove_edge_background_reference, source, args.tolerance, 1)
+    fast_time, fast = timed(remove_edge_background, source, args.tolerance, args.repeat)
+
+    same = (pygame.surfarray.array_alpha(ref) == pygame.surfarray.array_alpha(fast)).all()
+    w, h = source.get_size()
+    print(f"sprite: {args.sprite} ({w}x{h})")
+    print(f"reference (per-pixel flood fill): {ref_time * 1000:9.1f} ms")
+    print(f"vectorized (surfarray runs):      {fast_time * 1000:9.1f} ms  ({ref_time / fast_time:.0f}x)")
+    print(f"alpha masks identical: {bool(same)}")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
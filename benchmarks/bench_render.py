@@ -0,0 +1,36 @@
+import os
+
+import pygame
+import pytest
+
+from conftest import scatter_nodes
+from game import Game
+from snapshot import capture
+from sprites import remove_edge_background
+
+PLAYER_SPRITE = os.path.join("assets", "sprites", "player", "player.png")
+
+
+@pytest.fixture
+def game(display, tmp_path) -> Game:
+    # Recording mode starts a fresh world and keeps the benchmark away from the save file.
+    game = Game(seed=1, record_path=str(tmp_path / "bench.replay"))
+    while game.assets.pending():
+        game.assets.poll()
+    yield game
+    game.recorder.close()
+    game.assets.shutdown()
+
+
+@pytest.mark.parametrize("objects", [1_000, 10_000])
+def bench_draw_world(benchmark, game: Game, objects: int) -> None:
+    # All of them within the screen (plus cull margin) around the player.
+    scatter_nodes(game.sim, objects, spread=450)
+    game.view = capture(game.sim)
+    game.update_view(1.0)
+    benchmark(game.draw_world)
+
+
+def bench_remove_edge_background(benchmark, display) -> None:
+    source = pygame.image.load(PLAYER_SPRITE).convert_alpha()
+    benchmark.pedantic(remove_edge_background, setup=lambda: ((source.copy(),), {}), rounds=10)
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from conftest import scatter_nodes
+from config import SIM_DT
+from simulation import SimInput, Simulation
+
+
+@pytest.mark.parametrize("extra_nodes", [0, 1_000, 10_000])
+def bench_step(benchmark, extra_nodes: int) -> None:
+    sim = Simulation(1)
+    # Inside the loaded chunks, so nothing is streamed out while the player stands still.
+    scatter_nodes(sim, extra_nodes, spread=1200)
+    idle = SimInput()
+    benchmark(sim.step, SIM_DT, idle)
+
+
+@pytest.mark.parametrize("particles", [1_000, 10_000, 100_000])
+def bench_update_celebration(benchmark, particles: int) -> None:
+    sim = Simulation(1)
+    sim.start_celebration()
+    n = particles
+    # Effectively immortal, so the count stays put across rounds.
+    sim.particles.spawn_burst(
+        400.0, 300.0, np.linspace(0.0, 6.28, n), np.full(n, 100.0), np.full(n, 1e9), (255, 220, 90)
+    )
+    benchmark(sim.update_celebration, SIM_DT)
+    assert len(sim.particles) >= n
@@ -0,0 +1,57 @@
+import random
+
+import pygame
+import pytest
+
+from config import SPATIAL_CELL_SIZE, SPAWN_MARGIN, SPAWN_SPACING, STONE_SIZE, TREE_SIZE
+from placement import Placer, poisson_disk
+from world import SpatialGrid, is_near, nearest_rect
+
+SIZES = [10, 1_000, 100_000]
+
+
+def random_rects(count: int, seed: int = 0) -> list[pygame.Rect]:
+    rng = random.Random(seed)
+    return [pygame.Rect(rng.randint(-5000, 5000), rng.randint(-5000, 5000), 50, 60) for _ in range(count)]
+
+
+@pytest.mark.parametrize("count", SIZES)
+def bench_nearest_rect(benchmark, count: int) -> None:
+    rects = random_rects(count)
+    player = pygame.Rect(0, 0, 40, 40)
+    assert benchmark(nearest_rect, player, rects) is not None
+
+
+@pytest.mark.parametrize("count", SIZES)
+def bench_is_near_scan(benchmark, count: int) -> None:
+    # The "is anything within reach" scan the action code used before the spatial grid.
+    rects = random_rects(count)
+    player = pygame.Rect(0, 0, 40, 40)
+    benchmark(lambda: [rect for rect in rects if is_near(player, rect)])
+
+
+def bench_poisson_disk_chunk(benchmark) -> None:
+    rng = random.Random(0)
+    benchmark(poisson_disk, rng, 512, 512, SPAWN_SPACING)
+
+
+def bench_place_chunk_batch(benchmark) -> None:
+    # What chunk generation does: 3 trees + 3 stones in one empty chunk.
+    placer = Placer(SPAWN_SPACING, SPAWN_MARGIN, [SpatialGrid(SPATIAL_CELL_SIZE)])
+    rng = random.Random(0)
+    area = pygame.Rect(0, 0, 512, 512)
+    sizes = [TREE_SIZE] * 3 + [STONE_SIZE] * 3
+    benchmark(placer.place_batch, rng, area, sizes, [])
+
+
+@pytest.mark.parametrize("occupied", [0, 10, 20])
+def bench_place_in_crowded_chunk(benchmark, occupied: int) -> None:
+    # A respawn into a chunk that already holds `occupied` nodes (about 20 fit).
+    index = SpatialGrid(SPATIAL_CELL_SIZE)
+    placer = Placer(SPAWN_SPACING, SPAWN_MARGIN, [index])
+    area = pygame.Rect(0, 0, 512, 512)
+    for i, rect in enumerate(placer.place_batch(random.Random(1), area, [TREE_SIZE] * occupied, [])):
+        if rect is not None:
+            index.insert(i, rect)
+    rng = random.Random(0)
+    benchmark(placer.place, rng, area, *TREE_SIZE, [])
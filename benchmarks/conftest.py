@@ -0,0 +1,45 @@
+import os
+import random
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BASELINES = os.path.join(os.path.dirname(__file__), "baselines")
+sys.path.insert(0, ROOT)
+# Asset and data paths in config.py are relative to the repo root.
+os.chdir(ROOT)
+
+import pygame  # noqa: E402
+import pytest  # noqa: E402
+
+from config import STONE_SIZE, TREE_SIZE  # noqa: E402
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config: pytest.Config) -> None:
+    # Keep saved results next to the suite instead of in a .benchmarks folder wherever pytest ran.
+    if config.getoption("benchmark_storage", None) == "file://./.benchmarks":
+        config.option.benchmark_storage = f"file://{BASELINES}"
+
+
+@pytest.fixture(scope="session")
+def display() -> pygame.Surface:
+    pygame.init()
+    screen = pygame.display.set_mode((900, 600))
+    yield screen
+    pygame.quit()
+
+
+def scatter_nodes(sim, count: int, spread: int, seed: int = 0) -> None:
+    # Extra trees and stones (half each) in a square of side 2 * spread around the player.
+    rng = random.Random(seed)
+    cx, cy = sim.player.center
+    for i in range(count):
+        x = rng.randint(cx - spread, cx + spread)
+        y = rng.randint(cy - spread, cy + spread)
+        if i % 2:
+            sim.add_stone(pygame.Rect(x, y, *STONE_SIZE))
+        else:
+            sim.add_tree(pygame.Rect(x, y, *TREE_SIZE), rng.uniform(0.5, 1.0))
@@ -0,0 +1,237 @@
+import os
+import random
+import struct
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+from config import STONE_SIZE, TREE_SIZE
+from resources import KIND_TREE
+
+# Packed layout of one resource node inside a dormant chunk record.
+NODE_DTYPE = np.dtype(
+    [("kind", "u1"), ("x", "<i4"), ("y", "<i4"), ("w", "<i4"), ("h", "<i4"), ("growth", "<f8")]
+)
+RECORD_HEADER = struct.Struct("<dII")  # time the chunk went dormant, node count, respawn count
+RESPAWN_ENTRY = struct.Struct("<dB")  # absolute due time, kind
+
+CHUNK_LOADED = 0
+CHUNK_DORMANT = 1
+CHUNK_SPILLED = 2
+
+ChunkKey = tuple[int, int]
+
+
+def pack_chunk(nodes: np.ndarray, respawns: list[tuple[float, int]], time: float) -> bytes:
+    parts = [RECORD_HEADER.pack(time, len(nodes), len(respawns)), nodes.tobytes()]
+    parts.extend(RESPAWN_ENTRY.pack(due, kind) for due, kind in respawns)
+    return b"".join(parts)
+
+
+def unpack_chunk(data: bytes) -> tuple[np.ndarray, list[tuple[float, int]], float]:
+    time, n_nodes, n_respawns = RECORD_HEADER.unpack_from(data)
+    offset = RECORD_HEADER.size
+    nodes = np.frombuffer(data, dtype=NODE_DTYPE, count=n_nodes, offset=offset)
+    offset += nodes.nbytes
+    respawns = [RESPAWN_ENTRY.unpack_from(data, offset + i * RESPAWN_ENTRY.size) for i in range(n_respawns)]
+    return nodes, respawns, time
+
+
+class ChunkManager:
+    """Streams fixed-size world chunks in and out around the player.
+
+    A chunk's initial contents are a pure function of (seed, cx, cy), so chunks
+    that never changed are simply dropped on eviction and regenerated on the
+    next visit. A chunk changes when the player touches it, and also as soon
+    as it holds a tree that is still growing (regenerating would shrink it
+    back). Changed chunks are packed into a small record kept in an
+    in-memory LRU; the least recently used records spill to one file each
+    under `spill_dir`.
+    """
+
+    def __init__(
+        self,
+        sim,
+        seed: int,
+        chunk_size: int,
+        radius: int,
+        trees: int,
+        stones: int,
+        dormant_limit: int,
+        spill_dir: str,
+    ) -> None:
+        self.sim = sim
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.radius = radius
+        self.trees = trees
+        self.stones = stones
+        self.dormant_limit = dormant_limit
+        self.spill_dir = os.path.join(spill_dir, f"{seed:016x}")
+        self.loaded: set[ChunkKey] = set()
+        self.dirty: set[ChunkKey] = set()
+        self.dormant: OrderedDict[ChunkKey, bytes] = OrderedDict()
+        self.spilled: set[ChunkKey] = set()
+        self.center: ChunkKey | None = None
+        # (state, key, record) log for incremental saves; None while nobody is tracking.
+        self.changes: list[tuple[int, ChunkKey, bytes]] | None = None
+
+    def chunk_of(self, x: float, y: float) -> ChunkKey:
+        return (int(x // self.chunk_size), int(y // self.chunk_size))
+
+    def chunk_rect(self, key: ChunkKey) -> pygame.Rect:
+        size = self.chunk_size
+        return pygame.Rect(key[0] * size, key[1] * size, size, size)
+
+    def is_loaded(self, key: ChunkKey) -> bool:
+        return key in self.loaded
+
+    def mark_dirty(self, key: ChunkKey) -> None:
+        self.dirty.add(key)
+
+    def update(self, x: float, y: float) -> None:
+        center = self.chunk_of(x, y)
+        if center == self.center:
+            return
+        self.center = center
+
+        cx, cy = center
+        r = self.radius
+        wanted = {(cx + dx, cy + dy) for dy in range(-r, r + 1) for dx in range(-r, r + 1)}
+        # One chunk of hysteresis so walking along a border doesn't thrash.
+        for key in sorted(k for k in self.loaded if max(abs(k[0] - cx), abs(k[1] - cy)) > r + 1):
+            self.unload(key)
+        for key in sorted(wanted - self.loaded):
+            self.load(key)
+        self.sim.tree_index.shrink_bounds()
+        self.sim.stone_index.shrink_bounds()
+
+    def log(self, state: int, key: ChunkKey, record: bytes = b"") -> None:
+        if self.changes is not None:
+            self.changes.append((state, key, record))
+
+    def generate(self, key: ChunkKey) -> None:
+        sim = self.sim
+        rng = random.Random(f"{self.seed}:{key[0]}:{key[1]}")
+        sizes = [TREE_SIZE] * self.trees + [STONE_SIZE] * self.stones
+        spots = sim.placer.place_batch(rng, self.chunk_rect(key), sizes, [sim.home_keep_out])
+        for i, rect in enumerate(spots):
+            if rect is None:
+                continue
+            if i < self.trees:
+                growth = rng.uniform(0.55, 1.0)
+                sim.add_tree(rect, growth)
+                if growth < 1.0:
+                    self.dirty.add(key)
+            else:
+                sim.add_stone(rect)
+
+    def load(self, key: ChunkKey) -> None:
+        record = self.dormant.pop(key, None)
+        if record is None and key in self.spilled:
+            record = self.read_spilled(key)
+        self.loaded.add(key)
+        self.log(CHUNK_LOADED, key)
+        if record is None:
+            self.generate(key)
+            return
+
+        sim = self.sim
+        nodes, respawns, dormant_since = unpack_chunk(record)
+        for node in nodes:
+            rect = pygame.Rect(int(node["x"]), int(node["y"]), int(node["w"]), int(node["h"]))
+            if node["kind"] == KIND_TREE:
+                # Trees kept growing while nobody was looking.
+                growth = min(1.0, float(node["growth"]) + sim.tree_growth_rate * (sim.time - dormant_since))
+                sim.add_tree(rect, growth)
+            else:
+                sim.add_stone(rect)
+        for due, kind in respawns:
+            sim.schedule_respawn(due, kind, key)
+        self.dirty.add(key)
+
+    def unload(self, key: ChunkKey) -> None:
+        sim = self.sim
+        self.loaded.discard(key)
+        area = self.chunk_rect(key)
+        tree_ids = [i for i in sim.tree_index.query_rect(area) if self.owner(i) == key]
+        stone_ids = [i for i in sim.stone_index.query_rect(area) if self.owner(i) == key]
+        respawns = sim.take_respawns(key)
+
+        if key not in self.dirty and not respawns:
+            for tree_id in tree_ids:
+                sim.remove_tree(tree_id)
+            for stone_id in stone_ids:
+                sim.remove_stone(stone_id)
+            self.log(CHUNK_DORMANT, key)
+            return
+
+        store = sim.resources
+        ids = np.array(tree_ids + stone_ids, dtype=np.int64)
+        nodes = np.empty(len(ids), dtype=NODE_DTYPE)
+        for name in NODE_DTYPE.names:
+            nodes[name] = getattr(store, name)[ids]
+        for tree_id in tree_ids:
+            sim.remove_tree(tree_id)
+        for stone_id in stone_ids:
+            sim.remove_stone(stone_id)
+
+        record = pack_chunk(nodes, respawns, sim.time)
+        self.dirty.discard(key)
+        # Logged first: storing it may spill this very chunk, and that must come later in the log.
+        self.log(CHUNK_DORMANT, key, record)
+        self.store_dormant(key, record)
+
+    def owner(self, node_id: int) -> ChunkKey:
+        store = self.sim.resources
+        return self.chunk_of(int(store.x[node_id]), int(store.y[node_id]))
+
+    def store_dormant(self, key: ChunkKey, record: bytes) -> None:
+        self.dormant[key] = record
+        self.spilled.discard(key)
+        while len(self.dormant) > self.dormant_limit:
+            old_key, old_record = self.dormant.popitem(last=False)
+            self.spill(old_key, old_record)
+
+    def spill_path(self, key: ChunkKey) -> str:
+        return os.path.join(self.spill_dir, f"{key[0]}_{key[1]}.chunk")
+
+    def spill(self, key: ChunkKey, record: bytes) -> None:
+        try:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            with open(self.spill_path(key), "wb") as fh:
+                fh.write(record)
+        except OSError:
+            # Losing a far-away chunk's changes is better than stalling the game; it regenerates.
+            return
+        self.spilled.add(key)
+        self.log(CHUNK_SPILLED, key)
+
+    def read_spilled(self, key: ChunkKey) -> bytes | None:
+        self.spilled.discard(key)
+        try:
+            with open(self.spill_path(key), "rb") as fh:
+                return fh.read()
+        except OSError:
+            return None
+
+    def drain_changes(self) -> list[tuple[int, ChunkKey, bytes]]:
+        changes = self.changes or []
+        self.changes = []
+        return changes
+
+    def apply_change(self, state: int, key: ChunkKey, record: bytes) -> None:
+        # Replays bookkeeping only; the resource nodes themselves come from the store journal.
+        self.spilled.discard(key)
+        self.dormant.pop(key, None)
+        self.dirty.discard(key)
+        if state == CHUNK_LOADED:
+            self.loaded.add(key)
+            self.dirty.add(key)
+            return
+        self.loaded.discard(key)
+        if state == CHUNK_DORMANT and record:
+            self.dormant[key] = record
+        elif state == CHUNK_SPILLED:
+            self.spilled.add(key)
@@ -1,6 +1,38 @@
+import os
+
 WIDTH, HEIGHT = 900, 600
 WINDOW_TITLE = "Survival Game"
 FPS = 60
+TICK_RATE = 60
+SIM_DT = 1.0 / TICK_RATE
+MAX_FRAME_TIME = 0.25
+# Step the simulation on its own thread so slow frames don't slow the game down (main.py --threaded).
+SIM_THREADED = False
+# Frame profiler (F3 overlay): samples kept per section, overlay refresh, trace events kept for --profile-trace.
+PROFILE_WINDOW = 300
+PROFILE_OVERLAY_REFRESH = 0.25
+PROFILE_TRACE_EVENTS = 500_000
+PRISM_CACHE_SIZE = 256
+TEXT_CACHE_SIZE = 512
+# Processed (background-stripped, scaled) sprites are cached here between launches.
+SPRITE_CACHE_DIR = ".cache/sprites"
+SPRITE_ROOT = "assets/sprites"
+# Per sprite folder: (background tolerance, scaled size).
+SPRITE_SPECS = {
+    "player": (36, (96, 96)),
+    "trees": (36, (96, 128)),
+    "stones": (36, (72, 56)),
+    "house": (36, (140, 140)),
+}
+ASSET_WORKERS = 2
+SAVE_PATH = "saves/game.sav"
+# Autosave appends a small delta this often; the journal is folded into a new snapshot once it gets large.
+AUTOSAVE_SECONDS = 5.0
+JOURNAL_COMPACT_BYTES = 256 * 1024
+# Extra screen-space border kept when culling, so tall prisms and sprites don't pop at the edges.
+CULL_MARGIN = 120
+# How far (in screen pixels) the camera may scroll before the cached ground layer is redrawn.
+BACKGROUND_PAD = 200
 
 START_POS = (420, 280)
 PLAYER_WIDTH = 40
@@ -12,8 +44,20 @@ HOME_AREA_SIZE = (110, 110)
 
 TREE_SIZE = (50, 70)
 STONE_SIZE = (50, 40)
-INITIAL_TREE_COUNT = 5
-INITIAL_STONE_COUNT = 5
+# The world is generated in square chunks around the player; counts are per chunk.
+CHUNK_SIZE = 512
+CHUNK_LOAD_RADIUS = 2
+CHUNK_TREE_COUNT = 3
+CHUNK_STONE_COUNT = 3
+# Changed chunks kept in memory after they scroll away; older ones are written to CHUNK_SPILL_DIR.
+CHUNK_DORMANT_LIMIT = 256
+CHUNK_SPILL_DIR = "saves/chunks"
+SPATIAL_CELL_SIZE = 128
+# New trees/stones: minimum distance between spawn spots (must exceed the largest node's diagonal so
+# spots can't overlap), distance kept from chunk edges, and the clear ring kept around the home area.
+SPAWN_SPACING = 100
+SPAWN_MARGIN = 20
+HOME_KEEP_OUT = 70
 
 TREE_RESPAWN_SECONDS = 6.0
 STONE_RESPAWN_SECONDS = 7.0
@@ -24,10 +68,11 @@ MINE_TIME_SECONDS = 8.0
 
 RARE_DROP_CHANCE = 0.25
 
-AXE_COST_WOOD = 1
-PICK_COST_WOOD = 2
-PICK_COST_STONE = 0
+# Items, recipes (costs) and quest kinds (labels, target ranges) are defined here; the path is
+# relative to this file so the game also starts from outside the repo folder.
+DEFINITIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "definitions.json")
 
 QUEST_TEXT = 'Quest: Build a house and get "2 rare stones".'
 NEW_QUEST_TEXT = 'New Quest: Make "2 fire" and return home.'
 QUEST_COUNT = 5
+FIREWORK_BURST_SIZE = 24
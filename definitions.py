@@ -0,0 +1,259 @@
+import dataclasses
+import json
+import string
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from config import DEFINITIONS_PATH
+from events import EVENT_TYPES
+from inventory import STAT_NAMES
+from tunables import Tunables
+
+DEFINITIONS_VERSION = 1
+ITEM_KINDS = ("resource", "crafted", "tool", "building")
+# Recipe messages are formatted with the recipe's cost text and the simulation's tunables.
+MESSAGE_FIELDS = {"cost"} | {f.name for f in dataclasses.fields(Tunables)}
+# Tools and buildings are owned (yes/no) rather than counted.
+OWNED_KINDS = ("tool", "building")
+
+
+class DefinitionError(ValueError):
+    pass
+
+
+@dataclass
+class Definitions:
+    """Items, recipes and quests compiled into tables indexed by integer id.
+
+    Every per-recipe and per-quest property lives in its own list, so handlers
+    look things up with `table[id]` instead of branching on names. Items in
+    costs, outputs and quest conditions are item ids too, ready for `Inventory`.
+    """
+
+    item_names: list[str] = field(default_factory=list)
+    item_ids: dict[str, int] = field(default_factory=dict)
+    item_labels: list[str] = field(default_factory=list)
+    item_owned: list[bool] = field(default_factory=list)
+    item_subtypes: list[tuple[str, ...]] = field(default_factory=list)
+
+    recipe_names: list[str] = field(default_factory=list)
+    recipe_ids: dict[str, int] = field(default_factory=dict)
+    recipe_actions: list[str] = field(default_factory=list)
+    recipe_costs: list[tuple[tuple[int, int], ...]] = field(default_factory=list)
+    recipe_cost_text: list[str] = field(default_factory=list)
+    recipe_outputs: list[int] = field(default_factory=list)
+    recipe_amounts: list[int] = field(default_factory=list)
+    recipe_unique: list[bool] = field(default_factory=list)
+    recipe_at_home: list[bool] = field(default_factory=list)
+    recipe_stats: list[str | None] = field(default_factory=list)
+    recipe_events: list[type | None] = field(default_factory=list)
+    recipe_messages: list[dict[str, str]] = field(default_factory=list)
+    menu_recipes: list[int] = field(default_factory=list)
+
+    quest_names: list[str] = field(default_factory=list)
+    quest_ids: dict[str, int] = field(default_factory=dict)
+    quest_labels: list[str] = field(default_factory=list)
+    quest_targets: list[tuple[int, int]] = field(default_factory=list)
+    quest_events: list[type] = field(default_factory=list)
+    quest_unless_owned: list[int | None] = field(default_factory=list)
+
+
+def require(condition: bool, where: str, problem: str) -> None:
+    if not condition:
+        raise DefinitionError(f"{where}: {problem}")
+
+
+def event_type(name: object, where: str) -> type:
+    require(isinstance(name, str) and name in EVENT_TYPES, where, f"unknown event {name!r}")
+    return EVENT_TYPES[name]
+
+
+def compile_items(defs: Definitions, items: object) -> None:
+    require(isinstance(items, dict) and items, "items", "must be a non-empty object")
+    for name, item in items.items():
+        where = f"items.{name}"
+        require(isinstance(item, dict), where, "must be an object")
+        kind = item.get("kind")
+        require(kind in ITEM_KINDS, where, f"kind must be one of {ITEM_KINDS}")
+        defs.item_ids[name] = len(defs.item_names)
+        defs.item_names.append(name)
+        defs.item_labels.append(str(item.get("label", name)))
+        defs.item_owned.append(kind in OWNED_KINDS)
+        subtypes = item.get("subtypes", [])
+        require(
+            isinstance(subtypes, list) and all(isinstance(sub, str) for sub in subtypes),
+            where,
+            "subtypes must be a list of names",
+        )
+        require(not subtypes or kind not in OWNED_KINDS, where, "owned items can't have subtypes")
+        defs.item_subtypes.append(tuple(subtypes))
+
+
+def compile_recipes(defs: Definitions, recipes: object, cost_overrides: dict[str, dict[str, int]]) -> None:
+    require(isinstance(recipes, list), "recipes", "must be a list")
+    actions: set[str] = set()
+    for index, recipe in enumerate(recipes):
+        where = f"recipes[{index}]"
+        require(isinstance(recipe, dict), where, "must be an object")
+        name = recipe.get("id")
+        require(isinstance(name, str) and name not in defs.recipe_ids, where, f"missing or duplicate id {name!r}")
+        where = f"recipes.{name}"
+
+        action = recipe.get("action", name)
+        require(action not in actions, where, f"action {action!r} is used twice")
+        actions.add(action)
+
+        cost = recipe.get("cost", {})
+        require(isinstance(cost, dict), where, "cost must be an object of item amounts")
+        cost = {**cost, **cost_overrides.get(name, {})}
+        for item, amount in cost.items():
+            require(item in defs.item_ids, where, f"cost uses unknown item {item!r}")
+            require(not defs.item_owned[defs.item_ids[item]], where, f"cost uses {item!r}, which is owned, not counted")
+            require(
+                isinstance(amount, int) and not isinstance(amount, bool) and amount >= 0,
+                where,
+                f"cost of {item!r} must be a whole number >= 0",
+            )
+        costs = tuple((defs.item_ids[item], amount) for item, amount in cost.items() if amount > 0)
+
+        output = recipe.get("output")
+        require(output in defs.item_ids, where, f"unknown output item {output!r}")
+        owned = defs.item_owned[defs.item_ids[output]]
+        unique = bool(recipe.get("unique", owned))
+        at_home = bool(recipe.get("at_home", False))
+
+        amount = recipe.get("amount", 1)
+        require(
+            isinstance(amount, int) and not isinstance(amount, bool) and amount > 0,
+            where,
+            "amount must be a whole number > 0",
+        )
+
+        messages = recipe.get("messages", {})
+        require(
+            isinstance(messages, dict) and all(isinstance(text, str) for text in messages.values()),
+            where,
+            "messages must be an object of strings",
+        )
+        needed = ["done", "missing"] + (["owned"] if unique else []) + (["away"] if at_home else [])
+        for key in needed:
+            require(isinstance(messages.get(key), str), where, f"needs a {key!r} message")
+        for key, text in messages.items():
+            try:
+                fields = {f for _, f, _, _ in string.Formatter().parse(text) if f is not None}
+            except ValueError as exc:
+                raise DefinitionError(f"{where}: {key!r} message: {exc}") from exc
+            unknown = fields - MESSAGE_FIELDS
+            require(not unknown, where, f"{key!r} message uses unknown fields {sorted(unknown)}")
+
+        stat = recipe.get("stat")
+        require(stat is None or stat in STAT_NAMES, where, f"unknown stat {stat!r}")
+
+        event = recipe.get("event")
+        event_cls = event_type(event, where) if event is not None else None
+        if event_cls is not None:
+            require(not dataclasses.fields(event_cls), where, f"event {event!r} carries data, recipes can't publish it")
+
+        recipe_id = len(defs.recipe_names)
+        defs.recipe_ids[name] = recipe_id
+        defs.recipe_names.append(name)
+        defs.recipe_actions.append(action)
+        defs.recipe_costs.append(costs)
+        defs.recipe_cost_text.append(
+            " + ".join(f"{amount} {defs.item_labels[item_id]}" for item_id, amount in costs) or "free"
+        )
+        defs.recipe_outputs.append(defs.item_ids[output])
+        defs.recipe_amounts.append(amount)
+        defs.recipe_unique.append(unique)
+        defs.recipe_at_home.append(at_home)
+        defs.recipe_stats.append(stat)
+        defs.recipe_events.append(event_cls)
+        defs.recipe_messages.append(dict(messages))
+        if recipe.get("menu", False):
+            defs.menu_recipes.append(recipe_id)
+
+    for name in cost_overrides:
+        require(name in defs.recipe_ids, "recipe cost overrides", f"unknown recipe {name!r}")
+
+
+def compile_quests(defs: Definitions, quests: object, target_overrides: dict[str, tuple[int, int]]) -> None:
+    require(isinstance(quests, list) and quests, "quests", "must be a non-empty list")
+    for index, quest in enumerate(quests):
+        where = f"quests[{index}]"
+        require(isinstance(quest, dict), where, "must be an object")
+        name = quest.get("id")
+        require(isinstance(name, str) and name not in defs.quest_ids, where, f"missing or duplicate id {name!r}")
+        where = f"quests.{name}"
+
+        label = quest.get("label")
+        require(isinstance(label, str), where, "needs a label")
+        fields = {f for _, f, _, _ in string.Formatter().parse(label) if f is not None}
+        require(fields <= {"target"}, where, "label may only use {target}")
+
+        target = target_overrides.get(name, quest.get("target", (1, 1)))
+        require(
+            isinstance(target, (list, tuple))
+            and len(target) == 2
+            and all(isinstance(n, int) and not isinstance(n, bool) for n in target),
+            where,
+            f"target must be two whole numbers [min, max], not {target!r}",
+        )
+        low, high = target
+        require(1 <= low <= high, where, f"target range {low}..{high} must have 1 <= min <= max")
+
+        unless_owned = quest.get("unless_owned")
+        if unless_owned is not None:
+            require(
+                unless_owned in defs.item_ids and defs.item_owned[defs.item_ids[unless_owned]],
+                where,
+                f"unless_owned must name a tool or building, not {unless_owned!r}",
+            )
+
+        defs.quest_ids[name] = len(defs.quest_names)
+        defs.quest_names.append(name)
+        defs.quest_labels.append(label)
+        defs.quest_targets.append((low, high))
+        defs.quest_events.append(event_type(quest.get("event"), where))
+        defs.quest_unless_owned.append(defs.item_ids[unless_owned] if unless_owned is not None else None)
+
+    for name in target_overrides:
+        require(name in defs.quest_ids, "quest target overrides", f"unknown quest {name!r}")
+
+
+def compile_definitions(
+    raw: dict,
+    target_overrides: dict[str, tuple[int, int]] | None = None,
+    cost_overrides: dict[str, dict[str, int]] | None = None,
+) -> Definitions:
+    require(isinstance(raw, dict), "definitions", "must be an object")
+    require(raw.get("version") == DEFINITIONS_VERSION, "definitions", f"version must be {DEFINITIONS_VERSION}")
+    defs = Definitions()
+    compile_items(defs, raw.get("items"))
+    compile_recipes(defs, raw.get("recipes", []), cost_overrides or {})
+    compile_quests(defs, raw.get("quests"), target_overrides or {})
+    return defs
+
+
+@lru_cache(maxsize=None)
+def read_definitions(path: str = DEFINITIONS_PATH) -> dict:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, json.JSONDecodeError) as exc:
+        raise DefinitionError(f"{path}: {exc}") from exc
+
+
+@lru_cache(maxsize=None)
+def load_definitions(path: str = DEFINITIONS_PATH) -> Definitions:
+    # Compiled once per process and shared; treat the result as read-only.
+    return compile_definitions(read_definitions(path))
+
+
+def definitions_with_overrides(
+    target_overrides: dict[str, tuple[int, int]],
+    cost_overrides: dict[str, dict[str, int]],
+    path: str = DEFINITIONS_PATH,
+) -> Definitions:
+    if not target_overrides and not cost_overrides:
+        return load_definitions(path)
+    return compile_definitions(read_definitions(path), target_overrides, cost_overrides)
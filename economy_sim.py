@@ -0,0 +1,264 @@
+import argparse
+import ast
+import itertools
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pygame
+
+from config import SIM_DT
+from simulation import SimInput, Simulation
+from tunables import Tunables
+from world import is_near
+
+WOOD_QUESTS = ("collect_wood", "cut_trees")
+SEARCH_RADII = (300, 700, 1500, 3000)
+
+
+def sign(value: float, dead_zone: float = 3) -> int:
+    if value > dead_zone:
+        return 1
+    if value < -dead_zone:
+        return -1
+    return 0
+
+
+class QuestBot:
+    """Scripted player that works through the quest chain as directly as it can.
+
+    It only sends the same per-tick SimInput a keyboard player would, so the
+    timings it produces include walking, action times and respawn waits.
+    """
+
+    def __init__(self, sim: Simulation) -> None:
+        self.sim = sim
+        self.target_id: int | None = None
+        self.target_mode: str | None = None
+        self.skip: set[int] = set()
+
+    def next_input(self) -> SimInput:
+        sim = self.sim
+        if sim.action_mode is not None:
+            return SimInput()
+        if sim.quest_ready_to_turn_in:
+            return SimInput(actions=["home"])
+        if sim.current_quest is None:
+            return SimInput()
+
+        kind = sim.current_quest.kind
+        at_home = sim.player.colliderect(sim.home_area)
+
+        if kind == "go_home":
+            return SimInput(actions=["home"])
+        if kind == "build_house":
+            if self.can_craft("house"):
+                return SimInput(actions=["build" if at_home else "home"])
+            if self.short_of("house", "wood+branches"):
+                return self.gather("cut")
+        elif kind == "craft_fire":
+            if self.can_craft("fire"):
+                return SimInput(actions=["fire"])
+            if self.short_of("fire", "wood+branches"):
+                return self.gather("cut")
+        elif kind in WOOD_QUESTS:
+            if at_home and not sim.inventory.has(sim.item_axe) and self.can_craft("axe"):
+                return SimInput(actions=["craft_axe"])
+            return self.gather("cut")
+
+        # Everything left needs stone, and stone needs a pickaxe.
+        if not sim.inventory.has(sim.item_pickaxe):
+            if not self.can_craft("pickaxe"):
+                return self.gather("cut")
+            return SimInput(actions=["craft_pickaxe" if at_home else "home"])
+        return self.gather("mine")
+
+    def can_craft(self, recipe: str) -> bool:
+        return self.sim.can_afford(self.sim.defs.recipe_ids[recipe])
+
+    def short_of(self, recipe: str, item: str) -> bool:
+        defs = self.sim.defs
+        item_id = defs.item_ids[item]
+        needed = dict(defs.recipe_costs[defs.recipe_ids[recipe]]).get(item_id, 0)
+        return self.sim.inventory.count(item_id) < needed
+
+    def gather(self, mode: str) -> SimInput:
+        sim = self.sim
+        if self.target_mode != mode or not self.target_valid():
+            self.target_mode = mode
+            self.target_id = self.find_target(mode)
+        if self.target_id is None:
+            return SimInput()  # Nothing in reach yet; wait for a respawn or regrowth.
+
+        target = self.target_rect()
+        if is_near(sim.player, target, distance=20):
+            # If the action doesn't start (e.g. a growing tree is closer), try another target.
+            self.skip.add(self.target_id)
+            self.target_id = None
+            return SimInput(actions=[mode])
+        return SimInput(sign(target.centerx - sim.player.centerx), sign(target.centery - sim.player.centery))
+
+    def target_valid(self) -> bool:
+        sim = self.sim
+        if self.target_id is None:
+            return False
+        if self.target_mode == "cut":
+            return self.target_id in sim.tree_index and sim.is_tree_mature(self.target_id)
+        return self.target_id in sim.stone_index
+
+    def target_rect(self) -> pygame.Rect:
+        if self.target_mode == "cut":
+            return self.sim.get_tree_rect(self.target_id)
+        return self.sim.resources.rect(self.target_id)
+
+    def find_target(self, mode: str) -> int | None:
+        sim = self.sim
+        index = sim.tree_index if mode == "cut" else sim.stone_index
+        x, y = sim.player.center
+        for radius in SEARCH_RADII:
+            best = None
+            best_d = 0
+            for node_id in index.query_radius(x, y, radius):
+                if node_id in self.skip or (mode == "cut" and not sim.is_tree_mature(node_id)):
+                    continue
+                rect = index.rects[node_id]
+                d = (rect.centerx - x) ** 2 + (rect.centery - y) ** 2
+                if best is None or d < best_d:
+                    best, best_d = node_id, d
+            if best is not None:
+                return best
+        self.skip.clear()
+        return None
+
+
+def play_chain(seed: int, overrides: dict[str, object], max_seconds: float) -> dict:
+    sim = Simulation(seed, Tunables.from_overrides(overrides))
+    bot = QuestBot(sim)
+    durations: list[tuple[str, float]] = []
+    quest = sim.current_quest
+    started = sim.time
+    recorded = False
+
+    # Workers play the same seeds at once; each playthrough spills chunks to its own folder, not the save.
+    with tempfile.TemporaryDirectory() as spill_dir:
+        sim.chunks.spill_dir = spill_dir
+        while sim.completed_quests < sim.total_quests and sim.time < max_seconds:
+            sim.step(SIM_DT, bot.next_input())
+            if sim.current_quest is not quest:
+                quest = sim.current_quest
+                started = sim.time
+                recorded = False
+            if sim.quest_ready_to_turn_in and not recorded and quest is not None:
+                durations.append((quest.kind, sim.time - started))
+                recorded = True
+                bot.skip.clear()
+
+    return {
+        "durations": durations,
+        "finished": sim.completed_quests >= sim.total_quests,
+        "time": sim.time,
+    }
+
+
+def run_batch(overrides: dict[str, object], seeds: list[int], max_seconds: float) -> list[dict]:
+    return [play_chain(seed, overrides, max_seconds) for seed in seeds]
+
+
+def parse_grid(specs: list[str]) -> dict[str, list[object]]:
+    # NAME=v1,v2,...; each value is a Python literal.
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        grid[name.strip().upper()] = [ast.literal_eval(v) for v in values.split(",")]
+    return grid
+
+
+def parse_sets(specs: list[str]) -> dict[str, object]:
+    return {name.strip().upper(): ast.literal_eval(value) for name, _, value in (s.partition("=") for s in specs)}
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    arr = np.asarray(values, dtype=np.float64)
+    p50, p90 = np.percentile(arr, [50, 90])
+    return {"n": len(arr), "mean": float(arr.mean()), "p50": float(p50), "p90": float(p90), "max": float(arr.max())}
+
+
+def combo_label(combo: dict[str, object]) -> str:
+    return " ".join(f"{name}={value}" for name, value in combo.items()) or "(defaults)"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sweep quest-economy tunables with scripted-bot playthroughs.")
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2", help="config value to sweep")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE", help="fixed config override")
+    parser.add_argument("--runs", type=int, default=200, help="playthroughs per grid point")
+    parser.add_argument("--max-minutes", type=float, default=30.0, help="game-time limit per playthrough")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--batch", type=int, default=10, help="playthroughs per worker task")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="FILE", help="also write the summary as JSON")
+    args = parser.parse_args()
+
+    fixed = parse_sets(args.set)
+    grid = parse_grid(args.grid)
+    combos = [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+    for combo in combos:
+        Tunables.from_overrides({**fixed, **combo})  # Fail on typos before starting any workers.
+
+    results: dict[int, list[dict]] = {i: [] for i in range(len(combos))}
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {}
+        for i, combo in enumerate(combos):
+            seeds = [args.seed + n for n in range(args.runs)]
+            for b in range(0, len(seeds), args.batch):
+                future = pool.submit(run_batch, {**fixed, **combo}, seeds[b : b + args.batch], args.max_minutes * 60)
+                futures[future] = i
+        for future in as_completed(futures):
+            results[futures[future]].extend(future.result())
+    elapsed = time.perf_counter() - started
+    total = sum(len(r) for r in results.values())
+    print(f"{total} playthroughs over {len(combos)} grid points in {elapsed:.1f}s ({args.workers} workers)\n")
+
+    report = []
+    for i, combo in enumerate(combos):
+        runs = results[i]
+        finished = [run["time"] for run in runs if run["finished"]]
+        by_kind: dict[str, list[float]] = {}
+        for run in runs:
+            for kind, seconds in run["durations"]:
+                by_kind.setdefault(kind, []).append(seconds)
+
+        print(f"{combo_label(combo)}: {len(finished)}/{len(runs)} chains finished")
+        if finished:
+            chain = summarize(finished)
+            print(f"  whole chain      p50 {chain['p50']:7.1f}s  p90 {chain['p90']:7.1f}s  max {chain['max']:7.1f}s")
+        print(f"  {'quest kind':<15} {'n':>5} {'mean':>8} {'p50':>8} {'p90':>8} {'max':>8}")
+        kinds = {}
+        for kind in sorted(by_kind):
+            stats = kinds[kind] = summarize(by_kind[kind])
+            print(
+                f"  {kind:<15} {stats['n']:>5} {stats['mean']:>7.1f}s {stats['p50']:>7.1f}s"
+                f" {stats['p90']:>7.1f}s {stats['max']:>7.1f}s"
+            )
+        print()
+        report.append(
+            {
+                "overrides": {**fixed, **combo},
+                "runs": len(runs),
+                "finished": len(finished),
+                "chain": summarize(finished) if finished else None,
+                "quests": kinds,
+            }
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2, default=list)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True, slots=True)
+class WoodCollected:
+    wood_type: str
+
+
+@dataclass(frozen=True, slots=True)
+class StoneCollected:
+    stone_type: str
+
+
+@dataclass(frozen=True, slots=True)
+class RareCollected:
+    rare_type: str
+
+
+@dataclass(frozen=True, slots=True)
+class FireMade:
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class TreeCut:
+    tree_id: int
+
+
+@dataclass(frozen=True, slots=True)
+class StoneMined:
+    stone_id: int
+
+
+@dataclass(frozen=True, slots=True)
+class ReturnedHome:
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class HouseBuilt:
+    pass
+
+
+# Event classes by name, for data files that refer to them.
+EVENT_TYPES: dict[str, type] = {
+    cls.__name__: cls
+    for cls in (
+        WoodCollected,
+        StoneCollected,
+        RareCollected,
+        FireMade,
+        TreeCut,
+        StoneMined,
+        ReturnedHome,
+        HouseBuilt,
+    )
+}
+
+
+class EventBus:
+    """Synchronous publish/subscribe keyed by event class.
+
+    Handlers run immediately inside `publish`, in subscription order. They may
+    unsubscribe themselves (or others) while an event is being delivered.
+    """
+
+    def __init__(self) -> None:
+        self.handlers: dict[type, dict[int, Callable[[Any], None]]] = {}
+        self.subscriptions: dict[int, type] = {}
+        self.next_token = 0
+
+    def subscribe(self, event_type: type, handler: Callable[[Any], None]) -> int:
+        token = self.next_token
+        self.next_token += 1
+        self.handlers.setdefault(event_type, {})[token] = handler
+        self.subscriptions[token] = event_type
+        return token
+
+    def unsubscribe(self, token: int | None) -> None:
+        event_type = self.subscriptions.pop(token, None) if token is not None else None
+        if event_type is not None:
+            del self.handlers[event_type][token]
+
+    def publish(self, event: object) -> None:
+        handlers = self.handlers.get(type(event))
+        if handlers:
+            for handler in list(handlers.values()):
+                handler(event)
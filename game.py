@@ -1,41 +1,85 @@
-import random
 import sys
-from collections import deque
+import time
 
+import numpy as np
 import pygame
 
 from config import (
-    AXE_COST_WOOD,
-    CUT_TIME_SECONDS,
-    CUT_TIME_WITH_AXE,
+    ASSET_WORKERS,
+    AUTOSAVE_SECONDS,
+    BACKGROUND_PAD,
+    CULL_MARGIN,
     FPS,
     HEIGHT,
-    HOME_AREA_OFFSET,
-    HOME_AREA_SIZE,
-    INITIAL_STONE_COUNT,
-    INITIAL_TREE_COUNT,
-    MINE_TIME_SECONDS,
-    PICK_COST_STONE,
-    PICK_COST_WOOD,
-    PLAYER_HEIGHT,
-    PLAYER_SPEED,
-    PLAYER_WIDTH,
-    QUEST_COUNT,
-    RARE_DROP_CHANCE,
-    START_POS,
-    STONE_RESPAWN_SECONDS,
-    STONE_SIZE,
-    TREE_RESPAWN_SECONDS,
-    TREE_SIZE,
+    JOURNAL_COMPACT_BYTES,
+    MAX_FRAME_TIME,
+    PRISM_CACHE_SIZE,
+    PROFILE_OVERLAY_REFRESH,
+    PROFILE_TRACE_EVENTS,
+    PROFILE_WINDOW,
+    SAVE_PATH,
+    SIM_DT,
+    SIM_THREADED,
+    SPRITE_CACHE_DIR,
+    SPRITE_ROOT,
+    SPRITE_SPECS,
     WIDTH,
     WINDOW_TITLE,
 )
-from ui import draw_craft_menu, draw_marker_line, draw_panel
-from world import is_near, nearest_rect, random_spawn_rect
+from asset_manager import AssetManager
+from hud import (
+    ActionProgress,
+    CraftMenu,
+    DetailsPanel,
+    HelpBar,
+    HomeButton,
+    Hud,
+    InventoryBar,
+    MessageBox,
+    ProfileOverlay,
+    QuestBanner,
+    UiState,
+)
+from profiler import FrameProfiler
+from render import BackgroundLayer, DepthList, PrismCache
+from replay import ReplayRecorder
+from savegame import AutoSaver, SaveError, load_game
+from simthread import SimulationThread
+from simulation import SimInput, Simulation
+from snapshot import capture
+from ui import draw_marker_line, render_profile_overlay
+
+# Depth-list handle for the house; resource ids are never negative.
+HOUSE_HANDLE = -1
+# Stages timed by the frame profiler; nested ones (update_depth_list) show up inside their parent in traces.
+PROFILED_GAME_STAGES = [
+    "handle_events",
+    "update_view",
+    "update_depth_list",
+    "draw_world",
+    "draw_particles",
+    "draw_markers",
+]
+PROFILED_HUD_STAGES = ["refresh", "blit", "restore"]
+PROFILED_SIM_STAGES = [
+    "step",
+    "apply_actions",
+    "update_movement",
+    "update_actions",
+    "update_timers",
+    "update_tree_growth",
+    "update_celebration",
+]
 
 
 class Game:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        seed: int | None = None,
+        record_path: str | None = None,
+        threaded: bool = SIM_THREADED,
+        trace_path: str | None = None,
+    ) -> None:
         pygame.init()
 
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
@@ -45,141 +89,109 @@ class Game:
         self.small_font = pygame.font.SysFont(None, 22)
         self.iso_scale_x = 0.9
         self.iso_scale_y = 0.45
-        self.player_sprite: pygame.Surface | None = None
-        self.load_player_sprite()
-
-        self.player = pygame.Rect(START_POS[0], START_POS[1], PLAYER_WIDTH, PLAYER_HEIGHT)
-        self.home_area = pygame.Rect(
-            START_POS[0] - HOME_AREA_OFFSET[0],
-            START_POS[1] - HOME_AREA_OFFSET[1],
-            HOME_AREA_SIZE[0],
-            HOME_AREA_SIZE[1],
+        self.prism_cache = PrismCache(self.iso_scale_x, self.iso_scale_y, PRISM_CACHE_SIZE)
+        self.depth_list = DepthList()
+        self.background = BackgroundLayer(
+            (WIDTH, HEIGHT),
+            (WIDTH / 2, HEIGHT * 0.48),
+            self.iso_scale_x,
+            self.iso_scale_y,
+            (34, 139, 34),
+            BACKGROUND_PAD,
         )
+        self.assets = AssetManager(SPRITE_ROOT, SPRITE_SPECS, SPRITE_CACHE_DIR, ASSET_WORKERS)
+        self.assets.preload()
+
+        # Seeded and recorded sessions start from a fresh world and leave the save file alone.
+        self.recorder: ReplayRecorder | None = None
+        self.saver: AutoSaver | None = None
+        if record_path is not None or seed is not None:
+            self.sim = Simulation(seed)
+            if record_path is not None:
+                self.recorder = ReplayRecorder(record_path, self.sim.seed)
+        else:
+            self.sim = self.load_or_new_game()
+            self.saver = AutoSaver(self.sim, SAVE_PATH, AUTOSAVE_SECONDS, JOURNAL_COMPACT_BYTES)
+        self.pending_actions: list[str] = []
+        # Everything is drawn from this snapshot, never from the live simulation.
+        self.view = capture(self.sim)
+        self.visible: dict[int, int] = {}  # depth-list handle -> snapshot row, rebuilt each frame
+        self.defs = self.sim.defs
+        self.sim_thread: SimulationThread | None = None
+        if threaded:
+            self.sim_thread = SimulationThread(self.sim, self.before_step, self.after_steps)
+        # Interpolated player rect/camera used for drawing between fixed simulation ticks.
+        self.player = self.sim.player.copy()
+        self.camera = (float(self.player.centerx), float(self.player.centery))
+        home = self.sim.home_area
+        self.house_rect = pygame.Rect(home.x + 15, home.y + 15, 70, 70)
+        self.background.set_shape("home", home, (20, 110, 20), 2)
 
-        self.trees = [
-            random_spawn_rect(WIDTH, HEIGHT, self.home_area, TREE_SIZE[0], TREE_SIZE[1])
-            for _ in range(INITIAL_TREE_COUNT)
-        ]
-        self.tree_growth = [random.uniform(0.55, 1.0) for _ in range(INITIAL_TREE_COUNT)]
-        self.tree_mature_threshold = 0.95
-        self.tree_growth_rate = 0.06
-        self.stones = [
-            random_spawn_rect(WIDTH, HEIGHT, self.home_area, STONE_SIZE[0], STONE_SIZE[1])
-            for _ in range(INITIAL_STONE_COUNT)
-        ]
-        self.respawn_queue: list[dict[str, float | str]] = []
-
-        self.inventory: dict[str, int | bool] = {
-            "wood+branches": 0,
-            "stone": 0,
-            "rare_stone": 0,
-            "axe": False,
-            "pickaxe": False,
-            "fire": 0,
-        }
-        self.resource_types: dict[str, dict[str, int]] = {
-            "wood+branches": {"oak": 0, "pine": 0},
-            "stone": {"granite": 0, "limestone": 0},
-            "rare_stone": {"ruby": 0, "sapphire": 0},
-        }
-
-        self.house_built = False
-        self.stats = {
-            "wood_collected": 0,
-            "stone_collected": 0,
-            "rare_collected": 0,
-            "fires_made": 0,
-            "trees_cut": 0,
-            "stones_mined": 0,
-            "home_returns": 0,
-        }
-        self.total_quests = QUEST_COUNT
-        self.completed_quests = 0
-        self.quest_ready_to_turn_in = False
-        self.last_quest_kind: str | None = None
-        self.current_quest: dict[str, int | str] | None = None
-        self.celebration_active = False
-        self.flowers: list[dict[str, float | int]] = []
-        self.firework_particles: list[dict[str, float | tuple[int, int, int]]] = []
-        self.firework_timer = 0.0
-        self.assign_next_quest()
-
-        self.action_mode: str | None = None
-        self.action_timer = 0.0
-        self.action_target_index: int | None = None
-
-        self.message = ""
-        self.message_timer = 0.0
-
-        self.inv_item_rects: dict[str, pygame.Rect] = {}
         self.selected_panel: str | None = None
 
         self.home_button = pygame.Rect(10, HEIGHT - 60, 60, 50)
-        self.craft_menu_open = False
-        self.craft_panel = pygame.Rect(10, 60, 310, 170)
-        self.craft_btn_axe = pygame.Rect(20, 100, 290, 40)
-        self.craft_btn_pick = pygame.Rect(20, 145, 290, 40)
-
-    def load_player_sprite(self) -> None:
-        sprite_path = "assets/sprites/player/player.png"
+        # One button per menu recipe in data/definitions.json.
+        menu = self.defs.menu_recipes
+        self.craft_panel = pygame.Rect(10, 60, 310, 80 + 45 * len(menu))
+        self.craft_buttons = [(recipe_id, pygame.Rect(20, 100 + 45 * i, 290, 40)) for i, recipe_id in enumerate(menu)]
+
+        self.inventory_bar = InventoryBar(self.font, self.small_font, self.defs)
+        self.hud = Hud(
+            [
+                self.inventory_bar,
+                QuestBanner(self.font),
+                HelpBar(self.small_font, self.defs),
+                MessageBox(self.font),
+                ActionProgress(self.font),
+                HomeButton(self.font, self.home_button),
+                DetailsPanel(self.font, self.small_font, self.defs),
+                CraftMenu(self.font, self.small_font, self.craft_panel, self.craft_buttons, self.defs),
+                ProfileOverlay(),
+            ]
+        )
+        # Copy of the last world picture without the HUD, for repainting behind changed widgets.
+        self.world_layer = pygame.Surface((WIDTH, HEIGHT))
+        self.last_world_state: tuple | None = None
+
+        self.trace_path = trace_path
+        self.profiler = FrameProfiler(PROFILE_WINDOW, PROFILE_TRACE_EVENTS if trace_path is not None else None)
+        self.profiler.instrument(self, PROFILED_GAME_STAGES)
+        self.profiler.instrument(self.hud, PROFILED_HUD_STAGES, prefix="hud.")
+        self.profiler.instrument(self.sim, PROFILED_SIM_STAGES, prefix="sim.")
+        self.profiler.instrument(self.sim.chunks, ["update"], prefix="sim.chunks.")
+        self.show_profile = False
+        self.profile_overlay: pygame.Surface | None = None
+        self.profile_refresh_at = 0.0
+
+    def load_or_new_game(self) -> Simulation:
         try:
-            sprite = pygame.image.load(sprite_path).convert_alpha()
-            sprite = self.remove_edge_background(sprite, tolerance=36)
-            self.player_sprite = pygame.transform.smoothscale(sprite, (96, 96))
-        except (pygame.error, FileNotFoundError):
-            self.player_sprite = None
-
-    def remove_edge_background(self, sprite: pygame.Surface, tolerance: int = 36) -> pygame.Surface:
-        width, height = sprite.get_size()
-        if width == 0 or height == 0:
-            return sprite
-
-        bg = sprite.get_at((0, 0))
-
-        def similar(c: pygame.Color) -> bool:
-            return (
-                abs(int(c.r) - int(bg.r)) <= tolerance
-                and abs(int(c.g) - int(bg.g)) <= tolerance
-                and abs(int(c.b) - int(bg.b)) <= tolerance
-            )
+            sim = load_game(SAVE_PATH)
+        except (SaveError, OSError):
+            sim = Simulation()
+            sim.show_message("Save file unreadable, starting a new game.", seconds=3.0)
+            return sim
+        if sim is None:
+            return Simulation()
+        sim.show_message("Welcome back!")
+        return sim
+
+    def on_sim_thread(self, fn) -> None:
+        # Work that touches the simulation must not race the simulation thread.
+        if self.sim_thread is not None:
+            self.sim_thread.call(fn)
+        else:
+            fn()
 
-        visited = bytearray(width * height)
-        queue: deque[tuple[int, int]] = deque()
-
-        def push_if_bg(x: int, y: int) -> None:
-            idx = y * width + x
-            if visited[idx]:
-                return
-            visited[idx] = 1
-            if similar(sprite.get_at((x, y))):
-                queue.append((x, y))
-
-        for x in range(width):
-            push_if_bg(x, 0)
-            push_if_bg(x, height - 1)
-        for y in range(height):
-            push_if_bg(0, y)
-            push_if_bg(width - 1, y)
-
-        while queue:
-            x, y = queue.popleft()
-            pixel = sprite.get_at((x, y))
-            sprite.set_at((x, y), pygame.Color(pixel.r, pixel.g, pixel.b, 0))
-
-            if x > 0:
-                push_if_bg(x - 1, y)
-            if x < width - 1:
-                push_if_bg(x + 1, y)
-            if y > 0:
-                push_if_bg(x, y - 1)
-            if y < height - 1:
-                push_if_bg(x, y + 1)
-
-        return sprite
+    def save_now(self) -> None:
+        if self.saver is None:
+            self.sim.show_message("Saving is off in seeded and recorded games.")
+            return
+        self.saver.snapshot()
+        self.sim.show_message("Game saved!")
 
     def iso_point(self, wx: float, wy: float) -> tuple[int, int]:
-        dx = wx - self.player.centerx
-        dy = wy - self.player.centery
+        dx = wx - self.camera[0]
+        dy = wy - self.camera[1]
         sx = int((dx - dy) * self.iso_scale_x + WIDTH / 2)
         sy = int((dx + dy) * self.iso_scale_y + HEIGHT * 0.48)
         return sx, sy
@@ -191,6 +203,45 @@ class Game:
         bl = self.iso_point(rect.left, rect.bottom)
         return [tl, tr, br, bl]
 
+    def screen_to_world(self, sx: float, sy: float) -> tuple[float, float]:
+        # Inverse of iso_point (ground plane, height 0).
+        a = (sx - WIDTH / 2) / self.iso_scale_x
+        b = (sy - HEIGHT * 0.48) / self.iso_scale_y
+        return (a + b) / 2 + self.camera[0], (b - a) / 2 + self.camera[1]
+
+    def view_bounds(self, margin: int = CULL_MARGIN) -> pygame.Rect:
+        # World-space bounding box of the screen (plus a margin for prism heights).
+        corners = [
+            self.screen_to_world(-margin, -margin),
+            self.screen_to_world(WIDTH + margin, -margin),
+            self.screen_to_world(WIDTH + margin, HEIGHT + margin),
+            self.screen_to_world(-margin, HEIGHT + margin),
+        ]
+        xs = [p[0] for p in corners]
+        ys = [p[1] for p in corners]
+        x0, y0 = int(min(xs)), int(min(ys))
+        return pygame.Rect(x0, y0, int(max(xs)) - x0 + 1, int(max(ys)) - y0 + 1)
+
+    def visible_rows(self, margin: int = CULL_MARGIN) -> np.ndarray:
+        # Snapshot rows whose iso footprint lands on screen (plus a margin for prism heights).
+        view = self.view
+        bounds = self.view_bounds(margin)
+        # Binary-search the x-sorted rows for the strip the view spans; only that strip gets the exact test.
+        # The test below works on projected boxes, which reach up to half a node's height past the bounds.
+        reach = view.node_max_size
+        strip = (bounds.left - reach - reach // 2 - 1, bounds.right + reach // 2 + 2)
+        lo, hi = np.searchsorted(view.node_x_sorted, strip)
+        rows = view.node_by_x[lo:hi]
+        left, top = view.node_x[rows], view.node_y[rows]
+        right, bottom = left + view.node_w[rows], top + view.node_h[rows]
+        cx, cy = self.camera
+        sx0 = (left - bottom - cx + cy) * self.iso_scale_x + WIDTH / 2
+        sx1 = (right - top - cx + cy) * self.iso_scale_x + WIDTH / 2
+        sy0 = (left + top - cx - cy) * self.iso_scale_y + HEIGHT * 0.48
+        sy1 = (right + bottom - cx - cy) * self.iso_scale_y + HEIGHT * 0.48
+        on_screen = (sx1 >= -margin) & (sx0 <= WIDTH + margin) & (sy1 >= -margin) & (sy0 <= HEIGHT + margin)
+        return rows[on_screen]
+
     def draw_iso_prism(
         self,
         surface: pygame.Surface,
@@ -200,353 +251,48 @@ class Game:
         left_color: tuple[int, int, int],
         right_color: tuple[int, int, int],
     ) -> None:
-        base = self.iso_rect_poly(base_rect)
-        top = [(x, y - height) for x, y in base]
-        pygame.draw.polygon(surface, left_color, [base[3], base[2], top[2], top[3]])
-        pygame.draw.polygon(surface, right_color, [base[1], base[2], top[2], top[1]])
-        pygame.draw.polygon(surface, top_color, top)
-
-    def show_message(self, text: str, seconds: float = 2.0) -> None:
-        self.message = text
-        self.message_timer = seconds
-
-    def get_tree_rect(self, index: int) -> pygame.Rect:
-        base = self.trees[index]
-        growth = max(0.2, min(1.0, float(self.tree_growth[index])))
-        scale = 0.45 + 0.55 * growth
-        width = max(12, int(base.width * scale))
-        height = max(16, int(base.height * scale))
-        x = base.centerx - width // 2
-        y = base.bottom - height
-        return pygame.Rect(x, y, width, height)
-
-    def is_tree_mature(self, index: int) -> bool:
-        return float(self.tree_growth[index]) >= self.tree_mature_threshold
-
-    def start_cutting(self) -> None:
-        if self.action_mode is not None or self.craft_menu_open:
-            return
-
-        for i, _tree in enumerate(self.trees):
-            tree = self.get_tree_rect(i)
-            if is_near(self.player, tree, distance=25):
-                if not self.is_tree_mature(i):
-                    self.show_message("This tree is still growing!")
-                    return
-                self.action_mode = "cut"
-                self.action_timer = 0.0
-                self.action_target_index = i
-                return
-
-        self.show_message("No tree nearby!")
-
-    def start_mining(self) -> None:
-        if self.action_mode is not None or self.craft_menu_open:
-            return
-
-        if not self.inventory["pickaxe"]:
-            self.show_message("You need a pickaxe to mine! (Craft at home: C)")
-            return
-
-        for i, stone in enumerate(self.stones):
-            if is_near(self.player, stone, distance=25):
-                self.action_mode = "mine"
-                self.action_timer = 0.0
-                self.action_target_index = i
-                return
-
-        self.show_message("No stone nearby!")
-
-    def try_make_fire(self) -> None:
-        if self.inventory["wood+branches"] >= 1 and self.inventory["stone"] >= 2:
-            self.inventory["wood+branches"] -= 1
-            self.inventory["stone"] -= 2
-            self.inventory["fire"] += 1
-            self.stats["fires_made"] += 1
-            self.show_message("Fire made! (-1 wood, -2 stone)")
-        else:
-            self.show_message("Need 1 wood + 2 stone to make fire!")
-
-    def go_home(self) -> None:
-        self.action_mode = None
-        self.action_target_index = None
-        self.player.x, self.player.y = START_POS
-        self.stats["home_returns"] += 1
-        self.show_message("Back home!")
-
-    def try_build_house(self) -> None:
-        if self.house_built:
-            self.show_message("House already built!")
-            return
-
-        if not self.player.colliderect(self.home_area):
-            self.show_message("Build at home area (green square).")
-            return
-
-        if self.inventory["wood+branches"] >= 2:
-            self.inventory["wood+branches"] -= 2
-            self.house_built = True
-            self.show_message("House built! (-2 wood+branches)")
-        else:
-            self.show_message("Need 2 wood+branches to build a house!")
-
-    def metric_for_quest(self, kind: str) -> int:
-        if kind == "build_house":
-            return 1 if self.house_built else 0
-        if kind == "collect_wood":
-            return int(self.stats["wood_collected"])
-        if kind == "collect_stone":
-            return int(self.stats["stone_collected"])
-        if kind == "collect_rare":
-            return int(self.stats["rare_collected"])
-        if kind == "craft_fire":
-            return int(self.stats["fires_made"])
-        if kind == "cut_trees":
-            return int(self.stats["trees_cut"])
-        if kind == "mine_stones":
-            return int(self.stats["stones_mined"])
-        if kind == "go_home":
-            return int(self.stats["home_returns"])
-        return 0
-
-    def quest_progress(self) -> tuple[int, int]:
-        if self.current_quest is None:
-            return (0, 0)
-
-        kind = str(self.current_quest["kind"])
-        target = int(self.current_quest["target"])
-        start = int(self.current_quest["start"])
-        current = self.metric_for_quest(kind) - start
-        current = max(0, min(current, target))
-        return (current, target)
-
-    def current_quest_completed(self) -> bool:
-        if self.current_quest is None:
-            return False
-        current, target = self.quest_progress()
-        return current >= target
-
-    def quest_label(self, kind: str, target: int) -> str:
-        if kind == "build_house":
-            return "Build a house at home (B)"
-        if kind == "collect_wood":
-            return f"Collect {target} wood"
-        if kind == "collect_stone":
-            return f"Collect {target} stone"
-        if kind == "collect_rare":
-            return f"Collect {target} rare stone"
-        if kind == "craft_fire":
-            return f"Make {target} fire (F)"
-        if kind == "cut_trees":
-            return f"Cut {target} trees (L)"
-        if kind == "mine_stones":
-            return f"Mine {target} stones (X)"
-        if kind == "go_home":
-            return f"Return home {target} times (🏠)"
-        return "Complete objective"
-
-    def assign_next_quest(self) -> None:
-        if self.completed_quests >= self.total_quests:
-            self.current_quest = None
-            return
-
-        kinds = ["collect_wood", "collect_stone", "collect_rare", "craft_fire", "cut_trees", "mine_stones", "go_home"]
-        if not self.house_built:
-            kinds.append("build_house")
-        if self.last_quest_kind in kinds and len(kinds) > 1:
-            kinds.remove(str(self.last_quest_kind))
-
-        kind = random.choice(kinds)
-        if kind == "build_house":
-            target = 1
-        elif kind == "collect_rare":
-            target = random.randint(1, 2)
-        elif kind == "craft_fire":
-            target = random.randint(1, 3)
-        elif kind == "go_home":
-            target = random.randint(2, 4)
-        else:
-            target = random.randint(2, 5)
-
-        start = self.metric_for_quest(kind)
-        label = self.quest_label(kind, target)
-        self.current_quest = {"kind": kind, "target": target, "start": start, "label": label}
-        self.last_quest_kind = kind
-
-    def complete_and_turn_in_quest(self) -> None:
-        if self.current_quest is None:
-            return
-        self.completed_quests += 1
-        self.quest_ready_to_turn_in = False
-        if self.completed_quests >= self.total_quests:
-            self.current_quest = None
-            self.show_message("All quests complete! 🎉", seconds=3.0)
-            self.start_celebration()
-            return
-
-        self.assign_next_quest()
-        if self.current_quest is not None:
-            self.show_message(f"New quest: {self.current_quest['label']}", seconds=2.5)
-
-    def update_quest_status(self) -> None:
-        if self.current_quest is None or self.quest_ready_to_turn_in:
-            return
-        if self.current_quest_completed():
-            self.quest_ready_to_turn_in = True
-            self.show_message("Quest done! Press 🏠 to claim next quest.", seconds=3.0)
-
-    def start_celebration(self) -> None:
-        if self.celebration_active:
-            return
-        self.celebration_active = True
-        self.firework_timer = 0.0
-        self.flowers.clear()
-        self.firework_particles.clear()
-
-        for _ in range(70):
-            x = random.randint(30, WIDTH - 30)
-            y = random.randint(100, HEIGHT - 90)
-            self.flowers.append(
-                {
-                    "x": float(x),
-                    "y": float(y),
-                    "size": 0.0,
-                    "target": float(random.randint(4, 8)),
-                    "growth": float(random.uniform(4.0, 8.0)),
-                    "color_idx": int(random.randint(0, 3)),
-                }
-            )
-
-    def spawn_firework_burst(self) -> None:
-        cx = random.randint(80, WIDTH - 80)
-        cy = random.randint(80, HEIGHT - 220)
-        colors = [(255, 80, 80), (255, 220, 90), (120, 220, 255), (170, 255, 130), (245, 170, 255)]
-        color = colors[random.randint(0, len(colors) - 1)]
-
-        for _ in range(24):
-            angle = random.uniform(0.0, 6.28318530718)
-            speed = random.uniform(70.0, 170.0)
-            self.firework_particles.append(
-                {
-                    "x": float(cx),
-                    "y": float(cy),
-                    "vx": float(speed * pygame.math.Vector2(1, 0).rotate_rad(angle).x),
-                    "vy": float(speed * pygame.math.Vector2(1, 0).rotate_rad(angle).y),
-                    "life": float(random.uniform(0.8, 1.4)),
-                    "color": color,
-                }
-            )
-
-    def update_celebration(self, dt: float) -> None:
-        if not self.celebration_active:
-            return
-
-        for flower in self.flowers:
-            if float(flower["size"]) < float(flower["target"]):
-                new_size = float(flower["size"]) + float(flower["growth"]) * dt
-                flower["size"] = min(float(flower["target"]), new_size)
-
-        self.firework_timer -= dt
-        if self.firework_timer <= 0:
-            self.spawn_firework_burst()
-            self.firework_timer = random.uniform(0.4, 0.9)
-
-        gravity = 140.0
-        for particle in self.firework_particles[:]:
-            particle["life"] = float(particle["life"]) - dt
-            if float(particle["life"]) <= 0:
-                self.firework_particles.remove(particle)
-                continue
-            particle["x"] = float(particle["x"]) + float(particle["vx"]) * dt
-            particle["y"] = float(particle["y"]) + float(particle["vy"]) * dt
-            particle["vy"] = float(particle["vy"]) + gravity * dt
-
-    def add_wood_drop(self) -> None:
-        wood_type = random.choice(list(self.resource_types["wood+branches"].keys()))
-        self.inventory["wood+branches"] += 1
-        self.resource_types["wood+branches"][wood_type] += 1
-        self.stats["wood_collected"] += 1
-        self.show_message(f"+1 wood ({wood_type})")
-
-    def add_stone_drop(self) -> None:
-        stone_type = random.choice(list(self.resource_types["stone"].keys()))
-        self.inventory["stone"] += 1
-        self.resource_types["stone"][stone_type] += 1
-        self.stats["stone_collected"] += 1
-
-        got_rare = random.random() < RARE_DROP_CHANCE
-        if got_rare:
-            rare_type = random.choice(list(self.resource_types["rare_stone"].keys()))
-            self.inventory["rare_stone"] += 1
-            self.resource_types["rare_stone"][rare_type] += 1
-            self.stats["rare_collected"] += 1
-            self.show_message(f"+1 stone ({stone_type}) and +1 rare ({rare_type})!")
-        else:
-            self.show_message(f"+1 stone ({stone_type})")
-
-    def try_craft_axe(self) -> None:
-        if self.inventory["axe"]:
-            self.show_message("You already have an axe!")
-            return
-
-        if self.inventory["wood+branches"] >= AXE_COST_WOOD:
-            self.inventory["wood+branches"] -= AXE_COST_WOOD
-            self.inventory["axe"] = True
-            self.show_message("Axe crafted! Cutting is now faster (3s).")
-        else:
-            self.show_message("Not enough wood for axe.")
-
-    def try_craft_pickaxe(self) -> None:
-        if self.inventory["pickaxe"]:
-            self.show_message("You already have a pickaxe!")
-            return
-
-        if self.inventory["wood+branches"] >= PICK_COST_WOOD:
-            self.inventory["wood+branches"] -= PICK_COST_WOOD
-            self.inventory["pickaxe"] = True
-            self.show_message("Pickaxe crafted! You can now mine stones (X).")
-        else:
-            self.show_message("Not enough wood for pickaxe.")
+        sprite, ox, oy = self.prism_cache.get(
+            base_rect.width, base_rect.height, height, top_color, left_color, right_color
+        )
+        x, y = self.iso_point(base_rect.left, base_rect.top)
+        surface.blit(sprite, (x - ox, y - oy))
 
     def handle_keydown(self, key: int) -> None:
         if key == pygame.K_l:
-            self.start_cutting()
+            self.pending_actions.append("cut")
         if key == pygame.K_x:
-            self.start_mining()
+            self.pending_actions.append("mine")
         if key == pygame.K_f:
-            self.try_make_fire()
+            self.pending_actions.append("fire")
         if key == pygame.K_b:
-            self.try_build_house()
+            self.pending_actions.append("build")
         if key == pygame.K_ESCAPE:
             self.selected_panel = None
-            self.craft_menu_open = False
+            self.pending_actions.append("close_menu")
         if key == pygame.K_c:
-            if self.player.colliderect(self.home_area):
-                self.craft_menu_open = not self.craft_menu_open
-            else:
-                self.show_message("Go to home area to craft (green square).")
+            self.pending_actions.append("toggle_craft")
+        if key == pygame.K_F5:
+            self.on_sim_thread(self.save_now)
+        if key == pygame.K_F3:
+            self.show_profile = not self.show_profile
 
     def handle_mouse_down(self, pos: tuple[int, int]) -> None:
         mx, my = pos
 
         if self.home_button.collidepoint(mx, my):
-            self.craft_menu_open = False
-            self.go_home()
-            if self.quest_ready_to_turn_in:
-                self.complete_and_turn_in_quest()
+            self.pending_actions.append("home")
 
-        for name, rect in self.inv_item_rects.items():
+        for name, rect in self.inventory_bar.item_rects.items():
             if rect.collidepoint(mx, my):
                 if self.selected_panel == name:
                     self.selected_panel = None
                 else:
                     self.selected_panel = name
 
-        if self.craft_menu_open:
-            if self.craft_btn_axe.collidepoint(mx, my):
-                self.try_craft_axe()
-            if self.craft_btn_pick.collidepoint(mx, my):
-                self.try_craft_pickaxe()
+        if self.view.craft_menu_open:
+            for recipe_id, button in self.craft_buttons:
+                if button.collidepoint(mx, my):
+                    self.pending_actions.append(self.defs.recipe_actions[recipe_id])
 
     def handle_events(self) -> bool:
         for event in pygame.event.get():
@@ -559,350 +305,199 @@ class Game:
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 self.handle_mouse_down(event.pos)
 
+            if event.type == pygame.WINDOWEXPOSED:
+                # The window system may have thrown away what was on screen.
+                self.last_world_state = None
+
         return True
 
-    def update_movement(self) -> None:
+    def collect_input(self) -> SimInput:
         keys = pygame.key.get_pressed()
-        if self.action_mode is None and not self.craft_menu_open:
-            if keys[pygame.K_LEFT]:
-                self.player.x -= PLAYER_SPEED
-            if keys[pygame.K_RIGHT]:
-                self.player.x += PLAYER_SPEED
-            if keys[pygame.K_UP]:
-                self.player.y -= PLAYER_SPEED
-            if keys[pygame.K_DOWN]:
-                self.player.y += PLAYER_SPEED
-
-            self.player.x = max(0, min(WIDTH - self.player.width, self.player.x))
-            self.player.y = max(0, min(HEIGHT - self.player.height, self.player.y))
-
-    def update_message_timer(self, dt: float) -> None:
-        if self.message_timer > 0:
-            self.message_timer -= dt
-            if self.message_timer <= 0:
-                self.message = ""
-
-    def update_respawns(self, dt: float) -> None:
-        for item in self.respawn_queue[:]:
-            item["time"] -= dt
-            if item["time"] <= 0:
-                if item["kind"] == "tree":
-                    self.trees.append(random_spawn_rect(WIDTH, HEIGHT, self.home_area, TREE_SIZE[0], TREE_SIZE[1]))
-                    self.tree_growth.append(0.0)
-                elif item["kind"] == "stone":
-                    self.stones.append(random_spawn_rect(WIDTH, HEIGHT, self.home_area, STONE_SIZE[0], STONE_SIZE[1]))
-                self.respawn_queue.remove(item)
-
-    def update_tree_growth(self, dt: float) -> None:
-        for i in range(len(self.tree_growth)):
-            if self.tree_growth[i] < 1.0:
-                self.tree_growth[i] = min(1.0, float(self.tree_growth[i]) + self.tree_growth_rate * dt)
-
-    def update_cut_action(self, dt: float) -> None:
-        if self.action_target_index is None or self.action_target_index >= len(self.trees):
-            self.action_mode = None
+        move_x = int(keys[pygame.K_RIGHT]) - int(keys[pygame.K_LEFT])
+        move_y = int(keys[pygame.K_DOWN]) - int(keys[pygame.K_UP])
+        actions = self.pending_actions
+        self.pending_actions = []
+        return SimInput(move_x, move_y, actions)
+
+    def update_view(self, alpha: float) -> None:
+        # Blend between the last two simulation ticks so motion stays smooth at any frame rate.
+        prev_x, prev_y = self.view.prev_player_pos
+        px, py, pw, ph = self.view.player
+        x = prev_x + (px - prev_x) * alpha
+        y = prev_y + (py - prev_y) * alpha
+        self.player = pygame.Rect(round(x), round(y), pw, ph)
+        self.camera = (x + pw / 2, y + ph / 2)
+
+    def update_depth_list(self) -> None:
+        # Culled, depth-ordered set of static objects; the player is merged in separately.
+        view = self.view
+        self.visible = {}
+        for row in self.visible_rows().tolist():
+            node_id = int(view.node_ids[row])
+            self.visible[node_id] = row
+            # Base rects never move, so their bottom is a stable depth key.
+            self.depth_list.update(node_id, int(view.node_y[row] + view.node_h[row]))
+        if view.house_built:
+            self.visible[HOUSE_HANDLE] = -1
+            self.depth_list.update(HOUSE_HANDLE, self.house_rect.bottom)
+        self.depth_list.retain(set(self.visible))
+
+    def draw_entity(self, handle: int) -> None:
+        if handle == HOUSE_HANDLE:
+            self.draw_house(self.house_rect)
             return
-
-        target = self.get_tree_rect(self.action_target_index)
-        if not is_near(self.player, target, distance=35):
-            self.action_mode = None
-            self.show_message("Cut cancelled (too far).")
+        row = self.visible[handle]
+        if self.view.is_tree(row):
+            self.draw_tree(handle, row)
+        else:
+            self.draw_stone(self.view.node_rect(row))
+
+    def blit_ground_sprite(self, sprite: pygame.Surface, rect: pygame.Rect) -> None:
+        # Bottom-centre of the sprite sits on the front corner of the footprint.
+        cx, _ = self.iso_point(rect.centerx, rect.centery)
+        _, by = self.iso_point(rect.right, rect.bottom)
+        self.screen.blit(sprite, (cx - sprite.get_width() // 2, by - sprite.get_height()))
+
+    def draw_tree(self, tree_id: int, row: int) -> None:
+        rect = self.view.tree_rect(row)
+        mature = self.view.is_tree_mature(row)
+        sprite = self.assets.category_sprite("trees", tree_id)
+        if sprite is not None and mature:
+            self.blit_ground_sprite(sprite, rect)
             return
+        trunk_w = max(6, rect.width // 5)
+        trunk_h = max(12, rect.height // 3)
+        trunk = pygame.Rect(rect.centerx - trunk_w // 2, rect.bottom - trunk_h, trunk_w, trunk_h)
+        canopy = pygame.Rect(rect.x - 5, rect.y - max(10, rect.height // 4), rect.width + 10, max(14, rect.height // 2))
+        if not mature:
+            # Young trees are smaller and lighter.
+            trunk = pygame.Rect(rect.x + rect.width // 2 - 4, rect.bottom - 14, 8, 14)
+            canopy = pygame.Rect(rect.x - 2, rect.y - 10, rect.width + 4, max(14, rect.height // 2))
+        self.draw_iso_prism(
+            self.screen,
+            trunk,
+            height=26,
+            top_color=(145, 90, 35),
+            left_color=(95, 55, 20),
+            right_color=(120, 70, 30),
+        )
+        self.draw_iso_prism(
+            self.screen,
+            canopy,
+            height=24,
+            top_color=(30, 145, 45),
+            left_color=(18, 95, 28),
+            right_color=(22, 115, 34),
+        )
 
-        self.action_timer += dt
-        total_time = CUT_TIME_WITH_AXE if self.inventory["axe"] else CUT_TIME_SECONDS
-        if self.action_timer >= total_time:
-            self.trees.pop(self.action_target_index)
-            self.tree_growth.pop(self.action_target_index)
-            self.respawn_queue.append({"time": TREE_RESPAWN_SECONDS, "kind": "tree"})
-            self.action_mode = None
-            self.action_target_index = None
-            self.stats["trees_cut"] += 1
-            self.add_wood_drop()
-
-    def update_mine_action(self, dt: float) -> None:
-        if self.action_target_index is None or self.action_target_index >= len(self.stones):
-            self.action_mode = None
+    def draw_stone(self, rect: pygame.Rect) -> None:
+        sprite = self.assets.category_sprite("stones", rect.x + rect.y)
+        if sprite is not None:
+            self.blit_ground_sprite(sprite, rect)
             return
+        self.draw_iso_prism(
+            self.screen,
+            rect,
+            height=14,
+            top_color=(145, 145, 145),
+            left_color=(95, 95, 95),
+            right_color=(115, 115, 115),
+        )
 
-        target = self.stones[self.action_target_index]
-        if not is_near(self.player, target, distance=35):
-            self.action_mode = None
-            self.show_message("Mining cancelled (too far).")
+    def draw_house(self, rect: pygame.Rect) -> None:
+        sprite = self.assets.category_sprite("house")
+        if sprite is not None:
+            self.blit_ground_sprite(sprite, rect)
             return
-
-        self.action_timer += dt
-        if self.action_timer >= MINE_TIME_SECONDS:
-            self.stones.pop(self.action_target_index)
-            self.respawn_queue.append({"time": STONE_RESPAWN_SECONDS, "kind": "stone"})
-            self.action_mode = None
-            self.action_target_index = None
-            self.stats["stones_mined"] += 1
-            self.add_stone_drop()
-
-    def update_actions(self, dt: float) -> None:
-        if self.action_mode == "cut":
-            self.update_cut_action(dt)
-        if self.action_mode == "mine":
-            self.update_mine_action(dt)
-
-    def update(self, dt: float) -> None:
-        self.update_movement()
-        self.update_message_timer(dt)
-        self.update_respawns(dt)
-        self.update_tree_growth(dt)
-        self.update_actions(dt)
-        self.update_quest_status()
-        self.update_celebration(dt)
+        self.draw_iso_prism(
+            self.screen,
+            rect,
+            height=34,
+            top_color=(170, 130, 90),
+            left_color=(130, 90, 60),
+            right_color=(150, 110, 70),
+        )
+        roof = self.iso_rect_poly(rect)
+        roof_peak = ((roof[0][0] + roof[1][0]) // 2, min(roof[0][1], roof[1][1]) - 24)
+        pygame.draw.polygon(self.screen, (120, 60, 40), [roof[0], roof[1], roof_peak])
+
+    def draw_player(self, rect: pygame.Rect) -> None:
+        player_sprite = self.assets.category_sprite("player")
+        if player_sprite is not None:
+            px, py = self.iso_point(rect.centerx, rect.centery)
+            # Anchor sprite so feet align near the character's world position.
+            sx = px - player_sprite.get_width() // 2
+            sy = py - player_sprite.get_height() + 22
+            self.screen.blit(player_sprite, (sx, sy))
+        else:
+            self.draw_iso_prism(
+                self.screen,
+                rect,
+                height=20,
+                top_color=(170, 98, 38),
+                left_color=(110, 62, 24),
+                right_color=(138, 78, 30),
+            )
 
     def draw_world(self) -> None:
-        self.screen.fill((22, 96, 42))
-
-        ground = pygame.Rect(-2200, -2200, 4400, 4400)
-        pygame.draw.polygon(self.screen, (34, 139, 34), self.iso_rect_poly(ground))
+        self.background.blit(self.screen, self.camera)
 
-        home_base = self.iso_rect_poly(self.home_area)
-        pygame.draw.polygon(self.screen, (20, 110, 20), home_base, 2)
-
-        if self.celebration_active:
+        if self.view.celebration_active:
             flower_colors = [(255, 100, 120), (255, 220, 90), (170, 140, 255), (255, 150, 240)]
-            for flower in self.flowers:
-                size = int(float(flower["size"]))
-                if size <= 0:
-                    continue
-                px, py = self.iso_point(float(flower["x"]), float(flower["y"]))
+            for fx, fy, size, color_idx in self.view.flowers:
+                px, py = self.iso_point(fx, fy)
                 stem_top = (px, py - size - 2)
                 stem_bottom = (px, py + 2)
                 pygame.draw.line(self.screen, (40, 160, 70), stem_bottom, stem_top, 2)
-                color = flower_colors[int(flower["color_idx"]) % len(flower_colors)]
+                color = flower_colors[color_idx % len(flower_colors)]
                 pygame.draw.circle(self.screen, color, stem_top, max(2, size // 2))
 
-        drawables: list[tuple[int, str, pygame.Rect]] = []
-        for i, _tree in enumerate(self.trees):
-            tree_rect = self.get_tree_rect(i)
-            drawables.append((tree_rect.bottom, "tree", tree_rect, i))
-        for stone in self.stones:
-            drawables.append((stone.bottom, "stone", stone, -1))
-        if self.house_built:
-            house_rect = pygame.Rect(self.home_area.x + 15, self.home_area.y + 15, 70, 70)
-            drawables.append((house_rect.bottom, "house", house_rect, -1))
-        drawables.append((self.player.bottom, "player", self.player, -1))
-        drawables.sort(key=lambda item: item[0])
-
-        for _, kind, rect, idx in drawables:
-            if kind == "tree":
-                trunk_w = max(6, rect.width // 5)
-                trunk_h = max(12, rect.height // 3)
-                trunk = pygame.Rect(rect.centerx - trunk_w // 2, rect.bottom - trunk_h, trunk_w, trunk_h)
-                canopy = pygame.Rect(rect.x - 5, rect.y - max(10, rect.height // 4), rect.width + 10, max(14, rect.height // 2))
-                if idx >= 0 and not self.is_tree_mature(idx):
-                    # Young trees are smaller and lighter.
-                    trunk = pygame.Rect(rect.x + rect.width // 2 - 4, rect.bottom - 14, 8, 14)
-                    canopy = pygame.Rect(rect.x - 2, rect.y - 10, rect.width + 4, max(14, rect.height // 2))
-                self.draw_iso_prism(
-                    self.screen,
-                    trunk,
-                    height=26,
-                    top_color=(145, 90, 35),
-                    left_color=(95, 55, 20),
-                    right_color=(120, 70, 30),
-                )
-                self.draw_iso_prism(
-                    self.screen,
-                    canopy,
-                    height=24,
-                    top_color=(30, 145, 45),
-                    left_color=(18, 95, 28),
-                    right_color=(22, 115, 34),
-                )
-            elif kind == "stone":
-                self.draw_iso_prism(
-                    self.screen,
-                    rect,
-                    height=14,
-                    top_color=(145, 145, 145),
-                    left_color=(95, 95, 95),
-                    right_color=(115, 115, 115),
-                )
-            elif kind == "house":
-                self.draw_iso_prism(
-                    self.screen,
-                    rect,
-                    height=34,
-                    top_color=(170, 130, 90),
-                    left_color=(130, 90, 60),
-                    right_color=(150, 110, 70),
-                )
-                roof = self.iso_rect_poly(rect)
-                roof_peak = ((roof[0][0] + roof[1][0]) // 2, min(roof[0][1], roof[1][1]) - 24)
-                pygame.draw.polygon(self.screen, (120, 60, 40), [roof[0], roof[1], roof_peak])
-            elif kind == "player":
-                if self.player_sprite is not None:
-                    px, py = self.iso_point(rect.centerx, rect.centery)
-                    # Anchor sprite so feet align near the character's world position.
-                    sx = px - self.player_sprite.get_width() // 2
-                    sy = py - self.player_sprite.get_height() + 22
-                    self.screen.blit(self.player_sprite, (sx, sy))
-                else:
-                    self.draw_iso_prism(
-                        self.screen,
-                        rect,
-                        height=20,
-                        top_color=(170, 98, 38),
-                        left_color=(110, 62, 24),
-                        right_color=(138, 78, 30),
-                    )
-
-        if self.celebration_active:
-            for particle in self.firework_particles:
-                px, py = self.iso_point(float(particle["x"]), float(particle["y"]))
-                life = max(0.0, min(1.0, float(particle["life"])))
-                radius = 2 if life < 0.5 else 3
-                color = particle["color"]
-                pygame.draw.circle(self.screen, color, (px, py), radius)
-
-    def draw_inventory(self) -> None:
-        self.inv_item_rects.clear()
-        x0, y0 = 10, 10
-        bar_h = 40
-        pygame.draw.rect(self.screen, (0, 0, 0), (x0, y0, 660, bar_h))
-
-        items = [
-            ("wood+branches", self.inventory["wood+branches"]),
-            ("stone", self.inventory["stone"]),
-            ("rare_stone", self.inventory["rare_stone"]),
-            ("fire", self.inventory["fire"]),
-        ]
-
-        cursor_x = x0 + 10
-        pad = 8
-        for name, value in items:
-            label = f"{name}: {value}"
-            surf = self.font.render(label, True, (255, 255, 255))
-            rect = pygame.Rect(cursor_x - 6, y0 + 6, surf.get_width() + 12, bar_h - 12)
-
-            if self.selected_panel == name:
-                pygame.draw.rect(self.screen, (60, 60, 60), rect)
-            pygame.draw.rect(self.screen, (255, 255, 255), rect, 1)
-
-            self.screen.blit(surf, (cursor_x, y0 + 10))
-            self.inv_item_rects[name] = rect
-            cursor_x += rect.width + pad
-
-        tool_text = f"Axe: {'yes' if self.inventory['axe'] else 'no'}   Pickaxe: {'yes' if self.inventory['pickaxe'] else 'no'}"
-        tool_surf = self.small_font.render(tool_text, True, (255, 255, 255))
-        self.screen.blit(tool_surf, (x0 + 10, y0 + 44))
-
-    def draw_quest_banner(self) -> None:
-        if self.completed_quests >= self.total_quests:
-            qs = self.font.render("All quests complete! 🎉", True, (0, 0, 0))
-            width = qs.get_width() + 16
-            pygame.draw.rect(self.screen, (255, 255, 0), ((WIDTH - width) // 2, 10, width, 35))
-            self.screen.blit(qs, ((WIDTH - qs.get_width()) // 2, 17))
-        elif self.quest_ready_to_turn_in:
-            text = f"Quest {self.completed_quests + 1}/{self.total_quests} done! Press 🏠 for next."
-            qs = self.font.render(text, True, (255, 255, 0))
-            width = qs.get_width() + 16
-            pygame.draw.rect(self.screen, (0, 0, 0), ((WIDTH - width) // 2, 10, width, 35))
-            self.screen.blit(qs, ((WIDTH - qs.get_width()) // 2, 17))
-        else:
-            current, target = self.quest_progress()
-            label = str(self.current_quest["label"]) if self.current_quest is not None else "No quest"
-            text = f"Quest {self.completed_quests + 1}/{self.total_quests}: {label} ({current}/{target})"
-            qs = self.font.render(text, True, (255, 255, 0))
-            width = qs.get_width() + 16
-            pygame.draw.rect(self.screen, (0, 0, 0), ((WIDTH - width) // 2, 10, width, 35))
-            self.screen.blit(qs, ((WIDTH - qs.get_width()) // 2, 17))
-
-    def draw_help_and_message(self) -> None:
-        help_text = "Move: arrows | Cut: L | Mine: X | Fire: F (1 wood + 2 stone) | Build: B (home) | Craft: C (home) | Click inventory | 🏠"
-        help_surf = self.small_font.render(help_text, True, (255, 255, 255))
-        pygame.draw.rect(self.screen, (0, 0, 0), (80, HEIGHT - 45, help_surf.get_width() + 10, 35))
-        self.screen.blit(help_surf, (85, HEIGHT - 38))
-
-        if self.message:
-            msg_surf = self.font.render(self.message, True, (255, 255, 255))
-            width = msg_surf.get_width() + 16
-            height = 34
-            x = (WIDTH - width) // 2
-            y = 55
-            pygame.draw.rect(self.screen, (0, 0, 0), (x, y, width, height))
-            self.screen.blit(msg_surf, (x + 8, y + 7))
-
-    def draw_action_progress(self) -> None:
-        if self.action_mode is None:
-            return
-
-        bar_w, bar_h = 300, 18
-        bx = (WIDTH - bar_w) // 2
-        by = 95
-
-        if self.action_mode == "cut":
-            total = CUT_TIME_WITH_AXE if self.inventory["axe"] else CUT_TIME_SECONDS
-            label = "Cutting..."
-        else:
-            total = MINE_TIME_SECONDS
-            label = "Mining..."
-
-        progress = max(0.0, min(1.0, self.action_timer / total))
-        pygame.draw.rect(self.screen, (0, 0, 0), (bx - 2, by - 2, bar_w + 4, bar_h + 4))
-        pygame.draw.rect(self.screen, (80, 80, 80), (bx, by, bar_w, bar_h))
-        pygame.draw.rect(self.screen, (200, 200, 200), (bx, by, int(bar_w * progress), bar_h))
-
-        status = self.font.render(label, True, (255, 255, 255))
-        self.screen.blit(status, (bx, by - 26))
-
-    def draw_home_and_panels(self) -> None:
-        pygame.draw.rect(self.screen, (0, 0, 0), self.home_button)
-        pygame.draw.rect(self.screen, (255, 255, 255), self.home_button, 2)
-        home_surf = self.font.render("🏠", True, (255, 255, 255))
-        self.screen.blit(home_surf, (self.home_button.x + 18, self.home_button.y + 12))
-
-        if self.selected_panel in ("wood+branches", "stone", "rare_stone"):
-            draw_panel(
-                self.screen,
-                self.font,
-                self.small_font,
-                WIDTH,
-                self.resource_types,
-                self.selected_panel,
-            )
-
-        if self.craft_menu_open:
-            draw_craft_menu(
-                self.screen,
-                self.font,
-                self.small_font,
-                self.craft_panel,
-                self.craft_btn_axe,
-                self.craft_btn_pick,
-                self.inventory,
-                AXE_COST_WOOD,
-                PICK_COST_WOOD,
-                PICK_COST_STONE,
-            )
+        self.update_depth_list()
+        entries = self.depth_list.entries
+        split = self.depth_list.split_at(self.player.bottom)
+        for i in range(split):
+            self.draw_entity(entries[i][1])
+        self.draw_player(self.player)
+        for i in range(split, len(entries)):
+            self.draw_entity(entries[i][1])
+
+        if self.view.celebration_active and len(self.view.particle_life):
+            self.draw_particles()
+
+    def draw_particles(self) -> None:
+        view = self.view
+        # Project every particle at once, then hand plain ints to pygame.
+        dx = view.particle_pos[:, 0] - self.camera[0]
+        dy = view.particle_pos[:, 1] - self.camera[1]
+        sx = ((dx - dy) * self.iso_scale_x + WIDTH / 2).astype(np.int32)
+        sy = ((dx + dy) * self.iso_scale_y + HEIGHT * 0.48).astype(np.int32)
+        radii = np.where(view.particle_life < 0.5, 2, 3)
+        for px, py, radius, color in zip(sx.tolist(), sy.tolist(), radii.tolist(), view.particle_color.tolist()):
+            pygame.draw.circle(self.screen, color, (px, py), radius)
 
     def draw_markers(self) -> None:
-        if self.current_quest is None:
+        view = self.view
+        kind = view.quest_kind
+        if kind is None:
             return
 
-        kind = str(self.current_quest["kind"])
         player_screen = self.iso_point(self.player.centerx, self.player.centery)
         marker_player_rect = pygame.Rect(player_screen[0] - 2, player_screen[1] - 2, 4, 4)
 
-        if self.quest_ready_to_turn_in or kind in ("build_house", "go_home"):
+        if view.quest_ready_to_turn_in or kind in ("build_house", "go_home"):
             draw_marker_line(
                 self.screen,
                 self.small_font,
                 marker_player_rect,
-                self.iso_point(self.home_area.centerx, self.home_area.centery),
+                self.iso_point(*pygame.Rect(view.home_area).center),
                 "Go home",
                 label_color=(255, 255, 0),
             )
 
         if kind in ("mine_stones", "collect_rare"):
-            nearest_stone = nearest_rect(self.player, self.stones)
-            if nearest_stone is not None:
+            row = view.nearest_stone
+            if row is not None:
+                nearest_stone = view.node_rect(row)
                 draw_marker_line(
                     self.screen,
                     self.small_font,
@@ -912,9 +507,9 @@ class Game:
                     label_color=(180, 80, 220),
                 )
         elif kind in ("cut_trees", "collect_wood"):
-            tree_rects = [self.get_tree_rect(i) for i in range(len(self.trees))]
-            nearest_tree = nearest_rect(self.player, tree_rects)
-            if nearest_tree is not None:
+            row = view.nearest_tree
+            if row is not None:
+                nearest_tree = view.tree_rect(row)
                 draw_marker_line(
                     self.screen,
                     self.small_font,
@@ -924,24 +519,132 @@ class Game:
                     label_color=(100, 220, 120),
                 )
 
+    def world_state(self) -> tuple | None:
+        # Everything the world picture depends on; None while the celebration animates every frame.
+        view = self.view
+        if view.celebration_active:
+            return None
+        # Node columns are compared by the store's counters, never by copying them.
+        return (
+            tuple(self.player),
+            view.house_built,
+            view.quest_kind,
+            view.quest_ready_to_turn_in,
+            view.node_version,
+            view.growth_version,
+        )
+
     def draw(self) -> None:
-        self.draw_world()
-        self.draw_markers()
+        if self.show_profile:
+            self.update_profile_overlay()
+        ui = UiState(self.selected_panel, self.profile_overlay if self.show_profile else None)
+        changed = self.hud.refresh(self.view, ui)
+
+        world_state = self.world_state()
+        if world_state is None or world_state != self.last_world_state:
+            self.last_world_state = world_state
+            self.draw_world()
+            self.draw_markers()
+            self.world_layer.blit(self.screen, (0, 0))
+            self.hud.blit(self.screen)
+            with self.profiler.section("display.flip"):
+                pygame.display.flip()
+        elif changed:
+            # The world is exactly as last frame: repaint and push only the widgets that changed.
+            self.hud.restore(self.screen, self.world_layer, changed)
+            with self.profiler.section("display.update"):
+                pygame.display.update(changed)
+
+    def update_profile_overlay(self) -> None:
+        now = time.perf_counter()
+        if self.profile_overlay is None or now >= self.profile_refresh_at:
+            self.profile_refresh_at = now + PROFILE_OVERLAY_REFRESH
+            self.profile_overlay = render_profile_overlay(
+                self.small_font, self.profiler.summary(), self.clock.get_fps()
+            )
+
+    def export_trace(self) -> None:
+        if self.trace_path is None:
+            return
+        count = self.profiler.export_chrome_trace(self.trace_path)
+        print(f"wrote {count} trace events to {self.trace_path}")
+
+    def before_step(self, inputs: SimInput) -> None:
+        if self.recorder is not None:
+            self.recorder.record(self.sim.tick + 1, inputs)
 
-        self.draw_inventory()
-        self.draw_quest_banner()
-        self.draw_help_and_message()
-        self.draw_action_progress()
-        self.draw_home_and_panels()
-        pygame.display.flip()
+    def after_steps(self) -> None:
+        if self.saver is not None:
+            with self.profiler.section("autosave"):
+                self.saver.update()
 
     def run(self) -> None:
+        try:
+            if self.sim_thread is not None:
+                self.run_threaded()
+            else:
+                self.run_single()
+        finally:
+            self.shutdown()
+        sys.exit()
+
+    def shutdown(self) -> None:
+        # Nothing may skip the final save and the replay's end marker, not even a failed trace export.
+        try:
+            # Stopped before exporting, so nothing adds to the trace while it is written.
+            if self.sim_thread is not None:
+                self.sim_thread.stop()
+            self.export_trace()
+        finally:
+            if self.saver is not None:
+                self.saver.close()
+            if self.recorder is not None:
+                self.recorder.close()
+            self.assets.shutdown()
+            pygame.quit()
+
+    def run_single(self) -> None:
+        frame = self.profiler.section("frame")
         running = True
+        accumulator = 0.0
         while running:
-            dt = self.clock.tick(FPS) / 1000.0
-            running = self.handle_events()
-            self.update(dt)
-            self.draw()
-
-        pygame.quit()
-        sys.exit()
+            frame_dt = min(MAX_FRAME_TIME, self.clock.tick(FPS) / 1000.0)
+            with frame:
+                running = self.handle_events()
+
+                # Fixed-timestep simulation: gameplay speed no longer depends on the frame rate.
+                accumulator += frame_dt
+                while accumulator >= SIM_DT:
+                    inputs = self.collect_input()
+                    self.before_step(inputs)
+                    self.sim.step(SIM_DT, inputs)
+                    accumulator -= SIM_DT
+
+                self.after_steps()
+                self.view = capture(self.sim)
+                self.update_view(accumulator / SIM_DT)
+                if self.assets.poll():
+                    # Newly loaded sprites replace placeholder shapes.
+                    self.last_world_state = None
+                self.draw()
+
+    def run_threaded(self) -> None:
+        # The simulation ticks on its own thread; this loop only polls events and draws snapshots.
+        frame = self.profiler.section("frame")
+        sim_thread = self.sim_thread
+        sim_thread.start()
+        running = True
+        while running:
+            self.clock.tick(FPS)
+            with frame:
+                running = self.handle_events()
+                sim_thread.submit(self.collect_input())
+                sim_thread.check()
+
+                self.view = sim_thread.snapshots.latest()
+                since_tick = time.perf_counter() - self.view.taken_at
+                self.update_view(min(1.0, since_tick / SIM_DT))
+                if self.assets.poll():
+                    # Newly loaded sprites replace placeholder shapes.
+                    self.last_world_state = None
+                self.draw()
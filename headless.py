@@ -0,0 +1,39 @@
+import argparse
+import random
+import time
+
+from config import SIM_DT
+from simulation import SimInput, Simulation
+
+BOT_ACTIONS = ["cut", "mine", "fire", "build", "home", "toggle_craft", "craft_axe", "craft_pickaxe"]
+
+
+def random_walk_input(rng: random.Random) -> SimInput:
+    # Crude soak-test driver: wander around and mash action keys now and then.
+    actions = [rng.choice(BOT_ACTIONS)] if rng.random() < 0.05 else []
+    return SimInput(rng.randint(-1, 1), rng.randint(-1, 1), actions)
+
+
+def run_headless(sim: Simulation, ticks: int, seed: int = 0) -> float:
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    for _ in range(ticks):
+        sim.step(SIM_DT, random_walk_input(rng))
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Step the game simulation without a window.")
+    parser.add_argument("--ticks", type=int, default=60_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sim = Simulation(args.seed)
+    elapsed = run_headless(sim, args.ticks, args.seed)
+    rate = args.ticks / elapsed if elapsed > 0 else float("inf")
+    print(f"{args.ticks} ticks ({sim.time:.0f}s game time) in {elapsed:.2f}s -> {rate:.0f} ticks/s")
+    print(f"quests done: {sim.completed_quests}/{sim.total_quests}  stats: {sim.stats.as_dict()}")
+
+
+if __name__ == "__main__":
+    main()
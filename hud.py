@@ -0,0 +1,311 @@
+from dataclasses import dataclass
+from typing import Hashable
+
+import pygame
+
+from config import HEIGHT, WIDTH
+from definitions import Definitions
+from snapshot import WorldSnapshot
+from ui import render_craft_menu, render_details_panel, render_text
+
+# Resources shown in the inventory bar; clicking one opens its details panel.
+INVENTORY_ITEMS = ("wood+branches", "stone", "rare_stone", "fire")
+DETAIL_ITEMS = ("wood+branches", "stone", "rare_stone")
+
+Placed = tuple[pygame.Surface, tuple[int, int]]
+
+
+@dataclass(frozen=True)
+class UiState:
+    """Renderer-side state the HUD depends on besides the snapshot."""
+
+    selected_panel: str | None
+    profile_overlay: pygame.Surface | None
+
+
+class Widget:
+    """One HUD element with its own cached surface.
+
+    `state` returns everything the picture depends on and is checked every
+    frame; `render` only runs when that changes and returns the surface and
+    its screen position, or None to hide the widget.
+    """
+
+    def __init__(self) -> None:
+        self.surface: pygame.Surface | None = None
+        self.rect: pygame.Rect | None = None
+        self.last_state: Hashable = object()
+
+    def state(self, view: WorldSnapshot, ui: UiState) -> Hashable:
+        raise NotImplementedError
+
+    def render(self, view: WorldSnapshot, ui: UiState) -> Placed | None:
+        raise NotImplementedError
+
+    def refresh(self, view: WorldSnapshot, ui: UiState) -> list[pygame.Rect]:
+        # Screen areas that changed: where the widget was and where it is now.
+        state = self.state(view, ui)
+        if state == self.last_state:
+            return []
+        self.last_state = state
+        changed = [self.rect] if self.rect is not None else []
+        placed = self.render(view, ui)
+        if placed is None:
+            self.surface = self.rect = None
+        else:
+            self.surface, pos = placed
+            self.rect = self.surface.get_rect(topleft=pos)
+            if self.rect not in changed:
+                changed.append(self.rect)
+        return changed
+
+
+class InventoryBar(Widget):
+    def __init__(self, font: pygame.font.Font, small_font: pygame.font.Font, defs: Definitions) -> None:
+        super().__init__()
+        self.font = font
+        self.small_font = small_font
+        self.items = [(name, defs.item_ids[name]) for name in INVENTORY_ITEMS]
+        self.axe = defs.item_ids["axe"]
+        self.pickaxe = defs.item_ids["pickaxe"]
+        self.item_rects: dict[str, pygame.Rect] = {}  # screen coordinates, for clicks
+
+    def state(self, view: WorldSnapshot, ui: UiState) -> Hashable:
+        return view.inventory.version, ui.selected_panel
+
+    def render(self, view: WorldSnapshot, ui: UiState) -> Placed:
+        x0, y0 = 10, 10
+        bar_h = 40
+        surface = pygame.Surface((660, 64), pygame.SRCALPHA)
+        pygame.draw.rect(surface, (0, 0, 0), (0, 0, 660, bar_h))
+
+        self.item_rects = {}
+        cursor_x = 10
+        pad = 8
+        for name, item_id in self.items:
+            surf = render_text(self.font, f"{name}: {view.inventory.count(item_id)}", (255, 255, 255))
+            rect = pygame.Rect(cursor_x - 6, 6, surf.get_width() + 12, bar_h - 12)
+
+            if ui.selected_panel == name:
+                pygame.draw.rect(surface, (60, 60, 60), rect)
+            pygame.draw.rect(surface, (255, 255, 255), rect, 1)
+
+            surface.blit(surf, (cursor_x, 10))
+            self.item_rects[name] = rect.move(x0, y0)
+            cursor_x += rect.width + pad
+
+        axe = "yes" if view.inventory.has(self.axe) else "no"
+        pickaxe = "yes" if view.inventory.has(self.pickaxe) else "no"
+        tool_surf = render_text(self.small_font, f"Axe: {axe}   Pickaxe: {pickaxe}", (255, 255, 255))
+        surface.blit(tool_surf, (10, 44))
+        return surface, (x0, y0)
+
+
+class QuestBanner(Widget):
+    def __init__(self, font: pygame.font.Font) -> None:
+        super().__init__()
+        self.font = font
+
+    def state(self, view: WorldSnapshot, ui: UiState) -> Hashable:
+        return (
+            view.completed_quests,
+            view.total_quests,
+            view.quest_ready_to_turn_in,
+            view.quest_label,
+            view.quest_progress,
+        )
+
+    def render(self, view: WorldSnapshot, ui: UiState) -> Placed:
+        number = f"{view.completed_quests + 1}/{view.total_quests}"
+        if view.completed_quests >= view.total_quests:
+            text = render_text(self.font, "All quests complete! 🎉", (0, 0, 0))
+            background = (255, 255, 0)
+        elif view.quest_ready_to_turn_in:
+            text = render_text(self.font, f"Quest {number} done! Press 🏠 for next.", (255, 255, 0))
+            background = (0, 0, 0)
+        else:
+            current, target = view.quest_progress
+            label = f"Quest {number}: {view.quest_label} ({current}/{target})"
+            text = render_text(self.font, label, (255, 255, 0))
+            background = (0, 0, 0)
+        surface = pygame.Surface((text.get_width() + 16, 35))
+        surface.fill(background)
+        surface.blit(text, (8, 7))
+        return surface, ((WIDTH - surface.get_width()) // 2, 10)
+
+
+class HelpBar(Widget):
+    def __init__(self, small_font: pygame.font.Font, defs: Definitions) -> None:
+        super().__init__()
+        self.small_font = small_font
+        fire_cost = defs.recipe_cost_text[defs.recipe_ids["fire"]]
+        self.text = (
+            f"Move: arrows | Cut: L | Mine: X | Fire: F ({fire_cost}) | Build: B (home) | "
+            "Craft: C (home) | Click inventory | 🏠"
+        )
+
+    def state(self, view: WorldSnapshot, ui: UiState) -> Hashable:
+        return self.text
+
+    def render(self, view: WorldSnapshot, ui: UiState) -> Placed:
+        text = render_text(self.small_font, self.text, (255, 255, 255))
+        surface = pygame.Surface((text.get_width() + 10, 35))
+        surface.blit(text, (5, 7))
+        return surface, (80, HEIGHT - 45)
+
+
+class MessageBox(Widget):
+    def __init__(self, font: pygame.font.Font) -> None:
+        super().__init__()
+        self.font = font
+
+    def state(self, view: WorldSnapshot, ui: UiState) -> Hashable:
+        return view.message
+
+    def render(self, view: WorldSnapshot, ui: UiState) -> Placed | None:
+        if not view.message:
+            return None
+        text = render_text(self.font, view.message, (255, 255, 255))
+        surface = pygame.Surface((text.get_width() + 16, 34))
+        surface.blit(text, (8, 7))
+        return surface, ((WIDTH - surface.get_width()) // 2, 55)
+
+
+class ActionProgress(Widget):
+    bar_w, bar_h = 300, 18
+
+    def __init__(self, font: pygame.font.Font) -> None:
+        super().__init__()
+        self.font = font
+
+    def state(self, view: WorldSnapshot, ui: UiState) -> Hashable:
+        if view.action_mode is None:
+            return None
+        # Only whole pixels of bar are visible, so only those count as a change.
+        return view.action_mode, int(self.bar_w * view.action_progress)
+
+    def render(self, view: WorldSnapshot, ui: UiState) -> Placed | None:
+        if view.action_mode is None:
+            return None
+        bar_w, bar_h = self.bar_w, self.bar_h
+        surface = pygame.Surface((bar_w + 4, 26 + bar_h + 2), pygame.SRCALPHA)
+        by = 26
+        pygame.draw.rect(surface, (0, 0, 0), (0, by - 2, bar_w + 4, bar_h + 4))
+        pygame.draw.rect(surface, (80, 80, 80), (2, by, bar_w, bar_h))
+        pygame.draw.rect(surface, (200, 200, 200), (2, by, int(bar_w * view.action_progress), bar_h))
+
+        label = "Cutting..." if view.action_mode == "cut" else "Mining..."
+        surface.blit(render_text(self.font, label, (255, 255, 255)), (2, 0))
+        return surface, ((WIDTH - bar_w) // 2 - 2, 95 - by)
+
+
+class HomeButton(Widget):
+    def __init__(self, font: pygame.font.Font, button: pygame.Rect) -> None:
+        super().__init__()
+        self.font = font
+        self.button = button
+
+    def state(self, view: WorldSnapshot, ui: UiState) -> Hashable:
+        return tuple(self.button)
+
+    def render(self, view: WorldSnapshot, ui: UiState) -> Placed:
+        surface = pygame.Surface(self.button.size)
+        pygame.draw.rect(surface, (255, 255, 255), surface.get_rect(), 2)
+        surface.blit(render_text(self.font, "🏠", (255, 255, 255)), (18, 12))
+        return surface, self.button.topleft
+
+
+class DetailsPanel(Widget):
+    def __init__(self, font: pygame.font.Font, small_font: pygame.font.Font, defs: Definitions) -> None:
+        super().__init__()
+        self.font = font
+        self.small_font = small_font
+        self.defs = defs
+
+    def state(self, view: WorldSnapshot, ui: UiState) -> Hashable:
+        if ui.selected_panel not in DETAIL_ITEMS:
+            return None
+        return ui.selected_panel, view.inventory.version
+
+    def render(self, view: WorldSnapshot, ui: UiState) -> Placed | None:
+        name = ui.selected_panel
+        if name not in DETAIL_ITEMS:
+            return None
+        item_id = self.defs.item_ids[name]
+        subtypes = list(zip(self.defs.item_subtypes[item_id], view.inventory.subtypes[item_id]))
+        panel = render_details_panel(self.font, self.small_font, name, subtypes)
+        return panel, (WIDTH - panel.get_width() - 10, 10)
+
+
+class CraftMenu(Widget):
+    def __init__(
+        self,
+        font: pygame.font.Font,
+        small_font: pygame.font.Font,
+        panel: pygame.Rect,
+        buttons: list[tuple[int, pygame.Rect]],
+        defs: Definitions,
+    ) -> None:
+        super().__init__()
+        self.font = font
+        self.small_font = small_font
+        self.panel = panel
+        self.buttons = buttons
+        self.defs = defs
+
+    def state(self, view: WorldSnapshot, ui: UiState) -> Hashable:
+        if not view.craft_menu_open:
+            return None
+        return view.inventory.version
+
+    def render(self, view: WorldSnapshot, ui: UiState) -> Placed | None:
+        if not view.craft_menu_open:
+            return None
+        menu = render_craft_menu(self.font, self.small_font, self.panel, self.buttons, self.defs, view.inventory)
+        return menu, self.panel.topleft
+
+
+class ProfileOverlay(Widget):
+    # The overlay surface is rebuilt by the game a few times a second; a new surface is a new state.
+    def state(self, view: WorldSnapshot, ui: UiState) -> Hashable:
+        return ui.profile_overlay
+
+    def render(self, view: WorldSnapshot, ui: UiState) -> Placed | None:
+        overlay = ui.profile_overlay
+        if overlay is None:
+            return None
+        return overlay, (WIDTH - overlay.get_width() - 10, 60)
+
+
+class Hud:
+    """Retained-mode HUD: widgets in draw order, each re-rendered only on change.
+
+    `refresh` brings every widget up to date and returns the screen areas that
+    changed. After a full world redraw `blit` composites every widget; when
+    the world underneath is unchanged `restore` repaints just the changed areas
+    from a saved copy of the world so only those need pushing to the display.
+    """
+
+    def __init__(self, widgets: list[Widget]) -> None:
+        self.widgets = widgets
+
+    def refresh(self, view: WorldSnapshot, ui: UiState) -> list[pygame.Rect]:
+        changed: list[pygame.Rect] = []
+        for widget in self.widgets:
+            changed.extend(widget.refresh(view, ui))
+        return changed
+
+    def blit(self, screen: pygame.Surface) -> None:
+        for widget in self.widgets:
+            if widget.surface is not None:
+                screen.blit(widget.surface, widget.rect)
+
+    def restore(self, screen: pygame.Surface, world: pygame.Surface, areas: list[pygame.Rect]) -> None:
+        for area in areas:
+            # Clipped, so translucent widgets overlapping the area aren't blended twice outside it.
+            screen.set_clip(area)
+            screen.blit(world, area, area)
+            for widget in self.widgets:
+                if widget.surface is not None and widget.rect.colliderect(area):
+                    screen.blit(widget.surface, widget.rect)
+        screen.set_clip(None)
@@ -0,0 +1,107 @@
+from dataclasses import dataclass, fields
+
+
+@dataclass(slots=True)
+class Stats:
+    wood_collected: int = 0
+    stone_collected: int = 0
+    rare_collected: int = 0
+    fires_made: int = 0
+    trees_cut: int = 0
+    stones_mined: int = 0
+    home_returns: int = 0
+
+    def bump(self, name: str) -> None:
+        # For stats named in data (recipes); code that knows the stat uses the attribute directly.
+        setattr(self, name, getattr(self, name) + 1)
+
+    def as_dict(self) -> dict[str, int]:
+        return {name: getattr(self, name) for name in STAT_NAMES}
+
+
+STAT_NAMES = tuple(f.name for f in fields(Stats))
+
+
+@dataclass(frozen=True, slots=True)
+class InventoryState:
+    """Immutable copy of an `Inventory`, for snapshots and the HUD."""
+
+    counts: tuple[int, ...]
+    owned: int
+    subtypes: tuple[tuple[int, ...], ...]
+    version: int
+
+    def count(self, item_id: int) -> int:
+        return self.counts[item_id]
+
+    def has(self, item_id: int) -> bool:
+        return bool(self.owned >> item_id & 1)
+
+    def can_afford(self, costs: tuple[tuple[int, int], ...]) -> bool:
+        counts = self.counts
+        return all(counts[item_id] >= amount for item_id, amount in costs)
+
+
+class Inventory:
+    """Item counts and owned tools/buildings, addressed by item id (`defs.item_ids`).
+
+    Counted items live in a plain list, owned items (tools, the house) are bits
+    in `owned`, and items with subtypes (oak/pine wood, ...) also keep a count
+    per subtype. Changes are signalled only through `version`, which every
+    change bumps; `state()` and the HUD widgets (through the snapshot copy)
+    compare it to skip work when nothing changed. There are no callbacks.
+    """
+
+    __slots__ = ("counts", "owned", "subtypes", "version", "frozen")
+
+    def __init__(self, item_count: int, subtype_counts: list[int]) -> None:
+        self.counts = [0] * item_count
+        self.owned = 0
+        self.subtypes = [[0] * n for n in subtype_counts]
+        self.version = 0
+        self.frozen: InventoryState | None = None
+
+    def count(self, item_id: int) -> int:
+        return self.counts[item_id]
+
+    def has(self, item_id: int) -> bool:
+        return bool(self.owned >> item_id & 1)
+
+    def can_afford(self, costs: tuple[tuple[int, int], ...]) -> bool:
+        counts = self.counts
+        return all(counts[item_id] >= amount for item_id, amount in costs)
+
+    def add(self, item_id: int, amount: int = 1, subtype: int | None = None) -> None:
+        self.counts[item_id] += amount
+        if subtype is not None:
+            self.subtypes[item_id][subtype] += amount
+        self.version += 1
+
+    def take(self, item_id: int, amount: int) -> None:
+        # Subtype counts record what was collected, so spending leaves them alone.
+        self.counts[item_id] -= amount
+        self.version += 1
+
+    def set_count(self, item_id: int, amount: int) -> None:
+        self.counts[item_id] = amount
+        self.version += 1
+
+    def set_subtype(self, item_id: int, subtype: int, amount: int) -> None:
+        self.subtypes[item_id][subtype] = amount
+        self.version += 1
+
+    def set_owned(self, item_id: int, owned: bool) -> None:
+        if owned:
+            self.owned |= 1 << item_id
+        else:
+            self.owned &= ~(1 << item_id)
+        self.version += 1
+
+    def state(self) -> InventoryState:
+        # Rebuilt only after a change; snapshots taken in between share one copy.
+        frozen = self.frozen
+        if frozen is None or frozen.version != self.version:
+            frozen = self.frozen = InventoryState(
+                tuple(self.counts), self.owned, tuple(map(tuple, self.subtypes)), self.version
+            )
+        return frozen
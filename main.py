@@ -1,8 +1,20 @@
+import argparse
+
+from config import SIM_THREADED
 from game import Game
 
 
 def main() -> None:
-    game = Game()
+    parser = argparse.ArgumentParser(description="Play the game.")
+    parser.add_argument("--seed", type=int, help="start a new world from this seed (not saved)")
+    parser.add_argument("--record", metavar="FILE", help="record a replay of this session to FILE")
+    parser.add_argument(
+        "--threaded", action="store_true", default=SIM_THREADED, help="run the simulation on its own thread"
+    )
+    parser.add_argument("--profile-trace", metavar="FILE", help="write a Chrome trace (JSON) of frame timings on exit")
+    args = parser.parse_args()
+
+    game = Game(seed=args.seed, record_path=args.record, threaded=args.threaded, trace_path=args.profile_trace)
     game.run()
 
 
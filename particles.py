@@ -0,0 +1,72 @@
+import numpy as np
+
+
+class ParticleSystem:
+    """Pooled particles in preallocated arrays.
+
+    Live particles always occupy the first `count` slots; `step` integrates them
+    in one vectorized pass and compacts dead ones away in place.
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self.pos = np.zeros((capacity, 2), dtype=np.float64)
+        self.vel = np.zeros((capacity, 2), dtype=np.float64)
+        self.life = np.zeros(capacity, dtype=np.float64)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def capacity(self) -> int:
+        return len(self.life)
+
+    def reserve(self, needed: int) -> None:
+        if needed <= self.capacity:
+            return
+        new_capacity = max(needed, self.capacity * 2)
+        for name in ("pos", "vel", "life", "color"):
+            old = getattr(self, name)
+            new = np.zeros((new_capacity,) + old.shape[1:], dtype=old.dtype)
+            new[: self.count] = old[: self.count]
+            setattr(self, name, new)
+
+    def spawn_burst(
+        self,
+        x: float,
+        y: float,
+        angles: np.ndarray,
+        speeds: np.ndarray,
+        lives: np.ndarray,
+        color: tuple[int, int, int],
+    ) -> None:
+        n = len(angles)
+        self.reserve(self.count + n)
+        s = slice(self.count, self.count + n)
+        self.pos[s] = (x, y)
+        self.vel[s, 0] = speeds * np.cos(angles)
+        self.vel[s, 1] = speeds * np.sin(angles)
+        self.life[s] = lives
+        self.color[s] = color
+        self.count += n
+
+    def step(self, dt: float, gravity: float) -> None:
+        n = self.count
+        if n == 0:
+            return
+
+        life = self.life[:n]
+        life -= dt
+        alive = life > 0
+        kept = int(np.count_nonzero(alive))
+        if kept < n:
+            for arr in (self.pos, self.vel, self.life, self.color):
+                arr[:kept] = arr[:n][alive]
+            n = self.count = kept
+
+        self.pos[:n] += self.vel[:n] * dt
+        self.vel[:n, 1] += gravity * dt
+
+    def clear(self) -> None:
+        self.count = 0
@@ -0,0 +1,136 @@
+import math
+import random
+from functools import lru_cache
+
+import pygame
+
+from world import SpatialGrid
+
+# Distinct precomputed sample sets per size; with mirroring that is 4x as many layouts.
+TILE_VARIANTS = 8
+
+
+def poisson_disk(
+    rng: random.Random, width: float, height: float, radius: float, attempts: int = 30
+) -> list[tuple[float, float]]:
+    """Bridson's Poisson-disk sampling: points in [0, width) x [0, height), none closer than `radius`.
+
+    Work is bounded: every point costs at most `attempts` candidates to add and
+    `attempts` more to retire, and the area only fits so many points.
+    """
+    if width <= 0 or height <= 0:
+        return []
+    # Occupancy grid for the samples themselves: a cell this size holds at most one point.
+    cell = radius / math.sqrt(2)
+    cols = int(width // cell) + 1
+    rows = int(height // cell) + 1
+    grid = [-1] * (cols * rows)
+    points: list[tuple[float, float]] = []
+    active: list[int] = []
+    r2 = radius * radius
+
+    def add(x: float, y: float) -> None:
+        grid[int(y // cell) * cols + int(x // cell)] = len(points)
+        active.append(len(points))
+        points.append((x, y))
+
+    def fits(x: float, y: float) -> bool:
+        gx = int(x // cell)
+        gy = int(y // cell)
+        for ny in range(max(0, gy - 2), min(rows, gy + 3)):
+            for nx in range(max(0, gx - 2), min(cols, gx + 3)):
+                j = grid[ny * cols + nx]
+                if j >= 0:
+                    dx = points[j][0] - x
+                    dy = points[j][1] - y
+                    if dx * dx + dy * dy < r2:
+                        return False
+        return True
+
+    add(rng.uniform(0, width), rng.uniform(0, height))
+    while active:
+        slot = rng.randrange(len(active))
+        px, py = points[active[slot]]
+        for _ in range(attempts):
+            angle = rng.uniform(0.0, 2 * math.pi)
+            dist = rng.uniform(radius, 2 * radius)
+            x = px + math.cos(angle) * dist
+            y = py + math.sin(angle) * dist
+            if 0 <= x < width and 0 <= y < height and fits(x, y):
+                add(x, y)
+                break
+        else:
+            active[slot] = active[-1]
+            active.pop()
+    return points
+
+
+@lru_cache(maxsize=64)
+def blue_noise_tile(width: int, height: int, radius: int, variant: int) -> tuple[tuple[float, float], ...]:
+    # Sampling costs a few ms in pure Python, far too slow per chunk load; every chunk reuses a few fixed sets.
+    return tuple(poisson_disk(random.Random(f"tile:{width}x{height}:{radius}:{variant}"), width, height, radius))
+
+
+class Placer:
+    """Finds non-overlapping spots for new trees and stones.
+
+    Candidates are Poisson-disk samples at least `spacing` apart (top-left
+    corners), so as long as `spacing` exceeds the diagonal of the largest node
+    no two candidates can overlap. The samples come from a few cached
+    blue-noise tiles, randomly picked, mirrored and shuffled per call. Each
+    candidate is then checked against the nodes already in the world
+    (`occupied` indexes) and the keep-out rects. A full area gives None
+    instead of retrying forever.
+    """
+
+    def __init__(self, spacing: int, margin: int, occupied: list[SpatialGrid]) -> None:
+        self.spacing = spacing
+        self.margin = margin
+        self.occupied = occupied
+
+    def candidates(self, rng: random.Random, width: int, height: int) -> list[tuple[float, float]]:
+        tile = blue_noise_tile(width, height, self.spacing, rng.randrange(TILE_VARIANTS))
+        # Mirroring keeps every pairwise distance, so the spacing guarantee holds.
+        flip_x = rng.random() < 0.5
+        flip_y = rng.random() < 0.5
+        points = [(width - x if flip_x else x, height - y if flip_y else y) for x, y in tile]
+        rng.shuffle(points)
+        return points
+
+    def is_free(self, rect: pygame.Rect, keep_out: list[pygame.Rect]) -> bool:
+        if rect.collidelist(keep_out) >= 0:
+            return False
+        return not any(index.query_rect(rect, ordered=False) for index in self.occupied)
+
+    def place_batch(
+        self,
+        rng: random.Random,
+        area: pygame.Rect,
+        sizes: list[tuple[int, int]],
+        keep_out: list[pygame.Rect],
+    ) -> list[pygame.Rect | None]:
+        if not sizes:
+            return []
+        # One sample set for the whole batch, so the batch can't overlap itself either.
+        max_w = max(w for w, _ in sizes)
+        max_h = max(h for _, h in sizes)
+        left = area.left + self.margin
+        top = area.top + self.margin
+        candidates = iter(
+            self.candidates(rng, area.width - 2 * self.margin - max_w, area.height - 2 * self.margin - max_h)
+        )
+        placed: list[pygame.Rect | None] = []
+        for w, h in sizes:
+            spot = None
+            for x, y in candidates:
+                rect = pygame.Rect(left + int(x), top + int(y), w, h)
+                if self.is_free(rect, keep_out):
+                    spot = rect
+                    break
+            placed.append(spot)
+        return placed
+
+    def place(
+        self, rng: random.Random, area: pygame.Rect, w: int, h: int, keep_out: list[pygame.Rect]
+    ) -> pygame.Rect | None:
+        return self.place_batch(rng, area, [(w, h)], keep_out)[0]
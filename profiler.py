@@ -0,0 +1,120 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+import numpy as np
+
+
+class Section:
+    """Reusable timer for one named section; use it as a context manager."""
+
+    __slots__ = ("profiler", "name", "samples", "started")
+
+    def __init__(self, profiler: "FrameProfiler", name: str) -> None:
+        self.profiler = profiler
+        self.name = name
+        self.samples: deque[int] = deque(maxlen=profiler.window)
+        self.started = 0
+
+    def __enter__(self) -> None:
+        self.started = time.perf_counter_ns()
+
+    def __exit__(self, *_exc: object) -> None:
+        ended = time.perf_counter_ns()
+        self.samples.append(ended - self.started)
+        trace = self.profiler.trace
+        if trace is not None:
+            ident = threading.get_ident()
+            # Named now, while the thread exists; it may be gone by the time the trace is exported.
+            if ident not in self.profiler.thread_names:
+                self.profiler.thread_names[ident] = threading.current_thread().name
+            trace.append((self.name, self.started, ended, ident))
+
+
+class FrameProfiler:
+    """Rolling per-section timings plus an optional Chrome trace.
+
+    Each section keeps its last `window` durations for p50/p95/p99. With
+    `trace_events` set, every timed call is also kept (up to that many, oldest
+    dropped first) so `export_chrome_trace` can write a file for
+    chrome://tracing or https://ui.perfetto.dev. Stop any other timed threads
+    before exporting.
+    """
+
+    def __init__(self, window: int = 300, trace_events: int | None = None) -> None:
+        self.window = window
+        self.sections: dict[str, Section] = {}
+        self.trace: deque[tuple[str, int, int, int]] | None = None
+        self.thread_names: dict[int, str] = {}
+        if trace_events is not None:
+            self.trace = deque(maxlen=trace_events)
+        self.epoch = time.perf_counter_ns()
+
+    def section(self, name: str) -> Section:
+        section = self.sections.get(name)
+        if section is None:
+            section = self.sections[name] = Section(self, name)
+        return section
+
+    def wrap(self, name: str, fn: Callable) -> Callable:
+        section = self.section(name)
+
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            with section:
+                return fn(*args, **kwargs)
+
+        return timed
+
+    def instrument(self, obj: object, names: list[str], prefix: str = "") -> None:
+        # Replaces the bound methods on this one instance; other instances (headless runs) stay untimed.
+        for name in names:
+            setattr(obj, name, self.wrap(prefix + name, getattr(obj, name)))
+
+    def percentiles(self, name: str) -> tuple[float, float, float] | None:
+        # (p50, p95, p99) in milliseconds over the rolling window.
+        section = self.sections.get(name)
+        if section is None or not section.samples:
+            return None
+        samples = np.asarray(tuple(section.samples), dtype=np.float64)
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99]) / 1e6
+        return float(p50), float(p95), float(p99)
+
+    def summary(self) -> list[tuple[str, float, float, float]]:
+        # Slowest sections (by p95) first.
+        rows = []
+        for name in list(self.sections):
+            stats = self.percentiles(name)
+            if stats is not None:
+                rows.append((name, *stats))
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows
+
+    def export_chrome_trace(self, path: str) -> int:
+        if self.trace is None:
+            return 0
+        # One copy (made in C, without letting other threads run) and only that copy is walked.
+        entries = list(self.trace)
+        events: list[dict] = []
+        for tid in {entry[3] for entry in entries}:
+            thread_name = self.thread_names.get(tid, str(tid))
+            events.append({"name": "thread_name", "ph": "M", "pid": 0, "tid": tid, "args": {"name": thread_name}})
+        for name, started, ended, tid in entries:
+            events.append(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": (started - self.epoch) / 1000,
+                    "dur": (ended - started) / 1000,
+                    "pid": 0,
+                    "tid": tid,
+                }
+            )
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fh)
+        return len(events)
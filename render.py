@@ -0,0 +1,218 @@
+import bisect
+import math
+from collections import OrderedDict
+
+import pygame
+
+Color = tuple[int, int, int]
+
+COLORKEY = (255, 0, 255)
+
+
+class PrismCache:
+    """LRU cache of pre-rendered iso prisms.
+
+    `iso_point` is a pure translation for a given camera, so a prism's pixels only
+    depend on its base size, height, colours and the iso scale. Each shape is
+    rasterised once and then blitted at an offset.
+    """
+
+    def __init__(self, scale_x: float, scale_y: float, max_entries: int = 256) -> None:
+        self.scale_x = scale_x
+        self.scale_y = scale_y
+        self.max_entries = max_entries
+        self.entries: OrderedDict[tuple, tuple[pygame.Surface, int, int]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self,
+        width: int,
+        depth: int,
+        height: int,
+        top_color: Color,
+        left_color: Color,
+        right_color: Color,
+    ) -> tuple[pygame.Surface, int, int]:
+        key = (width, depth, height, top_color, left_color, right_color)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        entry = self.render(width, depth, height, top_color, left_color, right_color)
+        self.entries[key] = entry
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return entry
+
+    def render(
+        self,
+        width: int,
+        depth: int,
+        height: int,
+        top_color: Color,
+        left_color: Color,
+        right_color: Color,
+    ) -> tuple[pygame.Surface, int, int]:
+        sx, sy = self.scale_x, self.scale_y
+        # Offset from the projected top-left base corner to the surface origin.
+        ox = depth * sx
+        oy = float(height)
+        surf_w = math.ceil((width + depth) * sx) + 2
+        surf_h = math.ceil((width + depth) * sy + height) + 2
+
+        def local(dx: float, dy: float) -> tuple[float, float]:
+            return ((dx - dy) * sx + ox, (dx + dy) * sy + oy)
+
+        base = [local(0, 0), local(width, 0), local(width, depth), local(0, depth)]
+        top = [(x, y - height) for x, y in base]
+
+        surface = pygame.Surface((surf_w, surf_h))
+        surface.fill(COLORKEY)
+        pygame.draw.polygon(surface, left_color, [base[3], base[2], top[2], top[3]])
+        pygame.draw.polygon(surface, right_color, [base[1], base[2], top[2], top[1]])
+        pygame.draw.polygon(surface, top_color, top)
+        surface.set_colorkey(COLORKEY, pygame.RLEACCEL)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+            surface.set_colorkey(COLORKEY, pygame.RLEACCEL)
+        return surface, int(ox), int(oy)
+
+
+class DepthList:
+    """Draw order kept sorted across frames.
+
+    Only entries that appear, disappear or change depth are touched; everything
+    else keeps its slot, so a mostly-static scene costs no sort per frame.
+    """
+
+    def __init__(self) -> None:
+        self.entries: list[tuple[int, int]] = []
+        self.depths: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, handle: int) -> bool:
+        return handle in self.depths
+
+    def update(self, handle: int, depth: int) -> None:
+        old = self.depths.get(handle)
+        if old == depth:
+            return
+        if old is not None:
+            self.entries.pop(bisect.bisect_left(self.entries, (old, handle)))
+        self.depths[handle] = depth
+        bisect.insort(self.entries, (depth, handle))
+
+    def discard(self, handle: int) -> None:
+        old = self.depths.pop(handle, None)
+        if old is not None:
+            self.entries.pop(bisect.bisect_left(self.entries, (old, handle)))
+
+    def retain(self, handles: set[int]) -> None:
+        for handle in [h for h in self.depths if h not in handles]:
+            self.discard(handle)
+
+    def split_at(self, depth: int) -> int:
+        # Index where a moving object at `depth` goes; it draws after equal-depth entries.
+        return bisect.bisect_right(self.entries, (depth, float("inf")))
+
+
+class BackgroundLayer:
+    """Static ground scenery rendered once and scrolled with the camera.
+
+    The layer is a bounded surface (screen plus `pad` on each side) drawn for a
+    camera origin. Small camera moves just shift the blit; the layer is only
+    re-rasterised when the camera drifts past the padding or when a shape is
+    changed, and in the latter case only the changed region is redrawn.
+    """
+
+    def __init__(
+        self,
+        size: tuple[int, int],
+        anchor: tuple[float, float],
+        scale_x: float,
+        scale_y: float,
+        fill_color: Color,
+        pad: int = 200,
+    ) -> None:
+        self.width, self.height = size
+        self.anchor = anchor
+        self.scale_x = scale_x
+        self.scale_y = scale_y
+        self.fill_color = fill_color
+        self.pad = pad
+        self.surface = pygame.Surface((self.width + pad * 2, self.height + pad * 2))
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert()
+        self.shapes: dict[str, tuple[pygame.Rect, Color, int]] = {}
+        self.origin: tuple[float, float] | None = None
+        self.dirty: list[pygame.Rect] = []
+        self.full_redraws = 0
+
+    def project(self, wx: float, wy: float) -> tuple[int, int]:
+        ox, oy = self.origin if self.origin is not None else (0.0, 0.0)
+        dx = wx - ox
+        dy = wy - oy
+        sx = int((dx - dy) * self.scale_x + self.anchor[0] + self.pad)
+        sy = int((dx + dy) * self.scale_y + self.anchor[1] + self.pad)
+        return sx, sy
+
+    def shape_poly(self, rect: pygame.Rect) -> list[tuple[int, int]]:
+        return [
+            self.project(rect.left, rect.top),
+            self.project(rect.right, rect.top),
+            self.project(rect.right, rect.bottom),
+            self.project(rect.left, rect.bottom),
+        ]
+
+    def shape_area(self, rect: pygame.Rect, width: int) -> pygame.Rect:
+        poly = self.shape_poly(rect)
+        xs = [p[0] for p in poly]
+        ys = [p[1] for p in poly]
+        area = pygame.Rect(min(xs), min(ys), max(xs) - min(xs) + 1, max(ys) - min(ys) + 1)
+        return area.inflate(width * 2 + 2, width * 2 + 2).clip(self.surface.get_rect())
+
+    def set_shape(self, key: str, rect: pygame.Rect, color: Color, width: int = 0) -> None:
+        shape = (rect.copy(), color, width)
+        old = self.shapes.get(key)
+        if old == shape:
+            return
+        if old is not None:
+            self.mark_dirty(old[0], old[2])
+        self.shapes[key] = shape
+        self.mark_dirty(rect, width)
+
+    def mark_dirty(self, rect: pygame.Rect, width: int = 0) -> None:
+        if self.origin is not None:
+            self.dirty.append(self.shape_area(rect, width))
+
+    def redraw(self, area: pygame.Rect | None = None) -> None:
+        self.surface.set_clip(area)
+        self.surface.fill(self.fill_color)
+        for rect, color, width in self.shapes.values():
+            pygame.draw.polygon(self.surface, color, self.shape_poly(rect), width)
+        self.surface.set_clip(None)
+
+    def blit(self, screen: pygame.Surface, camera: tuple[float, float]) -> None:
+        if self.origin is not None:
+            dx = camera[0] - self.origin[0]
+            dy = camera[1] - self.origin[1]
+            shift_x = round((dx - dy) * self.scale_x)
+            shift_y = round((dx + dy) * self.scale_y)
+        if self.origin is None or abs(shift_x) > self.pad or abs(shift_y) > self.pad:
+            self.origin = camera
+            self.dirty.clear()
+            self.redraw()
+            self.full_redraws += 1
+            shift_x = shift_y = 0
+        elif self.dirty:
+            for area in self.dirty:
+                self.redraw(area)
+            self.dirty.clear()
+
+        screen.blit(self.surface, (-self.pad - shift_x, -self.pad - shift_y))
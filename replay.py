@@ -0,0 +1,109 @@
+import argparse
+import json
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+
+from config import SIM_DT, TICK_RATE
+from savegame import state_hash
+from simulation import SimInput, Simulation
+
+# Bumped whenever the same seed + inputs stop giving the same game (e.g. world generation changes).
+REPLAY_VERSION = 2
+
+
+@dataclass
+class Replay:
+    seed: int
+    end_tick: int = 0
+    # tick -> (move_x, move_y, actions); movement holds until the next entry.
+    inputs: dict[int, tuple[int, int, list[str]]] = field(default_factory=dict)
+
+
+class ReplayRecorder:
+    """Logs the per-tick simulation input of a session to a small text file.
+
+    The log holds what `Simulation.step` saw (movement + actions per tick), which
+    is everything needed to reproduce a run from its seed. Only ticks whose
+    input changed are written.
+    """
+
+    def __init__(self, path: str, seed: int) -> None:
+        self.fh = open(path, "w", encoding="utf-8")
+        header = {"version": REPLAY_VERSION, "seed": seed, "tick_rate": TICK_RATE}
+        self.fh.write(json.dumps(header) + "\n")
+        self.last_move = (0, 0)
+        self.tick = 0
+
+    def record(self, tick: int, inputs: SimInput) -> None:
+        self.tick = tick
+        move = (inputs.move_x, inputs.move_y)
+        if inputs.actions or move != self.last_move:
+            self.fh.write(f"{tick} {move[0]} {move[1]} {','.join(inputs.actions)}\n")
+            self.last_move = move
+
+    def close(self) -> None:
+        self.fh.write(f"end {self.tick}\n")
+        self.fh.close()
+
+
+def load_replay(path: str) -> Replay:
+    with open(path, encoding="utf-8") as fh:
+        header = json.loads(fh.readline())
+        if header.get("version") != REPLAY_VERSION:
+            raise ValueError(f"unsupported replay version {header.get('version')}")
+        if header.get("tick_rate") != TICK_RATE:
+            raise ValueError(f"replay was recorded at {header.get('tick_rate')} Hz, game runs at {TICK_RATE} Hz")
+
+        replay = Replay(int(header["seed"]))
+        for line in fh:
+            parts = line.split()
+            if not parts:
+                continue
+            if parts[0] == "end":
+                replay.end_tick = int(parts[1])
+                continue
+            tick = int(parts[0])
+            actions = parts[3].split(",") if len(parts) > 3 else []
+            replay.inputs[tick] = (int(parts[1]), int(parts[2]), actions)
+            replay.end_tick = max(replay.end_tick, tick)
+    return replay
+
+
+def run_replay(replay: Replay) -> Simulation:
+    sim = Simulation(replay.seed)
+    move_x = move_y = 0
+    # Keep chunk spill files away from the real save folder.
+    with tempfile.TemporaryDirectory() as spill_dir:
+        sim.chunks.spill_dir = spill_dir
+        for tick in range(1, replay.end_tick + 1):
+            entry = replay.inputs.get(tick)
+            actions: list[str] = []
+            if entry is not None:
+                move_x, move_y, actions = entry
+            sim.step(SIM_DT, SimInput(move_x, move_y, list(actions)))
+    return sim
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay a recorded session headlessly and hash the final state.")
+    parser.add_argument("replay")
+    parser.add_argument("--expect", help="fail unless the final state hash matches")
+    args = parser.parse_args()
+
+    replay = load_replay(args.replay)
+    started = time.perf_counter()
+    sim = run_replay(replay)
+    elapsed = time.perf_counter() - started
+    digest = state_hash(sim)
+    rate = replay.end_tick / elapsed if elapsed > 0 else float("inf")
+    print(f"{replay.end_tick} ticks in {elapsed:.2f}s -> {rate:.0f} ticks/s")
+    print(f"state hash: {digest}")
+    if args.expect is not None and args.expect != digest:
+        print("state hash MISMATCH", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import numpy as np
+import pygame
+
+KIND_TREE = 0
+KIND_STONE = 1
+
+CHANGE_ADD = 0
+CHANGE_REMOVE = 1
+
+# Growth is only visible in steps this fine, so `growth_version` moves on once per step.
+GROWTH_STEPS = 64
+
+
+class ResourceStore:
+    """Struct-of-arrays storage for trees and stones.
+
+    Ids are slot numbers: they stay valid until the node is removed, and freed
+    slots are reused by later `add` calls.
+    """
+
+    def __init__(self, capacity: int = 64) -> None:
+        self.x = np.zeros(capacity, dtype=np.int32)
+        self.y = np.zeros(capacity, dtype=np.int32)
+        self.w = np.zeros(capacity, dtype=np.int32)
+        self.h = np.zeros(capacity, dtype=np.int32)
+        self.growth = np.zeros(capacity, dtype=np.float64)
+        self.kind = np.zeros(capacity, dtype=np.uint8)
+        self.alive = np.zeros(capacity, dtype=np.bool_)
+        self.used = 0
+        self.free: list[int] = []
+        # (change, id) log for incremental saves; None while nobody is tracking.
+        self.changes: list[tuple[int, int]] | None = None
+        # Bumped whenever a node appears, moves or goes away (growth doesn't count).
+        self.version = 0
+        # Bumped when some node's growth crosses into a new GROWTH_STEPS step.
+        self.growth_version = 0
+        # Frozen copy of the columns for snapshots, rebuilt by snapshot.node_layout when `version` moves on.
+        self.snapshot_layout = None
+
+    def __len__(self) -> int:
+        return self.used - len(self.free)
+
+    @property
+    def capacity(self) -> int:
+        return len(self.alive)
+
+    def grow_capacity(self) -> None:
+        new_capacity = max(16, self.capacity * 2)
+        for name in ("x", "y", "w", "h", "growth", "kind", "alive"):
+            old = getattr(self, name)
+            new = np.zeros(new_capacity, dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
+
+    def add(self, kind: int, rect: pygame.Rect, growth: float = 1.0) -> int:
+        if self.free:
+            node_id = self.free.pop()
+        else:
+            if self.used == self.capacity:
+                self.grow_capacity()
+            node_id = self.used
+            self.used += 1
+
+        self.x[node_id] = rect.x
+        self.y[node_id] = rect.y
+        self.w[node_id] = rect.width
+        self.h[node_id] = rect.height
+        self.growth[node_id] = growth
+        self.kind[node_id] = kind
+        self.alive[node_id] = True
+        self.version += 1
+        if self.changes is not None:
+            self.changes.append((CHANGE_ADD, node_id))
+        return node_id
+
+    def put(self, node_id: int, kind: int, rect: pygame.Rect, growth: float) -> None:
+        # Place a node at a known id (used when replaying a save journal).
+        while node_id >= self.capacity:
+            self.grow_capacity()
+        if node_id >= self.used:
+            self.free.extend(range(self.used, node_id))
+            self.used = node_id + 1
+        elif not self.alive[node_id]:
+            self.free.remove(node_id)
+        self.x[node_id] = rect.x
+        self.y[node_id] = rect.y
+        self.w[node_id] = rect.width
+        self.h[node_id] = rect.height
+        self.growth[node_id] = growth
+        self.kind[node_id] = kind
+        self.alive[node_id] = True
+        self.version += 1
+
+    def remove(self, node_id: int) -> None:
+        if not self.contains(node_id):
+            return
+        self.alive[node_id] = False
+        self.free.append(node_id)
+        self.version += 1
+        if self.changes is not None:
+            self.changes.append((CHANGE_REMOVE, node_id))
+
+    def clear(self) -> None:
+        self.alive[:] = False
+        self.used = 0
+        self.free.clear()
+        self.version += 1
+
+    def load_arrays(self, arrays: dict[str, np.ndarray], free: list[int]) -> None:
+        used = len(arrays["alive"])
+        while self.capacity < used:
+            self.grow_capacity()
+        self.clear()
+        for name, values in arrays.items():
+            getattr(self, name)[:used] = values
+        self.used = used
+        self.free = list(free)
+        self.version += 1
+
+    def drain_changes(self) -> list[tuple[int, int]]:
+        changes = self.changes or []
+        self.changes = []
+        return changes
+
+    def contains(self, node_id: int, kind: int | None = None) -> bool:
+        if node_id < 0 or node_id >= self.used or not self.alive[node_id]:
+            return False
+        return kind is None or int(self.kind[node_id]) == kind
+
+    def rect(self, node_id: int) -> pygame.Rect:
+        return pygame.Rect(
+            int(self.x[node_id]), int(self.y[node_id]), int(self.w[node_id]), int(self.h[node_id])
+        )
+
+    def mask(self, kind: int) -> np.ndarray:
+        used = self.used
+        return self.alive[:used] & (self.kind[:used] == kind)
+
+    def ids(self, kind: int) -> list[int]:
+        return np.flatnonzero(self.mask(kind)).tolist()
+
+    def count(self, kind: int) -> int:
+        return int(np.count_nonzero(self.mask(kind)))
+
+    def grow(self, kind: int, rate: float, dt: float) -> None:
+        # One vectorized pass over every node of `kind` that is still below full size.
+        used = self.used
+        growth = self.growth[:used]
+        growing = self.mask(kind) & (growth < 1.0)
+        before = np.floor(growth[growing] * GROWTH_STEPS)
+        np.minimum(growth + rate * dt, 1.0, out=growth, where=growing)
+        if np.any(np.floor(growth[growing] * GROWTH_STEPS) != before):
+            self.growth_version += 1
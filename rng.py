@@ -0,0 +1,20 @@
+import random
+
+STREAMS = ("world", "quests", "drops", "effects")
+
+
+class RngStreams:
+    """One independent `random.Random` per subsystem, all derived from the game seed.
+
+    Keeping the streams apart means e.g. an extra firework spark doesn't shift
+    which quest comes next, so sessions stay reproducible as code changes.
+    """
+
+    def __init__(self, seed: int) -> None:
+        self.seed = seed
+        self.reseed(0)
+
+    def reseed(self, tick: int) -> None:
+        # String seeds hash the same way on every run and platform (unlike hash()).
+        for name in STREAMS:
+            setattr(self, name, random.Random(f"{self.seed}:{name}:{tick}"))
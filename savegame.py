@@ -0,0 +1,486 @@
+import hashlib
+import os
+import queue
+import struct
+import threading
+import zlib
+
+import numpy as np
+import pygame
+
+from inventory import STAT_NAMES
+from resources import CHANGE_ADD, KIND_TREE
+from simulation import Quest, Simulation
+
+SAVE_MAGIC = b"GABS"
+JOURNAL_MAGIC = b"GABJ"
+SAVE_VERSION = 4
+HEADER = struct.Struct("<4sHQ")  # magic, format version, generation
+FRAME = struct.Struct("<II")  # payload length, crc32
+
+OP_ADVANCE = 1
+OP_PUT = 2
+OP_REMOVE = 3
+OP_STATE = 4
+OP_CHUNK = 5
+PUT_RECORD = struct.Struct("<IBiiiid")  # id, kind, x, y, w, h, growth
+
+# On-disk dtype per ResourceStore column (fixed little-endian so saves are portable).
+RESOURCE_FIELDS = {
+    "x": "<i4",
+    "y": "<i4",
+    "w": "<i4",
+    "h": "<i4",
+    "growth": "<f8",
+    "kind": "u1",
+    "alive": "u1",
+}
+
+
+class SaveError(ValueError):
+    pass
+
+
+class ByteWriter:
+    def __init__(self) -> None:
+        self.parts: list[bytes] = []
+
+    def pack(self, fmt: str, *values) -> None:
+        self.parts.append(struct.pack("<" + fmt, *values))
+
+    def raw(self, data: bytes) -> None:
+        self.parts.append(data)
+
+    def string(self, text: str) -> None:
+        data = text.encode("utf-8")
+        self.pack("H", len(data))
+        self.parts.append(data)
+
+    def optional_string(self, text: str | None) -> None:
+        self.pack("B", text is not None)
+        if text is not None:
+            self.string(text)
+
+    def counts(self, values: dict[str, int | bool]) -> None:
+        self.pack("B", len(values))
+        for name, value in values.items():
+            self.string(name)
+            self.pack("i", int(value))
+
+    def getvalue(self) -> bytes:
+        return b"".join(self.parts)
+
+
+class ByteReader:
+    def __init__(self, data: bytes) -> None:
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def at_end(self) -> bool:
+        return self.pos >= len(self.data)
+
+    def unpack(self, fmt: str) -> tuple:
+        layout = struct.Struct("<" + fmt)
+        if self.pos + layout.size > len(self.data):
+            raise SaveError("save data is truncated")
+        values = layout.unpack_from(self.data, self.pos)
+        self.pos += layout.size
+        return values
+
+    def raw(self, size: int) -> bytes:
+        if self.pos + size > len(self.data):
+            raise SaveError("save data is truncated")
+        data = self.data[self.pos : self.pos + size].tobytes()
+        self.pos += size
+        return data
+
+    def string(self) -> str:
+        (size,) = self.unpack("H")
+        return self.raw(size).decode("utf-8")
+
+    def optional_string(self) -> str | None:
+        (present,) = self.unpack("B")
+        return self.string() if present else None
+
+    def counts(self) -> dict[str, int]:
+        (n,) = self.unpack("B")
+        values = {}
+        for _ in range(n):
+            name = self.string()
+            (values[name],) = self.unpack("i")
+        return values
+
+
+def encode_inventory(w: ByteWriter, sim: Simulation) -> None:
+    # Stored by name, not id, so adding or reordering items in data/definitions.json keeps saves loadable.
+    defs = sim.defs
+    inventory = sim.inventory
+    w.pack("B", len(defs.item_names))
+    for item_id, name in enumerate(defs.item_names):
+        w.string(name)
+        owned = defs.item_owned[item_id]
+        w.pack("i", inventory.has(item_id) if owned else inventory.count(item_id))
+        w.counts(dict(zip(defs.item_subtypes[item_id], inventory.subtypes[item_id])))
+
+
+def apply_inventory(r: ByteReader, sim: Simulation) -> None:
+    # Items or subtypes the current definitions don't know are dropped.
+    defs = sim.defs
+    inventory = sim.inventory
+    (n,) = r.unpack("B")
+    for _ in range(n):
+        name = r.string()
+        (amount,) = r.unpack("i")
+        subtypes = r.counts()
+        item_id = defs.item_ids.get(name)
+        if item_id is None:
+            continue
+        if defs.item_owned[item_id]:
+            inventory.set_owned(item_id, bool(amount))
+        else:
+            inventory.set_count(item_id, amount)
+        for subtype, sub_name in enumerate(defs.item_subtypes[item_id]):
+            inventory.set_subtype(item_id, subtype, subtypes.get(sub_name, 0))
+
+
+def encode_state(sim: Simulation) -> bytes:
+    # Everything except the resource arrays; a few hundred bytes regardless of world size.
+    w = ByteWriter()
+    w.pack("QQdii", sim.seed, sim.tick, sim.time, sim.player.x, sim.player.y)
+    w.pack(
+        "BBBHH",
+        sim.house_built,
+        sim.quest_ready_to_turn_in,
+        sim.celebration_active,
+        sim.completed_quests,
+        sim.total_quests,
+    )
+    w.optional_string(sim.last_quest_kind)
+    quest = sim.current_quest
+    w.pack("B", quest is not None)
+    if quest is not None:
+        w.string(quest.kind)
+        w.pack("ii", quest.target, quest.progress)
+        w.string(quest.label)
+    encode_inventory(w, sim)
+    w.counts(sim.stats.as_dict())
+    respawns = sim.timers.pending("respawn")
+    w.pack("I", len(respawns))
+    for due, _event, (kind, (cx, cy)) in respawns:
+        w.pack("dBii", due - sim.time, kind, cx, cy)
+    return w.getvalue()
+
+
+def apply_state(sim: Simulation, data: bytes) -> None:
+    r = ByteReader(data)
+    _seed, sim.tick, sim.time, x, y = r.unpack("QQdii")
+    sim.player.x, sim.player.y = x, y
+    sim.prev_player_pos = (float(x), float(y))
+    house, ready, celebrating, sim.completed_quests, sim.total_quests = r.unpack("BBBHH")
+    sim.house_built = bool(house)
+    sim.quest_ready_to_turn_in = bool(ready)
+    sim.celebration_active = bool(celebrating)
+    sim.last_quest_kind = r.optional_string()
+    (has_quest,) = r.unpack("B")
+    sim.current_quest = None
+    if has_quest:
+        kind = r.string()
+        target, progress = r.unpack("ii")
+        label = r.string()
+        quest_id = sim.defs.quest_ids.get(kind)
+        if quest_id is None:
+            raise SaveError(f"save has unknown quest {kind!r}")
+        sim.current_quest = Quest(quest_id, kind, target, progress, label)
+    sim.track_quest()
+    apply_inventory(r, sim)
+    for name, value in r.counts().items():
+        if name in STAT_NAMES:
+            setattr(sim.stats, name, value)
+
+    sim.timers.clear()
+    sim.action_handle = sim.message_handle = sim.firework_handle = None
+    (respawns,) = r.unpack("I")
+    for _ in range(respawns):
+        remaining, kind, cx, cy = r.unpack("dBii")
+        sim.schedule_respawn(sim.time + remaining, kind, (cx, cy))
+
+
+def encode_resources(sim: Simulation) -> bytes:
+    store = sim.resources
+    used = store.used
+    w = ByteWriter()
+    w.pack("II", used, len(store.free))
+    for name, dtype in RESOURCE_FIELDS.items():
+        w.raw(getattr(store, name)[:used].astype(dtype).tobytes())
+    w.raw(np.asarray(store.free, dtype="<i4").tobytes())
+    return w.getvalue()
+
+
+def apply_resources(sim: Simulation, data: bytes) -> None:
+    r = ByteReader(data)
+    used, n_free = r.unpack("II")
+    arrays = {}
+    for name, dtype in RESOURCE_FIELDS.items():
+        size = used * np.dtype(dtype).itemsize
+        arrays[name] = np.frombuffer(r.raw(size), dtype=dtype)
+    arrays["alive"] = arrays["alive"].astype(np.bool_)
+    free = np.frombuffer(r.raw(n_free * 4), dtype="<i4").tolist()
+    sim.resources.load_arrays(arrays, free)
+    sim.rebuild_indexes()
+
+
+def encode_chunks(sim: Simulation) -> bytes:
+    chunks = sim.chunks
+    w = ByteWriter()
+    w.pack("III", len(chunks.loaded), len(chunks.dormant), len(chunks.spilled))
+    for cx, cy in sorted(chunks.loaded):
+        w.pack("ii", cx, cy)
+    for (cx, cy), record in chunks.dormant.items():
+        w.pack("iiI", cx, cy, len(record))
+        w.raw(record)
+    for cx, cy in sorted(chunks.spilled):
+        w.pack("ii", cx, cy)
+    return w.getvalue()
+
+
+def apply_chunks(sim: Simulation, data: bytes) -> None:
+    chunks = sim.chunks
+    r = ByteReader(data)
+    n_loaded, n_dormant, n_spilled = r.unpack("III")
+    chunks.loaded = {r.unpack("ii") for _ in range(n_loaded)}
+    # Which loaded chunks were changed isn't saved; assume all of them were.
+    chunks.dirty = set(chunks.loaded)
+    chunks.dormant.clear()
+    for _ in range(n_dormant):
+        cx, cy, size = r.unpack("iiI")
+        chunks.dormant[(cx, cy)] = r.raw(size)
+    chunks.spilled = {r.unpack("ii") for _ in range(n_spilled)}
+    chunks.center = None
+
+
+def frame(payload: bytes) -> bytes:
+    return FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def read_frames(data: bytes, offset: int):
+    # Yields intact frames; stops quietly at a torn or corrupt tail.
+    while offset + FRAME.size <= len(data):
+        size, crc = FRAME.unpack_from(data, offset)
+        start = offset + FRAME.size
+        payload = data[start : start + size]
+        if len(payload) < size or zlib.crc32(payload) != crc:
+            return
+        yield payload
+        offset = start + size
+
+
+def encode_snapshot(sim: Simulation, generation: int) -> bytes:
+    header = HEADER.pack(SAVE_MAGIC, SAVE_VERSION, generation)
+    return header + frame(encode_state(sim)) + frame(encode_resources(sim)) + frame(encode_chunks(sim))
+
+
+def encode_delta(
+    sim: Simulation,
+    changes: list[tuple[int, int]],
+    chunk_changes: list[tuple[int, tuple[int, int], bytes]],
+) -> bytes:
+    # Puts carry the node's values as of now, so only the last change per id matters on replay.
+    store = sim.resources
+    w = ByteWriter()
+    w.pack("Bd", OP_ADVANCE, sim.time)
+    for change, node_id in changes:
+        if change == CHANGE_ADD and store.contains(node_id):
+            w.pack("B", OP_PUT)
+            w.raw(
+                PUT_RECORD.pack(
+                    node_id,
+                    int(store.kind[node_id]),
+                    int(store.x[node_id]),
+                    int(store.y[node_id]),
+                    int(store.w[node_id]),
+                    int(store.h[node_id]),
+                    float(store.growth[node_id]),
+                )
+            )
+        elif change != CHANGE_ADD:
+            w.pack("BI", OP_REMOVE, node_id)
+    for chunk_state, (cx, cy), record in chunk_changes:
+        w.pack("BBiiI", OP_CHUNK, chunk_state, cx, cy, len(record))
+        w.raw(record)
+    state = encode_state(sim)
+    w.pack("BI", OP_STATE, len(state))
+    w.raw(state)
+    return frame(w.getvalue())
+
+
+def apply_delta(sim: Simulation, payload: bytes) -> None:
+    r = ByteReader(payload)
+    while not r.at_end():
+        (op,) = r.unpack("B")
+        if op == OP_ADVANCE:
+            (time,) = r.unpack("d")
+            # Growth between batches is deterministic, so it is replayed rather than stored.
+            sim.resources.grow(KIND_TREE, sim.tree_growth_rate, time - sim.time)
+            sim.time = time
+        elif op == OP_PUT:
+            node_id, kind, x, y, w, h, growth = PUT_RECORD.unpack(r.raw(PUT_RECORD.size))
+            sim.put_resource(node_id, kind, pygame.Rect(x, y, w, h), growth)
+        elif op == OP_REMOVE:
+            (node_id,) = r.unpack("I")
+            sim.drop_resource(node_id)
+        elif op == OP_CHUNK:
+            chunk_state, cx, cy, size = r.unpack("BiiI")
+            sim.chunks.apply_change(chunk_state, (cx, cy), r.raw(size))
+        elif op == OP_STATE:
+            (size,) = r.unpack("I")
+            apply_state(sim, r.raw(size))
+        else:
+            raise SaveError(f"unknown journal op {op}")
+
+
+def read_header(data: bytes, magic: bytes) -> int:
+    if len(data) < HEADER.size:
+        raise SaveError("save file is truncated")
+    found, version, generation = HEADER.unpack_from(data)
+    if found != magic:
+        raise SaveError("not a save file")
+    if version != SAVE_VERSION:
+        raise SaveError(f"unsupported save version {version}")
+    return generation
+
+
+def state_hash(sim: Simulation) -> str:
+    # Digest of everything a save would contain; equal hashes mean equal game states.
+    digest = hashlib.sha256()
+    for part in (encode_state(sim), encode_resources(sim), encode_chunks(sim)):
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def journal_path(path: str) -> str:
+    return path + ".journal"
+
+
+def load_game(path: str) -> Simulation | None:
+    try:
+        with open(path, "rb") as fh:
+            data = fh.read()
+    except FileNotFoundError:
+        return None
+
+    generation = read_header(data, SAVE_MAGIC)
+    sections = list(read_frames(data, HEADER.size))
+    if len(sections) != 3:
+        raise SaveError("save file is damaged")
+
+    (seed,) = ByteReader(sections[0]).unpack("Q")
+    sim = Simulation(seed)
+    apply_resources(sim, sections[1])
+    apply_chunks(sim, sections[2])
+    apply_state(sim, sections[0])
+
+    # The journal only applies to the snapshot it was started from.
+    try:
+        with open(journal_path(path), "rb") as fh:
+            journal = fh.read()
+        if read_header(journal, JOURNAL_MAGIC) == generation:
+            for payload in read_frames(journal, HEADER.size):
+                apply_delta(sim, payload)
+    except (FileNotFoundError, SaveError):
+        # A missing or damaged journal only loses the last few autosaves.
+        pass
+
+    # RNG state isn't saved; re-derive the streams from the seed and the tick we resume at.
+    sim.rng.reseed(sim.tick)
+    if sim.celebration_active:
+        sim.celebration_active = False
+        sim.start_celebration()
+    return sim
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp_path, path)
+
+
+class AutoSaver:
+    """Keeps a snapshot plus append-only journal on disk in step with a Simulation.
+
+    The main thread only serialises (a small delta, or the packed resource
+    arrays when compacting); file writes and fsyncs happen on a writer thread.
+    """
+
+    def __init__(self, sim: Simulation, path: str, interval: float, compact_bytes: int) -> None:
+        self.path = path
+        self.interval = interval
+        self.compact_bytes = compact_bytes
+        self.jobs: queue.Queue = queue.Queue()
+        self.error: OSError | None = None
+        self.generation = 0
+        self.journal_size = 0
+        self.last_save = 0.0
+        self.thread = threading.Thread(target=self.run_writer, name="autosave", daemon=True)
+        self.thread.start()
+        self.attach(sim)
+
+    def attach(self, sim: Simulation) -> None:
+        self.sim = sim
+        sim.resources.changes = []
+        sim.chunks.changes = []
+        self.snapshot()
+
+    def snapshot(self) -> None:
+        self.generation = int.from_bytes(os.urandom(8), "little")
+        self.sim.resources.drain_changes()
+        self.sim.chunks.drain_changes()
+        self.jobs.put(("snapshot", self.generation, encode_snapshot(self.sim, self.generation)))
+        self.journal_size = 0
+        self.last_save = self.sim.time
+
+    def save_delta(self) -> None:
+        data = encode_delta(self.sim, self.sim.resources.drain_changes(), self.sim.chunks.drain_changes())
+        self.jobs.put(("append", self.generation, data))
+        self.journal_size += len(data)
+        self.last_save = self.sim.time
+
+    def update(self) -> None:
+        if self.sim.time - self.last_save < self.interval:
+            return
+        if self.journal_size >= self.compact_bytes:
+            self.snapshot()
+        else:
+            self.save_delta()
+
+    def close(self) -> None:
+        self.snapshot()
+        self.jobs.put(None)
+        self.thread.join()
+
+    def run_writer(self) -> None:
+        # Generation of the journal actually on disk; deltas for a snapshot that failed to write are dropped.
+        disk_generation = None
+        while True:
+            job = self.jobs.get()
+            try:
+                if job is None:
+                    return
+                kind, generation, data = job
+                if kind == "snapshot":
+                    write_atomic(self.path, data)
+                    # Swap the journal only after the snapshot it belongs to is in place.
+                    write_atomic(journal_path(self.path), HEADER.pack(JOURNAL_MAGIC, SAVE_VERSION, generation))
+                    disk_generation = generation
+                elif generation == disk_generation:
+                    with open(journal_path(self.path), "ab") as fh:
+                        fh.write(data)
+                        fh.flush()
+                        os.fsync(fh.fileno())
+            except OSError as exc:
+                self.error = exc
+            finally:
+                self.jobs.task_done()
@@ -0,0 +1,93 @@
+import queue
+import threading
+import time
+from typing import Callable
+
+from config import MAX_FRAME_TIME, SIM_DT
+from simulation import SimInput, Simulation
+from snapshot import SnapshotBuffer, capture
+
+
+class SimulationThread:
+    """Steps a simulation at a fixed tick rate on a background thread.
+
+    The main thread never touches the simulation while this runs: it sends
+    input (and any other work, via `call`) through a queue and draws the
+    latest `WorldSnapshot` from `snapshots`. A slow frame therefore delays
+    only the picture, not the ticks.
+    """
+
+    def __init__(
+        self,
+        sim: Simulation,
+        before_step: Callable[[SimInput], None] | None = None,
+        after_steps: Callable[[], None] | None = None,
+    ) -> None:
+        self.sim = sim
+        self.before_step = before_step
+        self.after_steps = after_steps
+        self.inbox: queue.SimpleQueue[SimInput | Callable[[], None]] = queue.SimpleQueue()
+        self.snapshots = SnapshotBuffer(capture(sim))
+        self.move = (0, 0)
+        self.error: BaseException | None = None
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="simulation", daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopping.set()
+        if self.thread.ident is not None:
+            self.thread.join()
+        self.check()
+
+    def check(self) -> None:
+        # Re-raise a simulation crash on the main thread instead of freezing the picture.
+        if self.error is not None:
+            raise RuntimeError("simulation thread crashed") from self.error
+
+    def submit(self, inputs: SimInput) -> None:
+        self.inbox.put(inputs)
+
+    def call(self, fn: Callable[[], None]) -> None:
+        # Runs `fn` on the simulation thread before the next tick.
+        self.inbox.put(fn)
+
+    def next_input(self) -> SimInput:
+        # Movement is whatever was held most recently; actions from every frame since the last tick are kept.
+        actions: list[str] = []
+        while True:
+            try:
+                item = self.inbox.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, SimInput):
+                self.move = (item.move_x, item.move_y)
+                actions.extend(item.actions)
+            else:
+                item()
+        return SimInput(self.move[0], self.move[1], actions)
+
+    def run(self) -> None:
+        try:
+            next_tick = time.perf_counter()
+            while not self.stopping.is_set():
+                now = time.perf_counter()
+                if now < next_tick:
+                    time.sleep(next_tick - now)
+                    continue
+                # After a long stall (debugger, suspended laptop) skip ahead instead of racing to catch up.
+                if now - next_tick > MAX_FRAME_TIME:
+                    next_tick = now - MAX_FRAME_TIME
+                while next_tick <= now:
+                    inputs = self.next_input()
+                    if self.before_step is not None:
+                        self.before_step(inputs)
+                    self.sim.step(SIM_DT, inputs)
+                    next_tick += SIM_DT
+                if self.after_steps is not None:
+                    self.after_steps()
+                self.snapshots.publish(capture(self.sim))
+        except BaseException as exc:
+            self.error = exc
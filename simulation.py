@@ -0,0 +1,596 @@
+import random
+from dataclasses import dataclass, field
+from functools import partial
+
+import numpy as np
+import pygame
+
+from config import (
+    CHUNK_DORMANT_LIMIT,
+    CHUNK_LOAD_RADIUS,
+    CHUNK_SIZE,
+    CHUNK_SPILL_DIR,
+    CHUNK_STONE_COUNT,
+    CHUNK_TREE_COUNT,
+    FIREWORK_BURST_SIZE,
+    HEIGHT,
+    HOME_AREA_OFFSET,
+    HOME_AREA_SIZE,
+    HOME_KEEP_OUT,
+    PLAYER_HEIGHT,
+    PLAYER_SPEED,
+    PLAYER_WIDTH,
+    SPATIAL_CELL_SIZE,
+    SPAWN_MARGIN,
+    SPAWN_SPACING,
+    START_POS,
+    STONE_SIZE,
+    TREE_SIZE,
+    WIDTH,
+)
+from chunks import ChunkKey, ChunkManager
+from definitions import Definitions, definitions_with_overrides
+from events import EventBus, RareCollected, ReturnedHome, StoneCollected, StoneMined, TreeCut, WoodCollected
+from inventory import Inventory, Stats
+from particles import ParticleSystem
+from placement import Placer
+from resources import KIND_STONE, KIND_TREE, ResourceStore
+from rng import RngStreams
+from timers import Scheduler
+from tunables import Tunables
+from world import SpatialGrid, grown_tree_rect, is_near
+
+
+@dataclass
+class SimInput:
+    # Held movement direction (-1, 0 or 1 per axis) plus one-shot actions for this tick.
+    move_x: int = 0
+    move_y: int = 0
+    actions: list[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class Quest:
+    quest_id: int
+    kind: str
+    target: int
+    progress: int
+    label: str
+
+
+class Simulation:
+    """Headless game state. Advance it with `step(dt, inputs)`; no display is needed."""
+
+    def __init__(self, seed: int | None = None, tunables: Tunables | None = None) -> None:
+        self.tunables = tunables if tunables is not None else Tunables()
+        self.defs: Definitions = definitions_with_overrides(
+            self.tunables.quest_target_ranges, self.tunables.recipe_costs
+        )
+        self.seed = seed if seed is not None else random.getrandbits(63)
+        self.rng = RngStreams(self.seed)
+        self.tick = 0
+        self.time = 0.0
+        self.timers = Scheduler()
+        self.events = EventBus()
+        self.timer_handlers = {
+            "respawn": self.on_respawn_due,
+            "message_expire": self.on_message_expired,
+            "firework": self.on_firework_due,
+            "action_done": self.on_action_done,
+        }
+
+        self.player = pygame.Rect(START_POS[0], START_POS[1], PLAYER_WIDTH, PLAYER_HEIGHT)
+        self.prev_player_pos = (float(self.player.x), float(self.player.y))
+        self.home_area = pygame.Rect(
+            START_POS[0] - HOME_AREA_OFFSET[0],
+            START_POS[1] - HOME_AREA_OFFSET[1],
+            HOME_AREA_SIZE[0],
+            HOME_AREA_SIZE[1],
+        )
+
+        # Resources are keyed by a stable id so indexes and action targets survive removals.
+        self.resources = ResourceStore()
+        self.tree_index = SpatialGrid(SPATIAL_CELL_SIZE)
+        self.tree_mature_threshold = 0.95
+        self.tree_growth_rate = 0.06
+        self.stone_index = SpatialGrid(SPATIAL_CELL_SIZE)
+        self.placer = Placer(SPAWN_SPACING, SPAWN_MARGIN, [self.tree_index, self.stone_index])
+        self.home_keep_out = self.home_area.inflate(HOME_KEEP_OUT * 2, HOME_KEEP_OUT * 2)
+        self.chunks = ChunkManager(
+            self,
+            self.seed,
+            CHUNK_SIZE,
+            CHUNK_LOAD_RADIUS,
+            CHUNK_TREE_COUNT,
+            CHUNK_STONE_COUNT,
+            CHUNK_DORMANT_LIMIT,
+            CHUNK_SPILL_DIR,
+        )
+        self.chunks.update(*self.player.center)
+
+        defs = self.defs
+        self.inventory = Inventory(len(defs.item_names), [len(names) for names in defs.item_subtypes])
+        self.item_wood = defs.item_ids["wood+branches"]
+        self.item_stone = defs.item_ids["stone"]
+        self.item_rare = defs.item_ids["rare_stone"]
+        self.item_axe = defs.item_ids["axe"]
+        self.item_pickaxe = defs.item_ids["pickaxe"]
+        self.item_house = defs.item_ids["house"]
+
+        self.stats = Stats()
+        self.total_quests = self.tunables.quest_count
+        self.completed_quests = 0
+        self.quest_ready_to_turn_in = False
+        self.last_quest_kind: str | None = None
+        self.current_quest: Quest | None = None
+        self.quest_subscription: int | None = None
+        self.celebration_active = False
+        self.flowers: list[dict[str, float | int]] = []
+        self.particles = ParticleSystem()
+        self.firework_handle: int | None = None
+        self.assign_next_quest()
+
+        self.action_mode: str | None = None
+        self.action_started = 0.0
+        self.action_duration = 0.0
+        self.action_target_id: int | None = None
+        self.action_handle: int | None = None
+
+        self.message = ""
+        self.message_handle: int | None = None
+
+        self.craft_menu_open = False
+
+        self.action_handlers = {
+            "cut": self.start_cutting,
+            "mine": self.start_mining,
+            "toggle_craft": self.toggle_craft_menu,
+            "close_menu": self.close_craft_menu,
+            "home": self.press_home,
+        }
+        for recipe_id, action in enumerate(self.defs.recipe_actions):
+            self.action_handlers[action] = partial(self.craft, recipe_id)
+
+    @property
+    def house_built(self) -> bool:
+        return self.inventory.has(self.item_house)
+
+    @house_built.setter
+    def house_built(self, built: bool) -> None:
+        self.inventory.set_owned(self.item_house, built)
+
+    def show_message(self, text: str, seconds: float = 2.0) -> None:
+        self.message = text
+        self.timers.cancel(self.message_handle)
+        self.message_handle = self.timers.schedule(self.time + seconds, "message_expire")
+
+    def on_message_expired(self, _payload: None) -> None:
+        self.message = ""
+        self.message_handle = None
+
+    def add_tree(self, rect: pygame.Rect, growth: float) -> int:
+        tree_id = self.resources.add(KIND_TREE, rect, growth)
+        self.tree_index.insert(tree_id, rect)
+        return tree_id
+
+    def remove_tree(self, tree_id: int) -> None:
+        self.resources.remove(tree_id)
+        self.tree_index.remove(tree_id)
+
+    def add_stone(self, rect: pygame.Rect) -> int:
+        stone_id = self.resources.add(KIND_STONE, rect)
+        self.stone_index.insert(stone_id, rect)
+        return stone_id
+
+    def remove_stone(self, stone_id: int) -> None:
+        self.resources.remove(stone_id)
+        self.stone_index.remove(stone_id)
+
+    def put_resource(self, node_id: int, kind: int, rect: pygame.Rect, growth: float) -> None:
+        self.resources.put(node_id, kind, rect, growth)
+        self.tree_index.remove(node_id)
+        self.stone_index.remove(node_id)
+        index = self.tree_index if kind == KIND_TREE else self.stone_index
+        index.insert(node_id, rect)
+
+    def drop_resource(self, node_id: int) -> None:
+        self.resources.remove(node_id)
+        self.tree_index.remove(node_id)
+        self.stone_index.remove(node_id)
+
+    def rebuild_indexes(self) -> None:
+        self.tree_index.clear()
+        self.stone_index.clear()
+        for tree_id in self.tree_ids():
+            self.tree_index.insert(tree_id, self.resources.rect(tree_id))
+        for stone_id in self.stone_ids():
+            self.stone_index.insert(stone_id, self.resources.rect(stone_id))
+
+    def tree_ids(self) -> list[int]:
+        return self.resources.ids(KIND_TREE)
+
+    def stone_ids(self) -> list[int]:
+        return self.resources.ids(KIND_STONE)
+
+    def get_tree_rect(self, tree_id: int) -> pygame.Rect:
+        return grown_tree_rect(self.resources.rect(tree_id), float(self.resources.growth[tree_id]))
+
+    def is_tree_mature(self, tree_id: int) -> bool:
+        return float(self.resources.growth[tree_id]) >= self.tree_mature_threshold
+
+    def action_progress(self) -> float:
+        if self.action_mode is None or self.action_duration <= 0:
+            return 0.0
+        return max(0.0, min(1.0, (self.time - self.action_started) / self.action_duration))
+
+    def start_action(self, mode: str, target_id: int, duration: float) -> None:
+        self.action_mode = mode
+        self.action_target_id = target_id
+        self.action_started = self.time
+        self.action_duration = duration
+        self.action_handle = self.timers.schedule(self.time + duration, "action_done", mode)
+
+    def cancel_action(self) -> None:
+        self.timers.cancel(self.action_handle)
+        self.action_handle = None
+        self.action_mode = None
+        self.action_target_id = None
+
+    def on_action_done(self, mode: str) -> None:
+        self.action_handle = None
+        if mode == "cut":
+            self.finish_cut()
+        elif mode == "mine":
+            self.finish_mine()
+
+    def start_cutting(self) -> None:
+        if self.action_mode is not None or self.craft_menu_open:
+            return
+
+        # A grown tree always fits inside its base rect, so the base index is a safe prefilter.
+        for tree_id in self.tree_index.query_rect(self.player.inflate(50, 50)):
+            tree = self.get_tree_rect(tree_id)
+            if is_near(self.player, tree, distance=25):
+                if not self.is_tree_mature(tree_id):
+                    self.show_message("This tree is still growing!")
+                    return
+                tunables = self.tunables
+                has_axe = self.inventory.has(self.item_axe)
+                duration = tunables.cut_time_with_axe if has_axe else tunables.cut_time_seconds
+                self.start_action("cut", tree_id, duration)
+                return
+
+        self.show_message("No tree nearby!")
+
+    def start_mining(self) -> None:
+        if self.action_mode is not None or self.craft_menu_open:
+            return
+
+        if not self.inventory.has(self.item_pickaxe):
+            self.show_message("You need a pickaxe to mine! (Craft at home: C)")
+            return
+
+        for stone_id in self.stone_index.query_rect(self.player.inflate(50, 50)):
+            if is_near(self.player, self.resources.rect(stone_id), distance=25):
+                self.start_action("mine", stone_id, self.tunables.mine_time_seconds)
+                return
+
+        self.show_message("No stone nearby!")
+
+    def go_home(self) -> None:
+        self.cancel_action()
+        self.player.x, self.player.y = START_POS
+        self.prev_player_pos = (float(self.player.x), float(self.player.y))
+        self.stats.home_returns += 1
+        self.show_message("Back home!")
+        self.events.publish(ReturnedHome())
+
+    def press_home(self) -> None:
+        self.craft_menu_open = False
+        # Only a quest that was already done gets claimed; a go_home quest finished by this trip waits.
+        ready = self.quest_ready_to_turn_in
+        self.go_home()
+        if ready:
+            self.complete_and_turn_in_quest()
+
+    def toggle_craft_menu(self) -> None:
+        if self.player.colliderect(self.home_area):
+            self.craft_menu_open = not self.craft_menu_open
+        else:
+            self.show_message("Go to home area to craft (green square).")
+
+    def close_craft_menu(self) -> None:
+        self.craft_menu_open = False
+
+    def can_afford(self, recipe_id: int) -> bool:
+        return self.inventory.can_afford(self.defs.recipe_costs[recipe_id])
+
+    def craft(self, recipe_id: int) -> None:
+        # One generic handler for every recipe in data/definitions.json (fire, tools, the house, ...).
+        defs = self.defs
+        messages = defs.recipe_messages[recipe_id]
+        # Messages may mention {cost} or any tunable, e.g. {cut_time_with_axe}.
+        fields = {**vars(self.tunables), "cost": defs.recipe_cost_text[recipe_id]}
+        output = defs.recipe_outputs[recipe_id]
+        inventory = self.inventory
+        owned = defs.item_owned[output]
+        if defs.recipe_unique[recipe_id] and (inventory.has(output) if owned else inventory.count(output)):
+            self.show_message(messages["owned"])
+            return
+        if defs.recipe_at_home[recipe_id] and not self.player.colliderect(self.home_area):
+            self.show_message(messages["away"])
+            return
+        if not self.can_afford(recipe_id):
+            self.show_message(messages["missing"].format_map(fields))
+            return
+
+        for item_id, amount in defs.recipe_costs[recipe_id]:
+            inventory.take(item_id, amount)
+        if owned:
+            inventory.set_owned(output, True)
+        else:
+            inventory.add(output, defs.recipe_amounts[recipe_id])
+        stat = defs.recipe_stats[recipe_id]
+        if stat is not None:
+            self.stats.bump(stat)
+        self.show_message(messages["done"].format_map(fields))
+        event = defs.recipe_events[recipe_id]
+        if event is not None:
+            self.events.publish(event())
+
+    def quest_progress(self) -> tuple[int, int]:
+        if self.current_quest is None:
+            return (0, 0)
+        return (self.current_quest.progress, self.current_quest.target)
+
+    def track_quest(self) -> None:
+        # Listen only for the one event type that can advance the current quest.
+        self.events.unsubscribe(self.quest_subscription)
+        self.quest_subscription = None
+        if self.current_quest is not None and not self.quest_ready_to_turn_in:
+            event_type = self.defs.quest_events[self.current_quest.quest_id]
+            self.quest_subscription = self.events.subscribe(event_type, self.on_quest_event)
+
+    def on_quest_event(self, _event: object) -> None:
+        quest = self.current_quest
+        if quest is None:
+            return
+        quest.progress = min(quest.target, quest.progress + 1)
+        if quest.progress >= quest.target:
+            self.quest_ready_to_turn_in = True
+            self.track_quest()
+            self.show_message("Quest done! Press 🏠 to claim next quest.", seconds=3.0)
+
+    def assign_next_quest(self) -> None:
+        if self.completed_quests >= self.total_quests:
+            self.current_quest = None
+            self.track_quest()
+            return
+
+        defs = self.defs
+        kinds = [
+            name
+            for name, unless_owned in zip(defs.quest_names, defs.quest_unless_owned)
+            if unless_owned is None or not self.inventory.has(unless_owned)
+        ]
+        if self.last_quest_kind in kinds and len(kinds) > 1:
+            kinds.remove(self.last_quest_kind)
+
+        rng = self.rng.quests
+        kind = rng.choice(kinds)
+        quest_id = defs.quest_ids[kind]
+        target = rng.randint(*defs.quest_targets[quest_id])
+
+        label = defs.quest_labels[quest_id].format(target=target)
+        self.current_quest = Quest(quest_id, kind, target, 0, label)
+        self.last_quest_kind = kind
+        self.track_quest()
+
+    def complete_and_turn_in_quest(self) -> None:
+        if self.current_quest is None:
+            return
+        self.completed_quests += 1
+        self.quest_ready_to_turn_in = False
+        if self.completed_quests >= self.total_quests:
+            self.current_quest = None
+            self.show_message("All quests complete! 🎉", seconds=3.0)
+            self.start_celebration()
+            return
+
+        self.assign_next_quest()
+        if self.current_quest is not None:
+            self.show_message(f"New quest: {self.current_quest.label}", seconds=2.5)
+
+    def start_celebration(self) -> None:
+        if self.celebration_active:
+            return
+        self.celebration_active = True
+        self.timers.cancel(self.firework_handle)
+        self.firework_handle = self.timers.schedule(self.time, "firework")
+        self.flowers.clear()
+        self.particles.clear()
+
+        rng = self.rng.effects
+        for _ in range(70):
+            x = rng.randint(30, WIDTH - 30)
+            y = rng.randint(100, HEIGHT - 90)
+            self.flowers.append(
+                {
+                    "x": float(x),
+                    "y": float(y),
+                    "size": 0.0,
+                    "target": float(rng.randint(4, 8)),
+                    "growth": float(rng.uniform(4.0, 8.0)),
+                    "color_idx": int(rng.randint(0, 3)),
+                }
+            )
+
+    def spawn_firework_burst(self) -> None:
+        rng = self.rng.effects
+        cx = rng.randint(80, WIDTH - 80)
+        cy = rng.randint(80, HEIGHT - 220)
+        colors = [(255, 80, 80), (255, 220, 90), (120, 220, 255), (170, 255, 130), (245, 170, 255)]
+        color = colors[rng.randint(0, len(colors) - 1)]
+
+        n = FIREWORK_BURST_SIZE
+        angles = np.array([rng.uniform(0.0, 6.28318530718) for _ in range(n)])
+        speeds = np.array([rng.uniform(70.0, 170.0) for _ in range(n)])
+        lives = np.array([rng.uniform(0.8, 1.4) for _ in range(n)])
+        self.particles.spawn_burst(float(cx), float(cy), angles, speeds, lives, color)
+
+    def update_celebration(self, dt: float) -> None:
+        if not self.celebration_active:
+            return
+
+        for flower in self.flowers:
+            if float(flower["size"]) < float(flower["target"]):
+                new_size = float(flower["size"]) + float(flower["growth"]) * dt
+                flower["size"] = min(float(flower["target"]), new_size)
+
+        self.particles.step(dt, gravity=140.0)
+
+    def on_firework_due(self, _payload: None) -> None:
+        self.spawn_firework_burst()
+        self.firework_handle = self.timers.schedule(self.time + self.rng.effects.uniform(0.4, 0.9), "firework")
+
+    def collect(self, item_id: int) -> str:
+        # One unit of a gathered resource, of a random subtype; returns the subtype's name.
+        names = self.defs.item_subtypes[item_id]
+        subtype = self.rng.drops.randrange(len(names))
+        self.inventory.add(item_id, 1, subtype)
+        return names[subtype]
+
+    def add_wood_drop(self) -> None:
+        wood_type = self.collect(self.item_wood)
+        self.stats.wood_collected += 1
+        self.show_message(f"+1 wood ({wood_type})")
+        self.events.publish(WoodCollected(wood_type))
+
+    def add_stone_drop(self) -> None:
+        stone_type = self.collect(self.item_stone)
+        self.stats.stone_collected += 1
+
+        got_rare = self.rng.drops.random() < self.tunables.rare_drop_chance
+        if got_rare:
+            rare_type = self.collect(self.item_rare)
+            self.stats.rare_collected += 1
+            self.show_message(f"+1 stone ({stone_type}) and +1 rare ({rare_type})!")
+            self.events.publish(StoneCollected(stone_type))
+            self.events.publish(RareCollected(rare_type))
+        else:
+            self.show_message(f"+1 stone ({stone_type})")
+            self.events.publish(StoneCollected(stone_type))
+
+    def apply_actions(self, actions: list[str]) -> None:
+        for name in actions:
+            handler = self.action_handlers.get(name)
+            if handler is not None:
+                handler()
+
+    def update_movement(self, move_x: int, move_y: int) -> None:
+        if self.action_mode is None and not self.craft_menu_open:
+            self.player.x += move_x * PLAYER_SPEED
+            self.player.y += move_y * PLAYER_SPEED
+
+    def update_timers(self) -> None:
+        # Only the entries that are actually due are touched; the rest stay in the heap.
+        for _handle, event, payload in self.timers.pop_due(self.time):
+            self.timer_handlers[event](payload)
+
+    def schedule_respawn(self, due: float, kind: int, chunk: ChunkKey) -> None:
+        self.timers.schedule(due, "respawn", (kind, chunk))
+
+    def take_respawns(self, chunk: ChunkKey) -> list[tuple[float, int]]:
+        taken = self.timers.take("respawn", lambda payload: payload[1] == chunk)
+        return [(due, kind) for due, (kind, _chunk) in taken]
+
+    def on_respawn_due(self, payload: tuple[int, ChunkKey]) -> None:
+        # Resources grow back somewhere in the chunk they were taken from.
+        kind, chunk = payload
+        area = self.chunks.chunk_rect(chunk)
+        size = TREE_SIZE if kind == KIND_TREE else STONE_SIZE
+        # Not on top of the player either.
+        keep_out = [self.home_keep_out, self.player.inflate(20, 20)]
+        rect = self.placer.place(self.rng.world, area, size[0], size[1], keep_out)
+        if rect is None:
+            # Chunk is full right now; try again after another respawn period.
+            delay = self.tunables.tree_respawn_seconds if kind == KIND_TREE else self.tunables.stone_respawn_seconds
+            self.schedule_respawn(self.time + delay, kind, chunk)
+            return
+        if kind == KIND_TREE:
+            self.add_tree(rect, 0.0)
+        else:
+            self.add_stone(rect)
+        self.chunks.mark_dirty(chunk)
+
+    def update_tree_growth(self, dt: float) -> None:
+        self.resources.grow(KIND_TREE, self.tree_growth_rate, dt)
+
+    def update_cut_action(self) -> None:
+        if self.action_target_id is None or not self.resources.contains(self.action_target_id, KIND_TREE):
+            self.cancel_action()
+            return
+
+        target = self.get_tree_rect(self.action_target_id)
+        if not is_near(self.player, target, distance=35):
+            self.cancel_action()
+            self.show_message("Cut cancelled (too far).")
+
+    def update_mine_action(self) -> None:
+        if self.action_target_id is None or not self.resources.contains(self.action_target_id, KIND_STONE):
+            self.cancel_action()
+            return
+
+        target = self.resources.rect(self.action_target_id)
+        if not is_near(self.player, target, distance=35):
+            self.cancel_action()
+            self.show_message("Mining cancelled (too far).")
+
+    def update_actions(self) -> None:
+        if self.action_mode == "cut":
+            self.update_cut_action()
+        if self.action_mode == "mine":
+            self.update_mine_action()
+
+    def finish_cut(self) -> None:
+        tree_id = self.action_target_id
+        self.action_mode = None
+        self.action_target_id = None
+        if tree_id is None or not self.resources.contains(tree_id, KIND_TREE):
+            return
+        chunk = self.chunks.owner(tree_id)
+        self.chunks.mark_dirty(chunk)
+        self.remove_tree(tree_id)
+        self.schedule_respawn(self.time + self.tunables.tree_respawn_seconds, KIND_TREE, chunk)
+        self.stats.trees_cut += 1
+        self.add_wood_drop()
+        self.events.publish(TreeCut(tree_id))
+
+    def finish_mine(self) -> None:
+        stone_id = self.action_target_id
+        self.action_mode = None
+        self.action_target_id = None
+        if stone_id is None or not self.resources.contains(stone_id, KIND_STONE):
+            return
+        chunk = self.chunks.owner(stone_id)
+        self.chunks.mark_dirty(chunk)
+        self.remove_stone(stone_id)
+        self.schedule_respawn(self.time + self.tunables.stone_respawn_seconds, KIND_STONE, chunk)
+        self.stats.stones_mined += 1
+        self.add_stone_drop()
+        self.events.publish(StoneMined(stone_id))
+
+    def step(self, dt: float, inputs: SimInput | None = None) -> None:
+        if inputs is None:
+            inputs = SimInput()
+
+        self.tick += 1
+        self.time += dt
+        self.prev_player_pos = (float(self.player.x), float(self.player.y))
+        self.apply_actions(inputs.actions)
+        self.update_movement(inputs.move_x, inputs.move_y)
+        self.chunks.update(*self.player.center)
+        self.update_actions()
+        self.update_timers()
+        self.update_tree_growth(dt)
+        self.update_celebration(dt)
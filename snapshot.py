@@ -0,0 +1,216 @@
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pygame
+
+from definitions import Definitions
+from inventory import InventoryState
+from resources import KIND_TREE
+from world import grown_tree_rect
+
+Rect = tuple[int, int, int, int]
+
+
+def frozen_copy(values: np.ndarray) -> np.ndarray:
+    copy = values.copy()
+    copy.flags.writeable = False
+    return copy
+
+
+@dataclass(frozen=True, slots=True)
+class WorldSnapshot:
+    """Read-only copy of everything the renderer needs from one simulation tick.
+
+    Nothing in here is shared with the live simulation: rects are tuples, the
+    node and particle arrays are write-protected copies and the inventory is an
+    immutable `InventoryState`, so a snapshot can be drawn while the next tick
+    runs.
+    """
+
+    tick: int
+    taken_at: float
+    player: Rect
+    prev_player_pos: tuple[float, float]
+    home_area: Rect
+    house_built: bool
+
+    # Loaded trees and stones, one row each, in id order.
+    node_ids: np.ndarray
+    node_kind: np.ndarray
+    node_x: np.ndarray
+    node_y: np.ndarray
+    node_w: np.ndarray
+    node_h: np.ndarray
+    node_growth: np.ndarray
+    tree_mature_threshold: float
+    # Rows ordered by node_x (and those x values), so culling can binary-search the visible strip.
+    node_by_x: np.ndarray
+    node_x_sorted: np.ndarray
+    node_max_size: int  # largest width or height
+    # ResourceStore.version / growth_version at capture: equal counters mean the node columns are unchanged.
+    node_version: int
+    growth_version: int
+    # Rows of the trees/stones nearest the player, looked up in the simulation's spatial grids.
+    nearest_tree: int | None
+    nearest_stone: int | None
+
+    celebration_active: bool
+    flowers: tuple[tuple[float, float, int, int], ...]  # x, y, size, colour index
+    particle_pos: np.ndarray
+    particle_life: np.ndarray
+    particle_color: np.ndarray
+
+    defs: Definitions
+    inventory: InventoryState
+    quest_kind: str | None
+    quest_label: str
+    quest_progress: tuple[int, int]
+    completed_quests: int
+    total_quests: int
+    quest_ready_to_turn_in: bool
+    message: str
+    action_mode: str | None
+    action_progress: float
+    craft_menu_open: bool
+
+    def node_rect(self, row: int) -> pygame.Rect:
+        return pygame.Rect(
+            int(self.node_x[row]), int(self.node_y[row]), int(self.node_w[row]), int(self.node_h[row])
+        )
+
+    def is_tree(self, row: int) -> bool:
+        return int(self.node_kind[row]) == KIND_TREE
+
+    def tree_rect(self, row: int) -> pygame.Rect:
+        return grown_tree_rect(self.node_rect(row), float(self.node_growth[row]))
+
+    def is_tree_mature(self, row: int) -> bool:
+        return float(self.node_growth[row]) >= self.tree_mature_threshold
+
+
+@dataclass(frozen=True, slots=True)
+class NodeLayout:
+    """Frozen copies of the node columns that only change when nodes come or go."""
+
+    version: int
+    ids: np.ndarray
+    kind: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+    w: np.ndarray
+    h: np.ndarray
+    by_x: np.ndarray
+    x_sorted: np.ndarray
+    max_size: int
+
+
+def node_layout(store) -> NodeLayout:
+    # Shared by every snapshot until the store changes, so a tick only copies growth, not the whole world.
+    layout = store.snapshot_layout
+    if layout is not None and layout.version == store.version:
+        return layout
+    rows = np.flatnonzero(store.alive[: store.used])
+    x = store.x[rows]
+    by_x = np.argsort(x, kind="stable")
+    layout = store.snapshot_layout = NodeLayout(
+        version=store.version,
+        ids=frozen_copy(rows),
+        kind=frozen_copy(store.kind[rows]),
+        x=frozen_copy(x),
+        y=frozen_copy(store.y[rows]),
+        w=frozen_copy(store.w[rows]),
+        h=frozen_copy(store.h[rows]),
+        by_x=frozen_copy(by_x),
+        x_sorted=frozen_copy(x[by_x]),
+        max_size=int(max(store.w[rows].max(), store.h[rows].max())) if len(rows) else 0,
+    )
+    return layout
+
+
+def row_of(rows: np.ndarray, node_id: int | None) -> int | None:
+    # `rows` holds node ids in ascending order, so a node's row is a binary search away.
+    if node_id is None:
+        return None
+    return int(np.searchsorted(rows, node_id))
+
+
+def capture(sim) -> WorldSnapshot:
+    store = sim.resources
+    layout = node_layout(store)
+    rows = layout.ids
+    nearest_tree = nearest_stone = None
+    if sim.current_quest is not None:
+        px, py = sim.player.center
+        nearest_tree = row_of(rows, sim.tree_index.nearest(px, py))
+        nearest_stone = row_of(rows, sim.stone_index.nearest(px, py))
+    particles = sim.particles
+    n = particles.count
+    quest = sim.current_quest
+    return WorldSnapshot(
+        tick=sim.tick,
+        taken_at=time.perf_counter(),
+        player=tuple(sim.player),
+        prev_player_pos=sim.prev_player_pos,
+        home_area=tuple(sim.home_area),
+        house_built=sim.house_built,
+        node_ids=layout.ids,
+        node_kind=layout.kind,
+        node_x=layout.x,
+        node_y=layout.y,
+        node_w=layout.w,
+        node_h=layout.h,
+        node_growth=frozen_copy(store.growth[rows]),
+        tree_mature_threshold=sim.tree_mature_threshold,
+        node_by_x=layout.by_x,
+        node_x_sorted=layout.x_sorted,
+        node_max_size=layout.max_size,
+        node_version=layout.version,
+        growth_version=store.growth_version,
+        nearest_tree=nearest_tree,
+        nearest_stone=nearest_stone,
+        celebration_active=sim.celebration_active,
+        flowers=tuple(
+            (float(f["x"]), float(f["y"]), int(float(f["size"])), int(f["color_idx"]))
+            for f in sim.flowers
+            if float(f["size"]) >= 1
+        ),
+        particle_pos=frozen_copy(particles.pos[:n]),
+        particle_life=frozen_copy(particles.life[:n]),
+        particle_color=frozen_copy(particles.color[:n]),
+        defs=sim.defs,
+        inventory=sim.inventory.state(),
+        quest_kind=quest.kind if quest is not None else None,
+        quest_label=quest.label if quest is not None else "No quest",
+        quest_progress=sim.quest_progress(),
+        completed_quests=sim.completed_quests,
+        total_quests=sim.total_quests,
+        quest_ready_to_turn_in=sim.quest_ready_to_turn_in,
+        message=sim.message,
+        action_mode=sim.action_mode,
+        action_progress=sim.action_progress(),
+        craft_menu_open=sim.craft_menu_open,
+    )
+
+
+class SnapshotBuffer:
+    """Double buffer between the simulation and the renderer.
+
+    The simulation builds the next snapshot on its own (the back buffer) and
+    `publish` swaps it to the front in one step. Snapshots are never changed
+    after that, so the renderer can hold on to the front one for a whole frame
+    without locking the simulation out.
+    """
+
+    def __init__(self, first: WorldSnapshot) -> None:
+        self.lock = threading.Lock()
+        self.front = first
+
+    def publish(self, snapshot: WorldSnapshot) -> None:
+        with self.lock:
+            self.front = snapshot
+
+    def latest(self) -> WorldSnapshot:
+        with self.lock:
+            return self.front
@@ -0,0 +1,234 @@
+import hashlib
+import io
+import os
+import struct
+import threading
+from collections import deque
+
+import numpy as np
+import pygame
+
+# Bump when the processing below changes so stale cache entries are ignored.
+SPRITE_PIPELINE_VERSION = 1
+CACHE_MAGIC = b"GSPR"
+CACHE_HEADER = struct.Struct("<4sII")
+
+
+def ensure_alpha(sprite: pygame.Surface) -> pygame.Surface:
+    if sprite.get_flags() & pygame.SRCALPHA:
+        return sprite
+    # Without a display convert_alpha() is unavailable, so copy into a 32-bit RGBA surface.
+    converted = pygame.Surface(sprite.get_size(), pygame.SRCALPHA, 32)
+    converted.blit(sprite, (0, 0))
+    return converted
+
+
+def run_labels(similar: np.ndarray) -> np.ndarray:
+    # Label each horizontal run (along the last axis) of similar pixels 1..n; 0 elsewhere.
+    starts = similar.copy()
+    starts[:, 1:] &= ~similar[:, :-1]
+    labels = np.cumsum(starts.ravel()).reshape(similar.shape)
+    labels[~similar] = 0
+    return labels
+
+
+def edge_background_mask(rgb: np.ndarray, tolerance: int) -> np.ndarray:
+    """Pixels 4-connected to the border whose colour is within `tolerance` of pixel (0, 0)."""
+    bg = rgb[0, 0].astype(np.int16)
+    similar = np.all(np.abs(rgb.astype(np.int16) - bg) <= tolerance, axis=2)
+
+    # Every similar pixel joins one row run and one column run. Flooding alternates
+    # between the two: a reached row run reaches every column run it crosses and
+    # vice versa, so the fixed point is exactly the edge-connected components.
+    row_labels = run_labels(similar)
+    col_labels = np.ascontiguousarray(run_labels(np.ascontiguousarray(similar.T)).T)
+    pixels = np.flatnonzero(similar)
+    rows = row_labels.ravel()[pixels]
+    cols = col_labels.ravel()[pixels]
+
+    row_hit = np.zeros(int(row_labels.max()) + 1, dtype=np.bool_)
+    col_hit = np.zeros(int(col_labels.max()) + 1, dtype=np.bool_)
+    for edge in (row_labels[0, :], row_labels[-1, :], row_labels[:, 0], row_labels[:, -1]):
+        row_hit[edge] = True
+    row_hit[0] = False
+
+    reached = -1
+    while True:
+        col_hit[cols[row_hit[rows]]] = True
+        row_hit[rows[col_hit[cols]]] = True
+        count = int(np.count_nonzero(row_hit))
+        if count == reached:
+            break
+        reached = count
+
+    return row_hit[row_labels]
+
+
+def remove_edge_background(sprite: pygame.Surface, tolerance: int = 36) -> pygame.Surface:
+    width, height = sprite.get_size()
+    if width == 0 or height == 0:
+        return sprite
+
+    sprite = ensure_alpha(sprite)
+    rgb = pygame.surfarray.pixels3d(sprite)
+    mask = edge_background_mask(rgb, tolerance)
+    del rgb
+    alpha = pygame.surfarray.pixels_alpha(sprite)
+    alpha[mask] = 0
+    del alpha
+    return sprite
+
+
+def sprite_cache_key(source: bytes, tolerance: int, size: tuple[int, int]) -> str:
+    digest = hashlib.sha256(source)
+    digest.update(f"v{SPRITE_PIPELINE_VERSION}|tolerance={tolerance}|size={size[0]}x{size[1]}".encode())
+    return digest.hexdigest()[:24]
+
+
+def source_cache_id(sprite_path: str) -> str:
+    # One shared cache dir serves every category, so names come from the whole relative path, not the basename.
+    relative = os.path.relpath(sprite_path).replace(os.sep, "/")
+    return hashlib.sha256(relative.encode()).hexdigest()[:16]
+
+
+def cache_file_path(cache_dir: str, sprite_path: str, key: str) -> str:
+    return os.path.join(cache_dir, f"{source_cache_id(sprite_path)}-{key}.rgba")
+
+
+def cache_pointer_path(cache_path: str) -> str:
+    # Records which key is current for a source, so the one stale entry can be removed by exact name.
+    return cache_path.rsplit("-", 1)[0] + ".key"
+
+
+def read_cached_sprite(cache_path: str) -> pygame.Surface | None:
+    try:
+        with open(cache_path, "rb") as fh:
+            raw = fh.read()
+    except OSError:
+        return None
+
+    if len(raw) < CACHE_HEADER.size:
+        return None
+    magic, width, height = CACHE_HEADER.unpack_from(raw)
+    pixels = memoryview(raw)[CACHE_HEADER.size :]
+    if magic != CACHE_MAGIC or len(pixels) != width * height * 4:
+        return None
+    # Raw RGBA bytes map straight onto a surface; no PNG decode or processing.
+    return pygame.image.frombuffer(pixels, (width, height), "RGBA")
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    # Temp name is unique per process and thread, so concurrent writers never share (or remove) one.
+    tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def write_cached_sprite(cache_path: str, surface: pygame.Surface) -> None:
+    # The cache is an optimisation: a failed write just means reprocessing next launch.
+    width, height = surface.get_size()
+    payload = CACHE_HEADER.pack(CACHE_MAGIC, width, height) + pygame.image.tobytes(surface, "RGBA")
+    pointer_path = cache_pointer_path(cache_path)
+    base, key = cache_path.rsplit("-", 1)
+    key = key.removesuffix(".rgba")
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        try:
+            with open(pointer_path, encoding="ascii") as fh:
+                previous = fh.read().strip()
+        except (OSError, UnicodeDecodeError):
+            previous = ""
+        write_atomic(cache_path, payload)
+        write_atomic(pointer_path, key.encode("ascii"))
+        # Only the entry this source pointed at before; never a prefix match.
+        if previous and previous != key and previous.isalnum():
+            os.remove(f"{base}-{previous}.rgba")
+    except OSError:
+        pass
+
+
+def process_sprite(source: bytes, sprite_path: str, tolerance: int, size: tuple[int, int]) -> pygame.Surface:
+    sprite = pygame.image.load(io.BytesIO(source), sprite_path)
+    sprite = remove_edge_background(sprite, tolerance=tolerance)
+    return pygame.transform.smoothscale(sprite, size)
+
+
+def load_processed_sprite(
+    sprite_path: str,
+    tolerance: int,
+    size: tuple[int, int],
+    cache_dir: str | None = None,
+) -> pygame.Surface:
+    """Background-stripped, scaled sprite, reusing the on-disk cache when the source is unchanged.
+
+    The returned surface is not display-converted; call `convert_alpha()` on the main thread.
+    """
+    with open(sprite_path, "rb") as fh:
+        source = fh.read()
+
+    if cache_dir is None:
+        return process_sprite(source, sprite_path, tolerance, size)
+
+    cache_path = cache_file_path(cache_dir, sprite_path, sprite_cache_key(source, tolerance, size))
+    cached = read_cached_sprite(cache_path)
+    if cached is not None:
+        return cached
+
+    sprite = process_sprite(source, sprite_path, tolerance, size)
+    write_cached_sprite(cache_path, sprite)
+    return sprite
+
+
+def remove_edge_background_reference(sprite: pygame.Surface, tolerance: int = 36) -> pygame.Surface:
+    # Original per-pixel flood fill; kept as the correctness/benchmark baseline.
+    width, height = sprite.get_size()
+    if width == 0 or height == 0:
+        return sprite
+
+    bg = sprite.get_at((0, 0))
+
+    def similar(c: pygame.Color) -> bool:
+        return (
+            abs(int(c.r) - int(bg.r)) <= tolerance
+            and abs(int(c.g) - int(bg.g)) <= tolerance
+            and abs(int(c.b) - int(bg.b)) <= tolerance
+        )
+
+    visited = bytearray(width * height)
+    queue: deque[tuple[int, int]] = deque()
+
+    def push_if_bg(x: int, y: int) -> None:
+        idx = y * width + x
+        if visited[idx]:
+            return
+        visited[idx] = 1
+        if similar(sprite.get_at((x, y))):
+            queue.append((x, y))
+
+    for x in range(width):
+        push_if_bg(x, 0)
+        push_if_bg(x, height - 1)
+    for y in range(height):
+        push_if_bg(0, y)
+        push_if_bg(width - 1, y)
+
+    while queue:
+        x, y = queue.popleft()
+        pixel = sprite.get_at((x, y))
+        sprite.set_at((x, y), pygame.Color(pixel.r, pixel.g, pixel.b, 0))
+
+        if x > 0:
+            push_if_bg(x - 1, y)
+        if x < width - 1:
+            push_if_bg(x + 1, y)
+        if y > 0:
+            push_if_bg(x, y - 1)
+        if y < height - 1:
+            push_if_bg(x, y + 1)
+
+    return sprite
@@ -0,0 +1,66 @@
+import heapq
+from typing import Any
+
+
+class Scheduler:
+    """Min-heap of timed events keyed by absolute due time.
+
+    Entries are plain data (event name + payload) so pending timers can be
+    inspected and saved. Cancelled entries are dropped lazily when they reach
+    the top of the heap.
+    """
+
+    def __init__(self) -> None:
+        self.heap: list[tuple[float, int]] = []
+        self.entries: dict[int, tuple[float, str, Any]] = {}
+        self.next_handle = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def schedule(self, due: float, event: str, payload: Any = None) -> int:
+        handle = self.next_handle
+        self.next_handle += 1
+        self.entries[handle] = (due, event, payload)
+        heapq.heappush(self.heap, (due, handle))
+        return handle
+
+    def cancel(self, handle: int | None) -> None:
+        if handle is None:
+            return
+        self.entries.pop(handle, None)
+        # Rebuild once dead entries dominate so the heap can't grow without bound.
+        if len(self.heap) > 64 and len(self.heap) > 2 * len(self.entries):
+            self.heap = [(due, h) for due, h in self.heap if h in self.entries]
+            heapq.heapify(self.heap)
+
+    def pop_due(self, now: float) -> list[tuple[int, str, Any]]:
+        due_items = []
+        heap = self.heap
+        while heap and heap[0][0] <= now:
+            _, handle = heapq.heappop(heap)
+            entry = self.entries.pop(handle, None)
+            if entry is not None:
+                due_items.append((handle, entry[1], entry[2]))
+        return due_items
+
+    def pending(self, event: str | None = None) -> list[tuple[float, str, Any]]:
+        items = sorted(self.entries.values(), key=lambda entry: entry[0])
+        if event is None:
+            return items
+        return [entry for entry in items if entry[1] == event]
+
+    def take(self, event: str, match) -> list[tuple[float, Any]]:
+        # Cancel every pending `event` whose payload satisfies `match`; returns (due, payload) pairs.
+        taken = [
+            (handle, due, payload)
+            for handle, (due, name, payload) in self.entries.items()
+            if name == event and match(payload)
+        ]
+        for handle, _due, _payload in taken:
+            self.cancel(handle)
+        return [(due, payload) for _handle, due, payload in taken]
+
+    def clear(self) -> None:
+        self.heap.clear()
+        self.entries.clear()
@@ -0,0 +1,40 @@
+from dataclasses import dataclass, field
+
+from config import (
+    CUT_TIME_SECONDS,
+    CUT_TIME_WITH_AXE,
+    MINE_TIME_SECONDS,
+    QUEST_COUNT,
+    RARE_DROP_CHANCE,
+    STONE_RESPAWN_SECONDS,
+    TREE_RESPAWN_SECONDS,
+)
+
+
+@dataclass
+class Tunables:
+    # Balance numbers that can be varied per simulation (e.g. by economy_sim.py); defaults come from config.
+    cut_time_seconds: float = CUT_TIME_SECONDS
+    cut_time_with_axe: float = CUT_TIME_WITH_AXE
+    mine_time_seconds: float = MINE_TIME_SECONDS
+    tree_respawn_seconds: float = TREE_RESPAWN_SECONDS
+    stone_respawn_seconds: float = STONE_RESPAWN_SECONDS
+    rare_drop_chance: float = RARE_DROP_CHANCE
+    quest_count: int = QUEST_COUNT
+    # Patches on top of data/definitions.json: {quest: (min, max)} and {recipe: {item: amount}}.
+    quest_target_ranges: dict[str, tuple[int, int]] = field(default_factory=dict)
+    recipe_costs: dict[str, dict[str, int]] = field(default_factory=dict)
+
+    @classmethod
+    def from_overrides(cls, overrides: dict[str, object]) -> "Tunables":
+        # Keys are config.py names (RARE_DROP_CHANCE=...) or QUEST_TARGET_RANGES / RECIPE_COSTS patches.
+        tunables = cls()
+        for name, value in overrides.items():
+            attr = name.lower()
+            if not hasattr(tunables, attr):
+                raise ValueError(f"unknown tunable {name}")
+            if isinstance(getattr(tunables, attr), dict):
+                getattr(tunables, attr).update(value)
+            else:
+                setattr(tunables, attr, type(getattr(tunables, attr))(value))
+        return tunables
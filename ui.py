@@ -1,7 +1,47 @@
 import math
+from collections import OrderedDict
 
 import pygame
 
+from config import TEXT_CACHE_SIZE
+from definitions import Definitions
+from inventory import InventoryState
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by (font, text, colour)."""
+
+    def __init__(self, max_entries: int = 512) -> None:
+        self.max_entries = max_entries
+        self.entries: OrderedDict[tuple, pygame.Surface] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font: pygame.font.Font, text: str, color: tuple[int, int, int]) -> pygame.Surface:
+        key = (font, text, color)
+        surf = self.entries.get(key)
+        if surf is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return surf
+
+        self.misses += 1
+        surf = font.render(text, True, color)
+        self.entries[key] = surf
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return surf
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+
+text_cache = TextCache(TEXT_CACHE_SIZE)
+
+
+def render_text(font: pygame.font.Font, text: str, color: tuple[int, int, int]) -> pygame.Surface:
+    return text_cache.render(font, text, color)
+
 
 def draw_marker_line(
     screen: pygame.Surface,
@@ -22,86 +62,95 @@ def draw_marker_line(
     right = (tx - head_len * math.cos(angle + 0.5), ty - head_len * math.sin(angle + 0.5))
     pygame.draw.polygon(screen, label_color, [(tx, ty), left, right])
 
-    surf = small_font.render(label, True, (0, 0, 0))
+    surf = render_text(small_font, label, (0, 0, 0))
     pad = 6
     bg = pygame.Rect(tx + 10, ty - 12, surf.get_width() + pad * 2, 26)
     pygame.draw.rect(screen, label_color, bg)
     screen.blit(surf, (bg.x + pad, bg.y + 6))
 
 
-def draw_panel(
-    screen: pygame.Surface,
+def render_details_panel(
     font: pygame.font.Font,
     small_font: pygame.font.Font,
-    width: int,
-    resource_types: dict[str, dict[str, int]],
     resource_name: str,
-) -> None:
+    subtypes: list[tuple[str, int]],
+) -> pygame.Surface:
     panel_w = 260
     panel_h = 160
-    x = width - panel_w - 10
-    y = 10
+    panel = pygame.Surface((panel_w, panel_h))
+    pygame.draw.rect(panel, (255, 255, 255), panel.get_rect(), 2)
 
-    pygame.draw.rect(screen, (0, 0, 0), (x, y, panel_w, panel_h))
-    pygame.draw.rect(screen, (255, 255, 255), (x, y, panel_w, panel_h), 2)
+    title = render_text(font, f"Details: {resource_name}", (255, 255, 255))
+    panel.blit(title, (10, 10))
 
-    title = font.render(f"Details: {resource_name}", True, (255, 255, 255))
-    screen.blit(title, (x + 10, y + 10))
+    lines_y = 45
+    for key, value in subtypes:
+        line = render_text(small_font, f"- {key}: {value}", (255, 255, 255))
+        panel.blit(line, (12, lines_y))
+        lines_y += 24
 
-    lines_y = y + 45
-    if resource_name in resource_types:
-        for key, value in resource_types[resource_name].items():
-            line = small_font.render(f"- {key}: {value}", True, (255, 255, 255))
-            screen.blit(line, (x + 12, lines_y))
-            lines_y += 24
+    hint = render_text(small_font, "Click item again (or ESC) to close.", (200, 200, 200))
+    panel.blit(hint, (10, panel_h - 28))
+    return panel
 
-    hint = small_font.render("Click item again (or ESC) to close.", True, (200, 200, 200))
-    screen.blit(hint, (x + 10, y + panel_h - 28))
 
-
-def draw_craft_menu(
-    screen: pygame.Surface,
+def render_craft_menu(
     font: pygame.font.Font,
     small_font: pygame.font.Font,
     craft_panel: pygame.Rect,
-    craft_btn_axe: pygame.Rect,
-    craft_btn_pick: pygame.Rect,
-    inventory: dict[str, int | bool],
-    axe_cost_wood: int,
-    pick_cost_wood: int,
-    pick_cost_stone: int,
-) -> None:
-    pygame.draw.rect(screen, (0, 0, 0), craft_panel)
-    pygame.draw.rect(screen, (255, 255, 255), craft_panel, 2)
-
-    title = font.render("Crafting (only at home)", True, (255, 255, 255))
-    screen.blit(title, (craft_panel.x + 10, craft_panel.y + 10))
-
-    axe_label = f"Craft Axe (cost: {axe_cost_wood} wood)  [{'OWNED' if inventory['axe'] else 'click'}]"
-    pick_label = (
-        f"Craft Pickaxe (cost: {pick_cost_wood} wood + {pick_cost_stone} stone)  "
-        f"[{'OWNED' if inventory['pickaxe'] else 'click'}]"
-    )
-
-    can_axe = (not inventory["axe"]) and (inventory["wood+branches"] >= axe_cost_wood)
-    can_pick = (
-        (not inventory["pickaxe"])
-        and (inventory["wood+branches"] >= pick_cost_wood)
-        and (inventory["stone"] >= pick_cost_stone)
-    )
-
-    pygame.draw.rect(screen, (40, 40, 40), craft_btn_axe)
-    pygame.draw.rect(screen, (255, 255, 255), craft_btn_axe, 1)
-    pygame.draw.rect(screen, (40, 40, 40), craft_btn_pick)
-    pygame.draw.rect(screen, (255, 255, 255), craft_btn_pick, 1)
-
-    axe_color = (255, 255, 255) if can_axe else (170, 170, 170)
-    pick_color = (255, 255, 255) if can_pick else (170, 170, 170)
-    axe_surf = small_font.render(axe_label, True, axe_color)
-    pick_surf = small_font.render(pick_label, True, pick_color)
-
-    screen.blit(axe_surf, (craft_btn_axe.x + 8, craft_btn_axe.y + 10))
-    screen.blit(pick_surf, (craft_btn_pick.x + 8, craft_btn_pick.y + 10))
-
-    hint = small_font.render("Press C to close.", True, (200, 200, 200))
-    screen.blit(hint, (craft_panel.x + 10, craft_panel.y + craft_panel.height - 28))
+    craft_buttons: list[tuple[int, pygame.Rect]],
+    defs: Definitions,
+    inventory: InventoryState,
+) -> pygame.Surface:
+    # Buttons are given in screen coordinates (that is where clicks land) and drawn relative to the panel.
+    panel = pygame.Surface(craft_panel.size)
+    pygame.draw.rect(panel, (255, 255, 255), panel.get_rect(), 2)
+
+    title = render_text(font, "Crafting (only at home)", (255, 255, 255))
+    panel.blit(title, (10, 10))
+
+    for recipe_id, button in craft_buttons:
+        output = defs.recipe_outputs[recipe_id]
+        have = inventory.has(output) if defs.item_owned[output] else inventory.count(output)
+        owned = defs.recipe_unique[recipe_id] and bool(have)
+        affordable = inventory.can_afford(defs.recipe_costs[recipe_id])
+        label = (
+            f"Craft {defs.item_labels[output].capitalize()} "
+            f"(cost: {defs.recipe_cost_text[recipe_id]})  [{'OWNED' if owned else 'click'}]"
+        )
+        color = (255, 255, 255) if affordable and not owned else (170, 170, 170)
+
+        local = button.move(-craft_panel.x, -craft_panel.y)
+        pygame.draw.rect(panel, (40, 40, 40), local)
+        pygame.draw.rect(panel, (255, 255, 255), local, 1)
+        panel.blit(render_text(small_font, label, color), (local.x + 8, local.y + 10))
+
+    hint = render_text(small_font, "Press C to close.", (200, 200, 200))
+    panel.blit(hint, (10, craft_panel.height - 28))
+    return panel
+
+
+def render_profile_overlay(
+    small_font: pygame.font.Font,
+    rows: list[tuple[str, float, float, float]],
+    fps: float,
+    max_rows: int = 14,
+) -> pygame.Surface:
+    # Built a few times a second and blitted every frame; the numbers change too often for the text cache.
+    white = (255, 255, 255)
+    table = [(f"{fps:.1f} fps", "p50", "p95", "p99 ms")]
+    table += [(name, f"{p50:.2f}", f"{p95:.2f}", f"{p99:.2f}") for name, p50, p95, p99 in rows[:max_rows]]
+    cells = [[small_font.render(text, True, white) for text in row] for row in table]
+
+    col_w = 58
+    name_w = max(row[0].get_width() for row in cells) + 12
+    line_h = small_font.get_linesize()
+    overlay = pygame.Surface((name_w + col_w * 3 + 16, line_h * len(cells) + 12), pygame.SRCALPHA)
+    overlay.fill((0, 0, 0, 190))
+    for i, row in enumerate(cells):
+        y = 6 + i * line_h
+        overlay.blit(row[0], (8, y))
+        for col, surf in enumerate(row[1:], start=1):
+            # Numbers are right-aligned in fixed columns.
+            overlay.blit(surf, (8 + name_w + col_w * col - surf.get_width(), y))
+    return overlay
@@ -1,18 +1,6 @@
-import random
-
 import pygame
 
 
-def random_spawn_rect(width, height, home_area: pygame.Rect, w: int, h: int, margin: int = 20) -> pygame.Rect:
-    # Avoid spawning too near the home area and keep clear of UI bars.
-    while True:
-        x = random.randint(margin, width - margin - w)
-        y = random.randint(margin + 80, height - margin - h - 70)
-        rect = pygame.Rect(x, y, w, h)
-        if not rect.colliderect(home_area.inflate(140, 140)):
-            return rect
-
-
 def is_near(rect_a: pygame.Rect, rect_b: pygame.Rect, distance: int = 20) -> bool:
     expanded = rect_b.inflate(distance * 2, distance * 2)
     return rect_a.colliderect(expanded)
@@ -39,3 +27,154 @@ def nearest_rect(from_rect: pygame.Rect, rect_list: list[pygame.Rect]) -> pygame
             best_d = d
 
     return best
+
+
+def grown_tree_rect(base: pygame.Rect, growth: float) -> pygame.Rect:
+    # Young trees are drawn (and reached) smaller, anchored at the bottom centre of their base.
+    growth = max(0.2, min(1.0, growth))
+    scale = 0.45 + 0.55 * growth
+    width = max(12, int(base.width * scale))
+    height = max(16, int(base.height * scale))
+    return pygame.Rect(base.centerx - width // 2, base.bottom - height, width, height)
+
+
+def ring_cells(cx: int, cy: int, ring: int) -> list[tuple[int, int]]:
+    if ring == 0:
+        return [(cx, cy)]
+    cells = []
+    for x in range(cx - ring, cx + ring + 1):
+        cells.append((x, cy - ring))
+        cells.append((x, cy + ring))
+    for y in range(cy - ring + 1, cy + ring):
+        cells.append((cx - ring, y))
+        cells.append((cx + ring, y))
+    return cells
+
+
+class SpatialGrid:
+    """Uniform grid of integer keys -> rects for fast proximity and nearest lookups."""
+
+    def __init__(self, cell_size: int = 128) -> None:
+        self.cell_size = cell_size
+        self.cells: dict[tuple[int, int], set[int]] = {}
+        self.rects: dict[int, pygame.Rect] = {}
+        self.bounds: tuple[int, int, int, int] | None = None
+
+    def __len__(self) -> int:
+        return len(self.rects)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self.rects
+
+    def cell_range(self, rect: pygame.Rect) -> tuple[int, int, int, int]:
+        size = self.cell_size
+        return (
+            rect.left // size,
+            rect.top // size,
+            (rect.right - 1) // size if rect.width > 0 else rect.left // size,
+            (rect.bottom - 1) // size if rect.height > 0 else rect.top // size,
+        )
+
+    def insert(self, key: int, rect: pygame.Rect) -> None:
+        if key in self.rects:
+            self.remove(key)
+        self.rects[key] = rect
+        x0, y0, x1, y1 = self.cell_range(rect)
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                self.cells.setdefault((cx, cy), set()).add(key)
+
+        if self.bounds is None:
+            self.bounds = (x0, y0, x1, y1)
+        else:
+            bx0, by0, bx1, by1 = self.bounds
+            self.bounds = (min(bx0, x0), min(by0, y0), max(bx1, x1), max(by1, y1))
+
+    def remove(self, key: int) -> None:
+        rect = self.rects.pop(key, None)
+        if rect is None:
+            return
+        x0, y0, x1, y1 = self.cell_range(rect)
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                bucket = self.cells.get((cx, cy))
+                if bucket is None:
+                    continue
+                bucket.discard(key)
+                if not bucket:
+                    del self.cells[(cx, cy)]
+
+    def clear(self) -> None:
+        self.cells.clear()
+        self.rects.clear()
+        self.bounds = None
+
+    def shrink_bounds(self) -> None:
+        # `remove` never shrinks the bounds; refit them after bulk removals so `nearest` stays local.
+        if not self.cells:
+            self.bounds = None
+            return
+        xs = [cell[0] for cell in self.cells]
+        ys = [cell[1] for cell in self.cells]
+        self.bounds = (min(xs), min(ys), max(xs), max(ys))
+
+    def query_rect(self, area: pygame.Rect, ordered: bool = True) -> list[int]:
+        # Sorted so callers see entries in insertion (id) order, like the old list scans.
+        x0, y0, x1, y1 = self.cell_range(area)
+        found: set[int] = set()
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                bucket = self.cells.get((cx, cy))
+                if bucket:
+                    found.update(bucket)
+        hits = [key for key in found if self.rects[key].colliderect(area)]
+        if ordered:
+            hits.sort()
+        return hits
+
+    def query_radius(self, x: float, y: float, radius: float) -> list[int]:
+        area = pygame.Rect(int(x - radius), int(y - radius), int(radius * 2) + 1, int(radius * 2) + 1)
+        r2 = radius * radius
+        hits = []
+        for key in self.query_rect(area):
+            rect = self.rects[key]
+            # Distance from the point to the closest point of the rect.
+            dx = max(rect.left - x, 0, x - rect.right)
+            dy = max(rect.top - y, 0, y - rect.bottom)
+            if dx * dx + dy * dy <= r2:
+                hits.append(key)
+        return hits
+
+    def nearest(self, x: float, y: float) -> int | None:
+        if not self.rects or self.bounds is None:
+            return None
+
+        size = self.cell_size
+        hx = int(x // size)
+        hy = int(y // size)
+        bx0, by0, bx1, by1 = self.bounds
+        max_ring = max(abs(hx - bx0), abs(hx - bx1), abs(hy - by0), abs(hy - by1))
+
+        best: int | None = None
+        best_d = 0.0
+        seen: set[int] = set()
+        for ring in range(max_ring + 1):
+            for cell in ring_cells(hx, hy, ring):
+                bucket = self.cells.get(cell)
+                if not bucket:
+                    continue
+                for key in bucket:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    rect = self.rects[key]
+                    d = dist2(x, y, rect.centerx, rect.centery)
+                    if best is None or d < best_d or (d == best_d and key < best):
+                        best = key
+                        best_d = d
+            # Anything not yet seen has its centre at least `ring` whole cells away.
+            reach = ring * size
+            if best is not None and best_d <= reach * reach:
+                break
+
+        return best